@@ -0,0 +1,121 @@
+"""
+Batch Event Guidance
+Personalised guidance for every registrant of one event (e.g. after
+registration closes), streamed to JSONL: one line per student with the
+student_id and the same guidance dict the per-student API returns.
+
+Event-level sections are computed once per event and the per-student parts
+(similar-student cohort, skill-level advice) for all registrants together
+(EventGuidanceSystem.get_batch_guidance), so a 2,000-student event costs
+little more than a handful of single requests. Lines are written as they are
+produced; nothing is held for the whole batch except the profiles.
+
+Usage:
+    python batch_guidance.py --event "Ami Chroma" --students registrants.csv --out guidance.jsonl
+    python batch_guidance.py --event "Ami Chroma" --students registrants.csv --compare 200
+"""
+
+import json
+import time
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+from batch_recommendations import load_students
+from event_guidance_system import EventGuidanceSystem
+
+
+def _json_default(value):
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    raise TypeError(f"Not JSON serializable: {type(value).__name__}")
+
+
+def write_guidance_jsonl(guidance_system: EventGuidanceSystem, event_name: str,
+                         students: List[Dict[str, Any]], output_path: str) -> Dict[str, Any]:
+    """Stream one JSON line per student to output_path; returns counts and timing"""
+    start = time.perf_counter()
+    batch = guidance_system.get_batch_guidance(event_name, students)
+    written = 0
+    with open(output_path, "w", encoding="utf-8") as f:
+        for student, guidance in zip(students, batch):
+            f.write(json.dumps({"student_id": student["student_id"], **guidance},
+                               default=_json_default, ensure_ascii=False))
+            f.write("\n")
+            written += 1
+    seconds = time.perf_counter() - start
+    return {"event_name": event_name, "students": written, "seconds": seconds, "output_path": output_path}
+
+
+def compare_with_single(guidance_system: EventGuidanceSystem, event_name: str,
+                        students: List[Dict[str, Any]], sample: int) -> Dict[str, Any]:
+    """
+    Time the per-student and batched paths on a sample (guidance only, no
+    JSON) and check they agree. Runs after the batch, so both see warm
+    cohort-range caches.
+    """
+    sample_students = students[:sample]
+    start = time.perf_counter()
+    single = [guidance_system.get_recommendations_for_registered_event(student, event_name)
+              for student in sample_students]
+    single_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    batch = list(guidance_system.get_batch_guidance(event_name, sample_students))
+    batch_seconds = time.perf_counter() - start
+
+    mismatched = 0
+    for one, many in zip(single, batch):
+        one_similar = one["expectations"].pop("similar_students_satisfaction")
+        many_similar = many["expectations"].pop("similar_students_satisfaction")
+        if one != many or not np.isclose(one_similar, many_similar, rtol=1e-12):
+            mismatched += 1
+    return {
+        "sample": len(sample_students),
+        "single_seconds_per_student": single_seconds / max(len(sample_students), 1),
+        "batch_seconds_per_student": batch_seconds / max(len(sample_students), 1),
+        "mismatched": mismatched,
+    }
+
+
+def print_report(report: Dict[str, Any], comparison: Optional[Dict[str, Any]] = None):
+    print("\n" + "=" * 70)
+    print(f"BATCH GUIDANCE: {report['event_name']}")
+    print("=" * 70)
+    print(f"  Students:      {report['students']:,}")
+    print(f"  Time:          {report['seconds'] * 1000:.1f} ms "
+          f"({report['seconds'] / max(report['students'], 1) * 1e6:.1f} us/student)")
+    print(f"  Output:        {report['output_path']}")
+    if comparison:
+        single, batch = comparison["single_seconds_per_student"], comparison["batch_seconds_per_student"]
+        print(f"  Guidance only: {batch * 1e6:.1f} us/student batched vs {single * 1e6:.1f} us/student "
+              f"one at a time ({single / max(batch, 1e-12):.1f}x)")
+        if comparison["mismatched"]:
+            print(f"  ❌ {comparison['mismatched']}/{comparison['sample']} sampled students differ from the per-student path")
+        else:
+            print(f"  ✅ {comparison['sample']} sampled students match the per-student path")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Personalised guidance for every registrant of an event")
+    parser.add_argument("--event", required=True, help="Event name as it appears in the feedback dataset")
+    parser.add_argument("--students", required=True,
+                        help="CSV or JSON of registrants (student_id, branch, year, skill_level)")
+    parser.add_argument("--out", default="guidance.jsonl")
+    parser.add_argument("--feedback", default="event_feedback_dataset.csv")
+    parser.add_argument("--compare", type=int, default=0,
+                        help="Also run the per-student path on this many registrants and compare")
+    args = parser.parse_args()
+
+    guidance_system = EventGuidanceSystem(args.feedback)
+    registrants = load_students(args.students)
+    try:
+        batch_report = write_guidance_jsonl(guidance_system, args.event, registrants, args.out)
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+    else:
+        print_report(batch_report, compare_with_single(guidance_system, args.event, registrants, args.compare)
+                     if args.compare else None)
@@ -0,0 +1,281 @@
+"""
+Nightly Batch Recommendations
+Precomputes the top-N events for every student in one job.
+
+Students are scored in memory-bounded chunks (at most --max-pairs
+student x event rows in a feature matrix at a time) across a process pool.
+Each worker loads the models once. Top-N selection uses np.argpartition, so
+only the N winners per student are sorted. Results are written as a long,
+columnar table (student_id, rank, event_id, event_name, confidence,
+predicted_satisfaction): Parquet if pyarrow is installed, otherwise .npz.
+
+Usage:
+    python batch_recommendations.py --students students.csv --events events.json \\
+        --out recommendations.parquet --top-n 10 --workers 4
+"""
+
+import os
+import sys
+import json
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource  # POSIX only; peak memory is not reported on Windows
+    RESOURCE_AVAILABLE = True
+except ImportError:
+    RESOURCE_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+DEFAULT_TOP_N = 10
+# Upper bound on rows in one feature matrix (~33 float64 features => ~50 MB)
+DEFAULT_MAX_PAIRS = 200_000
+
+# Per-worker state, set up once by _init_worker
+_recommender = None
+_events: List[Dict[str, Any]] = []
+
+
+def load_students(path: str) -> List[Dict[str, Any]]:
+    """Student profiles from CSV or JSON; each needs a student_id plus profile fields"""
+    if path.endswith(".json"):
+        with open(path) as f:
+            students = json.load(f)
+    else:
+        students = pd.read_csv(path).to_dict(orient="records")
+    for i, student in enumerate(students):
+        student.setdefault("student_id", str(i))
+    return students
+
+
+def load_events(path: str) -> List[Dict[str, Any]]:
+    """Events as a JSON list of {id, name, type, level, duration_days}"""
+    with open(path) as f:
+        events = json.load(f)
+    for i, event in enumerate(events):
+        event.setdefault("id", str(i))
+    return events
+
+
+def top_n_indices(confidence: np.ndarray, satisfaction: np.ndarray, top_n: int) -> np.ndarray:
+    """
+    Per-row indices of the top_n events, ordered by (confidence, satisfaction)
+    descending. argpartition picks the winners in O(events); only those are sorted.
+    Ties at the cut-off are broken arbitrarily.
+    """
+    n_rows, n_events = confidence.shape
+    top_n = min(top_n, n_events)
+    if top_n < n_events:
+        candidates = np.argpartition(-confidence, top_n - 1, axis=1)[:, :top_n]
+    else:
+        candidates = np.tile(np.arange(n_events), (n_rows, 1))
+
+    rows = np.arange(n_rows)[:, None]
+    candidate_confidence = confidence[rows, candidates]
+    candidate_satisfaction = satisfaction[rows, candidates]
+    # lexsort sorts by the last key first: confidence, then satisfaction
+    order = np.lexsort((-candidate_satisfaction, -candidate_confidence))
+    return candidates[rows, order]
+
+
+def _init_worker(events: List[Dict[str, Any]], models_path: str, rating_estimation: str):
+    global _recommender, _events
+    from recommendation_system import EventRecommendationSystem
+    # No result cache: every (student, event) pair is scored exactly once
+    _recommender = EventRecommendationSystem(models_path, rating_estimation=rating_estimation, result_cache_size=0)
+    _events = events
+
+
+def _score_chunk(students: List[Dict[str, Any]], top_n: int,
+                 seed: Optional[int]) -> Dict[str, np.ndarray]:
+    """Top-N for one chunk of students, as per-student arrays"""
+    if seed is not None:
+        np.random.seed(seed)
+    scores = _recommender.score_pairs(students, _events)
+    top = top_n_indices(scores["confidence"], scores["predicted_satisfaction"], top_n)
+    rows = np.arange(len(students))[:, None]
+    return {
+        "student_id": np.array([str(student["student_id"]) for student in students]),
+        "event_index": top.astype(np.int32),
+        "confidence": scores["confidence"][rows, top].astype(np.float32),
+        "predicted_satisfaction": scores["predicted_satisfaction"][rows, top].astype(np.float32),
+    }
+
+
+def _to_columns(chunk: Dict[str, np.ndarray], events: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Flatten a chunk result into the long (student, rank) layout"""
+    n_students, n_ranks = chunk["event_index"].shape
+    event_ids = np.array([str(event["id"]) for event in events])
+    event_names = np.array([event["name"] for event in events])
+    flat_index = chunk["event_index"].ravel()
+    return {
+        "student_id": np.repeat(chunk["student_id"], n_ranks),
+        "rank": np.tile(np.arange(1, n_ranks + 1, dtype=np.int16), n_students),
+        "event_id": event_ids[flat_index],
+        "event_name": event_names[flat_index],
+        "confidence": chunk["confidence"].ravel(),
+        "predicted_satisfaction": chunk["predicted_satisfaction"].ravel(),
+    }
+
+
+class _ResultWriter:
+    """Streams chunks to Parquet (row group per chunk), or collects them for .npz"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.use_parquet = PYARROW_AVAILABLE and not path.endswith(".npz")
+        self._writer = None
+        self._chunks: List[Dict[str, np.ndarray]] = []
+        self.rows = 0
+
+    def write(self, columns: Dict[str, np.ndarray]):
+        self.rows += len(columns["rank"])
+        if not self.use_parquet:
+            self._chunks.append(columns)
+            return
+        table = pa.table({
+            "student_id": pa.array(columns["student_id"]),
+            "rank": pa.array(columns["rank"]),
+            "event_id": pa.array(columns["event_id"]).dictionary_encode(),
+            "event_name": pa.array(columns["event_name"]).dictionary_encode(),
+            "confidence": pa.array(columns["confidence"]),
+            "predicted_satisfaction": pa.array(columns["predicted_satisfaction"]),
+        })
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema, compression="zstd")
+        self._writer.write_table(table)
+
+    def close(self):
+        if self.use_parquet:
+            if self._writer is not None:
+                self._writer.close()
+            return
+        merged = {
+            name: np.concatenate([chunk[name] for chunk in self._chunks]) if self._chunks else np.array([])
+            for name in ["student_id", "rank", "event_id", "event_name", "confidence", "predicted_satisfaction"]
+        }
+        np.savez_compressed(self.path, **merged)
+
+
+def _chunks(items: List[Any], size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _peak_memory_mb() -> Tuple[Optional[float], Optional[float]]:
+    """Peak RSS of this process and of the largest finished worker (None where unsupported)"""
+    if not RESOURCE_AVAILABLE:
+        return None, None
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return own / divisor, children / divisor
+
+
+def run_batch(students: List[Dict[str, Any]], events: List[Dict[str, Any]], output_path: str,
+              top_n: int = DEFAULT_TOP_N, workers: Optional[int] = None,
+              max_pairs: int = DEFAULT_MAX_PAIRS, models_path: str = ".",
+              rating_estimation: str = "expected", seed: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Score every student against every event and write each student's top N.
+
+    Args:
+        rating_estimation: see recommendation_system.RATING_ESTIMATION_MODES
+        seed: seeds sampled rating estimates (seed + chunk number) for reproducible runs
+    """
+    workers = workers or max(1, (os.cpu_count() or 1) - 1)
+    chunk_size = max(1, max_pairs // max(1, len(events)))
+    chunks = list(_chunks(students, chunk_size))
+
+    print(f"🔄 Scoring {len(students)} students x {len(events)} events "
+          f"({len(chunks)} chunks of ≤{chunk_size}) on {workers} workers...")
+
+    writer = _ResultWriter(output_path)
+    start = time.perf_counter()
+    context = mp.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                             initargs=(events, os.path.abspath(models_path), rating_estimation)) as executor:
+        futures = [
+            executor.submit(_score_chunk, chunk, top_n, None if seed is None else seed + i)
+            for i, chunk in enumerate(chunks)
+        ]
+        # Write in submission order so the output is sorted by input order
+        for done, future in enumerate(futures, 1):
+            writer.write(_to_columns(future.result(), events))
+            if done % 10 == 0 or done == len(futures):
+                print(f"  {done}/{len(futures)} chunks")
+    writer.close()
+    elapsed = time.perf_counter() - start
+
+    parent_mb, worker_mb = _peak_memory_mb()
+    return {
+        "students": len(students),
+        "events": len(events),
+        "pairs_scored": len(students) * len(events),
+        "rows_written": writer.rows,
+        "output": output_path,
+        "format": "parquet" if writer.use_parquet else "npz",
+        "workers": workers,
+        "chunk_size": chunk_size,
+        "seconds": elapsed,
+        "students_per_second": len(students) / elapsed if elapsed else 0.0,
+        "pairs_per_second": len(students) * len(events) / elapsed if elapsed else 0.0,
+        "peak_rss_mb_parent": parent_mb,
+        "peak_rss_mb_worker": worker_mb,
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    print("\n" + "=" * 70)
+    print("BATCH RECOMMENDATIONS")
+    print("=" * 70)
+    print(f"  Students x events:  {report['students']} x {report['events']}")
+    print(f"  Workers / chunk:    {report['workers']} / {report['chunk_size']} students")
+    print(f"  Elapsed:            {report['seconds']:.1f} s")
+    print(f"  Throughput:         {report['students_per_second']:.0f} students/s, "
+          f"{report['pairs_per_second']:.0f} pairs/s")
+    if report['peak_rss_mb_parent'] is not None:
+        print(f"  Peak RSS:           parent {report['peak_rss_mb_parent']:.0f} MB, "
+              f"largest worker {report['peak_rss_mb_worker']:.0f} MB")
+    print(f"  Output:             {report['output']} ({report['format']}, {report['rows_written']} rows)")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Precompute top-N event recommendations for all students")
+    parser.add_argument("--students", required=True, help="CSV or JSON file of student profiles")
+    parser.add_argument("--events", required=True, help="JSON file of open events")
+    parser.add_argument("--out", default="recommendations.parquet")
+    parser.add_argument("--top-n", type=int, default=DEFAULT_TOP_N)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-pairs", type=int, default=DEFAULT_MAX_PAIRS,
+                        help="Max student x event rows per feature matrix")
+    parser.add_argument("--models", default=".", help="Directory with the model .pkl files, or shared artifacts from model_artifacts.py")
+    parser.add_argument("--sampled", action="store_true",
+                        help="Random rating estimates instead of their expected values")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for --sampled runs")
+    args = parser.parse_args()
+
+    if not args.out.endswith(".npz") and not PYARROW_AVAILABLE:
+        print("⚠️ pyarrow not installed, writing .npz instead of Parquet")
+        args.out = os.path.splitext(args.out)[0] + ".npz"
+
+    batch_report = run_batch(load_students(args.students), load_events(args.events), args.out,
+                             top_n=args.top_n, workers=args.workers, max_pairs=args.max_pairs,
+                             models_path=args.models,
+                             rating_estimation="sampled" if args.sampled else "expected", seed=args.seed)
+    print_report(batch_report)
@@ -0,0 +1,280 @@
+"""
+Date & Time Normalization
+Shared parsing helpers for poster extraction and API date filters.
+
+Fast paths cover the formats seen on posters and in the synthetic training
+data (ISO, "March 15, 2026", "15 March 2026", "15/03/2026", "9:00 AM", ...).
+python-dateutil is only used as a last resort. Results are memoized because
+the same strings (event dates, deadlines) are parsed over and over.
+"""
+
+import re
+from datetime import date, time
+from functools import lru_cache
+from typing import Optional, NamedTuple, Dict, Any
+
+try:
+    from dateutil import parser as date_parser
+    DATEUTIL_AVAILABLE = True
+except ImportError:
+    DATEUTIL_AVAILABLE = False
+
+CACHE_SIZE = 4096
+
+MONTHS = {
+    'january': 1, 'february': 2, 'march': 3, 'april': 4,
+    'may': 5, 'june': 6, 'july': 7, 'august': 8,
+    'september': 9, 'october': 10, 'november': 11, 'december': 12,
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'jun': 6, 'jul': 7,
+    'aug': 8, 'sep': 9, 'sept': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+
+_MONTH = r'(?P<month>[A-Za-z]{3,9})\.?'
+_DAY_RANGE = r'(?P<day>\d{1,2})(?:st|nd|rd|th)?(?:\s*(?:-|–|to|&)\s*(?P<day_end>\d{1,2})(?:st|nd|rd|th)?)?'
+_YEAR = r'(?P<year>\d{4})'
+
+# "2026-03-15", "2026/03/15", "2026-03-15T10:00:00"
+_ISO_RE = re.compile(r'^(?P<year>\d{4})[-/](?P<month>\d{1,2})[-/](?P<day>\d{1,2})(?:[T\s].*)?$')
+# "15/03/2026", "15-03-2026", "15.03.2026"
+_NUMERIC_RE = re.compile(r'^(?P<a>\d{1,2})[-/.](?P<b>\d{1,2})[-/.](?P<year>\d{4})$')
+# "March 15, 2026", "Mar 15-16 2026", "March 15th, 2026"
+_MONTH_FIRST_RE = re.compile(rf'^{_MONTH}\s+{_DAY_RANGE},?\s+{_YEAR}$')
+# "15 March 2026", "15-16 March 2026", "15th Mar, 2026"
+_DAY_FIRST_RE = re.compile(rf'^{_DAY_RANGE}\s+{_MONTH},?\s+{_YEAR}$')
+
+# "9:00 AM", "9 AM", "9.30 pm", "14:00"
+_TIME_RE = re.compile(r'^(?P<hour>\d{1,2})(?:[:.](?P<minute>\d{2}))?\s*(?P<meridiem>[AaPp]\.?[Mm]\.?)?$')
+# dateutil is only trusted when the text names a month or a year; with fuzzy
+# parsing, anything else containing a number ("Room 5") would become a date
+_DATE_ANCHOR_RE = re.compile(
+    r'\b(?:\d{4}|' + '|'.join(sorted(MONTHS, key=len, reverse=True)) + r')\b', re.IGNORECASE)
+_RANGE_SPLIT_RE = re.compile(r'\s*(?:-|–|—|\bto\b|\btill\b|\buntil\b)\s*', re.IGNORECASE)
+
+
+class DateRange(NamedTuple):
+    start: date
+    end: date
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"start": self.start.isoformat(), "end": self.end.isoformat()}
+
+
+class TimeRange(NamedTuple):
+    start: time
+    end: Optional[time]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "start": self.start.strftime('%H:%M'),
+            "end": self.end.strftime('%H:%M') if self.end else None,
+        }
+
+
+def _clean(text: str) -> str:
+    text = re.sub(r'\s+', ' ', text.strip())
+    # Drop leading labels like "Date:" / "On:" / weekday names
+    text = re.sub(r'^(?:date|on|event date|dated)\s*:\s*', '', text, flags=re.IGNORECASE)
+    text = re.sub(r'^(?:mon|tue|wed|thu|fri|sat|sun)[a-z]*\.?,?\s+', '', text, flags=re.IGNORECASE)
+    return text
+
+
+def _make_date(year: int, month: int, day: int) -> Optional[date]:
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _month_number(name: str) -> Optional[int]:
+    return MONTHS.get(name.lower())
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_date_range(text: Optional[str]) -> Optional[DateRange]:
+    """
+    Parse a date or a date range into start/end dates.
+    "15-16 March 2026" -> (2026-03-15, 2026-03-16); single dates give start == end.
+    Returns None if the text cannot be parsed.
+    """
+    if not text or not isinstance(text, str):
+        return None
+    cleaned = _clean(text)
+
+    match = _ISO_RE.match(cleaned)
+    if match:
+        parsed = _make_date(int(match['year']), int(match['month']), int(match['day']))
+        return DateRange(parsed, parsed) if parsed else None
+
+    match = _NUMERIC_RE.match(cleaned)
+    if match:
+        first, second, year = int(match['a']), int(match['b']), int(match['year'])
+        # Day-first (Indian convention) unless that is impossible
+        if second > 12 and first <= 12:
+            first, second = second, first
+        parsed = _make_date(year, second, first)
+        return DateRange(parsed, parsed) if parsed else None
+
+    for pattern in (_MONTH_FIRST_RE, _DAY_FIRST_RE):
+        match = pattern.match(cleaned)
+        if match:
+            month = _month_number(match['month'])
+            if not month:
+                break
+            year = int(match['year'])
+            start = _make_date(year, month, int(match['day']))
+            end = _make_date(year, month, int(match['day_end'])) if match['day_end'] else start
+            if start and end and end >= start:
+                return DateRange(start, end)
+            return DateRange(start, start) if start else None
+
+    # Explicit ranges with full dates on both sides: "15 March 2026 - 17 March 2026"
+    parts = _RANGE_SPLIT_RE.split(cleaned)
+    if len(parts) == 2 and all(parts):
+        start_range = parse_date_range(parts[0])
+        end_range = parse_date_range(parts[1])
+        if start_range is None and end_range is not None:
+            # "15 March - 17 March 2026": borrow the year from the end date
+            start_range = parse_date_range(f"{parts[0]} {end_range.end.year}")
+        if start_range and end_range and end_range.end >= start_range.start:
+            return DateRange(start_range.start, end_range.end)
+
+    if DATEUTIL_AVAILABLE and _DATE_ANCHOR_RE.search(cleaned):
+        try:
+            parsed = date_parser.parse(cleaned, fuzzy=True, dayfirst=True).date()
+            return DateRange(parsed, parsed)
+        except (ValueError, OverflowError):
+            pass
+
+    return None
+
+
+def parse_date(text: Optional[str]) -> Optional[date]:
+    """Parse a date (the start date for ranges); None if unparseable"""
+    parsed = parse_date_range(text)
+    return parsed.start if parsed else None
+
+
+def normalize_date(text: Optional[str]) -> Optional[str]:
+    """ISO (YYYY-MM-DD) form of a date string, or the original text if unparseable"""
+    parsed = parse_date(text)
+    return parsed.isoformat() if parsed else text
+
+
+def date_in_range(value: Optional[str], start: Optional[str] = None, end: Optional[str] = None) -> bool:
+    """
+    Inclusive date filter used by the API. Works on dates, datetimes (timestamps)
+    and poster-style strings; values that cannot be parsed never match a filter.
+    """
+    if not start and not end:
+        return True
+    parsed = parse_date_range(value)
+    if parsed is None:
+        return False
+    start_date = parse_date(start) if start else None
+    end_date = parse_date(end) if end else None
+    if start_date and parsed.end < start_date:
+        return False
+    if end_date and parsed.start > end_date:
+        return False
+    return True
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_time(text: Optional[str], default_meridiem: Optional[str] = None) -> Optional[time]:
+    """Parse "9:00 AM", "9 AM", "9.30pm" or "14:00"; None if unparseable"""
+    if not text or not isinstance(text, str):
+        return None
+    match = _TIME_RE.match(text.strip())
+    if not match:
+        return None
+
+    hour = int(match['hour'])
+    minute = int(match['minute'] or 0)
+    meridiem = match['meridiem'] or default_meridiem
+    if meridiem:
+        meridiem = meridiem.replace('.', '').upper()
+        if hour < 1 or hour > 12:
+            return None
+        if meridiem == 'PM' and hour != 12:
+            hour += 12
+        elif meridiem == 'AM' and hour == 12:
+            hour = 0
+    elif match['minute'] is None:
+        # A bare number is not a time
+        return None
+
+    if hour > 23 or minute > 59:
+        return None
+    return time(hour, minute)
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def parse_time_range(text: Optional[str]) -> Optional[TimeRange]:
+    """
+    Parse a time or time range: "9:00 AM - 6:00 PM", "10 AM to 5 PM", "09:00-18:00",
+    "9 - 11 AM" (the meridiem of the end time is applied to the start time, or
+    the other one when that would put the start after the end: "10 - 2 PM").
+    Ranges that end before they start return None.
+    """
+    if not text or not isinstance(text, str):
+        return None
+    cleaned = re.sub(r'^(?:time|at|timing)\s*:\s*', '', text.strip(), flags=re.IGNORECASE)
+    parts = [part for part in _RANGE_SPLIT_RE.split(cleaned) if part]
+
+    if len(parts) == 1:
+        start = parse_time(parts[0])
+        return TimeRange(start, None) if start else None
+
+    if len(parts) == 2:
+        end = parse_time(parts[1])
+        start = parse_time(parts[0])
+        if start is None and end is not None:
+            end_meridiem = re.search(r'([AaPp])\.?[Mm]\.?\s*$', parts[1])
+            if end_meridiem:
+                meridiem = end_meridiem.group(1).upper() + 'M'
+                start = parse_time(parts[0], default_meridiem=meridiem)
+                if start and start > end:
+                    start = parse_time(parts[0], default_meridiem='AM' if meridiem == 'PM' else 'PM')
+        if start and (end is None or end >= start):
+            return TimeRange(start, end)
+
+    return None
+
+
+def clear_caches():
+    """Drop memoized parses (mainly for benchmarks)"""
+    parse_date_range.cache_clear()
+    parse_time.cache_clear()
+    parse_time_range.cache_clear()
+
+
+if __name__ == "__main__":
+    import timeit
+
+    samples = [
+        "2026-03-15", "March 15, 2026", "15 March 2026", "15-16 March 2026",
+        "March 15-16, 2026", "15/03/2026", "Mar 5th 2026", "2026-03-15T10:30:00",
+    ]
+    print("=" * 60)
+    print("DATE PARSING")
+    print("=" * 60)
+    for sample in samples:
+        parsed = parse_date_range(sample)
+        print(f"  {sample:25s} -> {parsed.to_dict() if parsed else None}")
+
+    print("\nTIME PARSING")
+    print("-" * 60)
+    for sample in ["9:00 AM - 6:00 PM", "10 AM to 5 PM", "09:00-18:00", "9 - 11 AM", "10 - 2 PM", "2:30 PM"]:
+        parsed = parse_time_range(sample)
+        print(f"  {sample:25s} -> {parsed.to_dict() if parsed else None}")
+
+    print("\nSPEED (per call)")
+    print("-" * 60)
+    runs = 20000
+    cold = timeit.timeit(lambda: (clear_caches(), parse_date_range("15-16 March 2026")), number=runs)
+    warm = timeit.timeit(lambda: parse_date_range("15-16 March 2026"), number=runs)
+    print(f"  fast path (uncached): {cold / runs * 1e6:7.2f} µs")
+    print(f"  memoized:             {warm / runs * 1e6:7.2f} µs")
+    if DATEUTIL_AVAILABLE:
+        fuzzy = timeit.timeit(lambda: date_parser.parse("15 March 2026", fuzzy=True), number=runs)
+        print(f"  dateutil fuzzy:       {fuzzy / runs * 1e6:7.2f} µs")
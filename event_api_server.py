@@ -4,7 +4,7 @@ Complete event management with AI-powered poster analysis, attendance tracking,
 Phases 1-5 Implementation
 """
 
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query, Depends
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query, Depends, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import BaseModel, Field
@@ -18,6 +18,21 @@ import qrcode
 import base64
 from enum import Enum
 import os
+import math
+import time
+import asyncio
+import requests
+
+from date_utils import date_in_range, parse_date_range
+from poster_dedup import PosterDuplicateIndex, PosterFingerprint, compute_fingerprint
+from recommendation_service import (
+    RecommendationBatcher, DEFAULT_EVENT_LEVEL, event_to_recommender_input, build_student_profile
+)
+from candidate_index import CandidateIndex
+from collaborative_filtering import CollaborativeRecommender
+from event_text_index import EventTextIndex
+from model_artifacts import resolve_models_path
+from event_guidance_system import EventGuidanceSystem
 
 # Initialize FastAPI app
 app = FastAPI(
@@ -144,6 +159,7 @@ class EventResponse(BaseModel):
     school: str
     description: str
     posterUrl: Optional[str]
+    posterStatus: Optional[str] = None
     rawText: Optional[str]
     createdBy: str
     maxTeamSize: Optional[int] = 5
@@ -384,6 +400,8 @@ async def create_event(event: EventCreate, coordinator_id: str = Query(...)):
     # Add to Firestore
     event_ref = db.collection('events').document()
     event_ref.set(event_data)
+    invalidate_recommendations()
+    event_text_index.upsert(event_ref.id, event_data)
     
     return EventResponse(eventId=event_ref.id, **event_data)
 
@@ -406,10 +424,8 @@ async def list_events(
             events = [e for e in events if e.get('school') == school]
         if category:
             events = [e for e in events if e.get('category') == category]
-        if start_date:
-            events = [e for e in events if e.get('date', '') >= start_date]
-        if end_date:
-            events = [e for e in events if e.get('date', '') <= end_date]
+        if start_date or end_date:
+            events = [e for e in events if date_in_range(e.get('date'), start_date, end_date)]
         
         return [EventResponse(**event) for event in events[:limit]]
     
@@ -431,9 +447,7 @@ async def list_events(
         event_data['eventId'] = doc.id
         
         # Filter by date range if provided
-        if start_date and event_data.get('date', '') < start_date:
-            continue
-        if end_date and event_data.get('date', '') > end_date:
+        if not date_in_range(event_data.get('date'), start_date, end_date):
             continue
             
         events.append(EventResponse(**event_data))
@@ -475,6 +489,8 @@ async def update_event(event_id: str, event_update: EventUpdate):
     
     # Update Firestore
     event_ref.update(update_data)
+    invalidate_recommendations(event_id)
+    event_text_index.upsert(event_id, {**event_doc.to_dict(), **update_data})
     
     # Get updated document
     updated_doc = event_ref.get()
@@ -494,8 +510,14 @@ async def delete_event(event_id: str):
     if not event_doc.exists:
         raise HTTPException(status_code=404, detail="Event not found")
     
+    poster_hash = event_doc.to_dict().get("posterHash")
+    
     # Delete event
     event_ref.delete()
+    invalidate_recommendations(event_id)
+    event_text_index.remove(event_id)
+    if poster_hash:
+        poster_index.remove(PosterFingerprint.from_hex(poster_hash), event_id)
     
     # Also delete related attendance records
     attendance_query = db.collection('attendance').where('eventId', '==', event_id)
@@ -672,29 +694,124 @@ async def get_categories():
 ai_pipeline = None
 ai_pipeline_error = None
 
-try:
-    from poster_analysis_ai import get_analysis_pipeline
-    ai_pipeline = get_analysis_pipeline()
-    print("✅ AI Poster Analysis Pipeline loaded!")
-except Exception as e:
-    print(f"⚠️ AI Pipeline loading with fallback methods: {e}")
-    ai_pipeline_error = str(e)
-    # Try to import anyway - it has fallback methods
+# Optional worker pool: POSTER_POOL_WORKERS > 0 runs poster analysis in separate
+# processes (bounded threads, pinned CPUs) instead of the in-process singleton
+POSTER_POOL_WORKERS = int(os.getenv("POSTER_POOL_WORKERS", "0"))
+POSTER_POOL_THREADS = int(os.getenv("POSTER_POOL_THREADS", "2"))
+# Seconds a request waits for a pool worker before giving up with 504
+POSTER_ANALYSIS_TIMEOUT = float(os.getenv("POSTER_ANALYSIS_TIMEOUT", "120"))
+poster_pool = None
+
+def load_in_process_pipeline():
+    """Load the singleton poster analysis pipeline into the API process"""
+    global ai_pipeline, ai_pipeline_error
+    try:
+        from poster_analysis_ai import get_analysis_pipeline
+        from model_artifacts import memory_usage
+        memory_before = memory_usage()
+        load_start = time.time()
+        ai_pipeline = get_analysis_pipeline()
+        unique_mb = memory_usage().get("uss_mb", 0.0) - memory_before.get("uss_mb", 0.0)
+        print(f"✅ AI Poster Analysis Pipeline loaded! ({time.time() - load_start:.1f}s, "
+              f"+{unique_mb:.0f} MB unique memory)")
+    except Exception as e:
+        print(f"⚠️ AI Pipeline loading with fallback methods: {e}")
+        ai_pipeline_error = str(e)
+        # Try to import anyway - it has fallback methods
+        try:
+            from poster_analysis_ai import PosterAnalysisPipeline
+            ai_pipeline = PosterAnalysisPipeline()
+            print("✅ AI Pipeline loaded with rule-based fallback methods")
+        except Exception as e2:
+            print(f"❌ Could not load AI Pipeline at all: {e2}")
+            ai_pipeline = None
+
+if POSTER_POOL_WORKERS <= 0:
+    load_in_process_pipeline()
+
+@app.on_event("startup")
+async def start_poster_pool():
+    """Start the poster worker pool (if configured) once the server is up"""
+    global poster_pool, ai_pipeline_error
+    if POSTER_POOL_WORKERS <= 0:
+        return
+    
+    try:
+        from poster_worker_pool import PosterWorkerPool
+        pool = PosterWorkerPool(num_workers=POSTER_POOL_WORKERS, threads_per_worker=POSTER_POOL_THREADS)
+        # Workers load models on startup - don't block the event loop meanwhile
+        await asyncio.get_running_loop().run_in_executor(None, pool.start)
+        poster_pool = pool
+    except Exception as e:
+        print(f"⚠️ Poster worker pool failed to start, using in-process pipeline: {e}")
+        ai_pipeline_error = str(e)
+        load_in_process_pipeline()
+
+@app.on_event("shutdown")
+async def stop_poster_pool():
+    if poster_pool is not None:
+        poster_pool.shutdown()
+
+def poster_analysis_available() -> bool:
+    return poster_pool is not None or ai_pipeline is not None
+
+async def run_poster_analysis(content: bytes) -> Dict[str, Any]:
+    """Analyze poster image bytes on the worker pool if running, otherwise in-process"""
+    if poster_pool is not None:
+        try:
+            # On timeout wait_for cancels the pool future, which frees its shared memory
+            return await asyncio.wait_for(asyncio.wrap_future(poster_pool.submit(content)),
+                                          timeout=POSTER_ANALYSIS_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise HTTPException(status_code=504,
+                                detail=f"Poster analysis did not finish within {POSTER_ANALYSIS_TIMEOUT:g}s")
+    return ai_pipeline.analyze_poster(content)
+
+# Near-duplicate poster index (pHash/dHash in a BK-tree). Checked before OCR so
+# re-uploads of the same poster (forwards, crops, screenshots) reuse the earlier analysis
+poster_index = PosterDuplicateIndex()
+
+@app.on_event("startup")
+async def load_poster_index():
+    """Index fingerprints of posters already stored on events"""
+    if not validate_firebase():
+        return
+    
+    def _load():
+        events = ((doc.id, doc.to_dict()) for doc in db.collection('events').stream())
+        return poster_index.load_events(events)
+    
+    try:
+        count = await asyncio.get_running_loop().run_in_executor(None, _load)
+        print(f"✅ Poster duplicate index loaded ({count} posters)")
+    except Exception as e:
+        print(f"⚠️ Could not load poster duplicate index: {e}")
+
+async def fingerprint_poster(content: bytes) -> Optional[PosterFingerprint]:
+    """Perceptual fingerprint of poster bytes (None if the image cannot be decoded)"""
     try:
-        from poster_analysis_ai import PosterAnalysisPipeline
-        ai_pipeline = PosterAnalysisPipeline()
-        print("✅ AI Pipeline loaded with rule-based fallback methods")
-    except Exception as e2:
-        print(f"❌ Could not load AI Pipeline at all: {e2}")
-        ai_pipeline = None
+        return await asyncio.get_running_loop().run_in_executor(None, compute_fingerprint, content)
+    except Exception as e:
+        print(f"⚠️ Could not fingerprint poster: {e}")
+        return None
+
+def duplicate_summary(duplicate: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "eventId": duplicate.get("eventId"),
+        "similarity": duplicate["similarity"],
+        "phashDistance": duplicate["phashDistance"],
+        "dhashDistance": duplicate["dhashDistance"]
+    }
 
 @app.post("/analyze/poster")
-async def analyze_poster(file: UploadFile = File(...)):
+async def analyze_poster(file: UploadFile = File(...), force: bool = Query(False)):
     """
     Analyze poster image and extract event data using AI
-    Returns structured JSON with extracted fields and confidence scores
+    Returns structured JSON with extracted fields and confidence scores.
+    Near-duplicates of previously analyzed posters reuse the earlier analysis
+    (pass force=true to run OCR again).
     """
-    if not ai_pipeline:
+    if not poster_analysis_available():
         raise HTTPException(
             status_code=503,
             detail={
@@ -713,27 +830,35 @@ async def analyze_poster(file: UploadFile = File(...)):
     if len(content) > 10 * 1024 * 1024:
         raise HTTPException(status_code=400, detail="Image size must be less than 10MB")
     
-    # Save temporarily
-    import tempfile
-    
-    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1] if file.filename else '.jpg') as tmp:
-        tmp.write(content)
-        tmp_path = tmp.name
+    fingerprint = await fingerprint_poster(content)
+    duplicate = poster_index.find_duplicate(fingerprint) if fingerprint and not force else None
     
     try:
-        # Analyze poster
-        result = ai_pipeline.analyze_poster(tmp_path)
+        if duplicate:
+            result = duplicate["analysis"]
+            message = "This poster matches one analyzed before - reusing its analysis. Please review before saving."
+        else:
+            # Analyze poster
+            result = await run_poster_analysis(content)
+            message = "Analysis complete. Please review and edit the extracted data before saving."
+            if fingerprint and result.get("success"):
+                poster_index.add(fingerprint, {"eventId": None, "analysis": result})
         
-        return {
+        response = {
             "success": result.get("success", False),
             "extractedData": result.get("extractedData", {}),
             "confidence": result.get("confidence", {}),
             "rawText": result.get("rawText", ""),
             "needsReview": result.get("needsReview", True),
-            "message": "Analysis complete. Please review and edit the extracted data before saving.",
+            "message": message,
             "suggestions": result.get("suggestions", [])
         }
+        if duplicate:
+            response["duplicateOf"] = duplicate_summary(duplicate)
+        return response
     
+    except HTTPException:
+        raise
     except Exception as e:
         # Return error but allow frontend to handle it
         import traceback
@@ -748,21 +873,109 @@ async def analyze_poster(file: UploadFile = File(...)):
             "confidence": {},
             "rawText": ""
         }
+
+# Poster storage upload settings
+POSTER_UPLOAD_RETRIES = 3
+POSTER_UPLOAD_BACKOFF_SECONDS = 1.0
+# Images above this size use a chunked, resumable upload (chunks must be multiples of 256 KB).
+# A retry continues the same upload session from the last byte storage acknowledged.
+POSTER_RESUMABLE_THRESHOLD = 5 * 1024 * 1024
+POSTER_UPLOAD_CHUNK_SIZE = 1024 * 1024
+POSTER_UPLOAD_TIMEOUT_SECONDS = 60
+
+class PosterStatus(str, Enum):
+    PENDING = "pending"
+    UPLOADED = "uploaded"
+    FAILED = "failed"
+
+def resumable_upload_offset(session_url: str, total_size: int) -> Optional[int]:
+    """Bytes storage already holds for a resumable session (None once the upload is complete)"""
+    response = requests.put(session_url, headers={"Content-Range": f"bytes */{total_size}"},
+                            timeout=POSTER_UPLOAD_TIMEOUT_SECONDS)
+    if response.status_code in (200, 201):
+        return None
+    if response.status_code != 308:
+        response.raise_for_status()
+    # "Range: bytes=0-N" lists what was persisted; no header means nothing was
+    persisted = response.headers.get("Range")
+    return int(persisted.rsplit("-", 1)[1]) + 1 if persisted else 0
+
+def resume_poster_upload(session_url: str, content: bytes):
+    """Send the chunks of content storage does not have yet to a resumable upload session"""
+    offset = resumable_upload_offset(session_url, len(content))
+    while offset is not None:
+        end = min(offset + POSTER_UPLOAD_CHUNK_SIZE, len(content))
+        response = requests.put(
+            session_url,
+            data=content[offset:end],
+            headers={"Content-Range": f"bytes {offset}-{end - 1}/{len(content)}"},
+            timeout=POSTER_UPLOAD_TIMEOUT_SECONDS
+        )
+        if response.status_code in (200, 201):
+            return
+        if response.status_code != 308:
+            response.raise_for_status()
+        persisted = response.headers.get("Range")
+        offset = int(persisted.rsplit("-", 1)[1]) + 1 if persisted else 0
+
+def upload_poster_to_storage(event_id: str, blob_name: str, content: bytes, content_type: str):
+    """
+    Upload poster bytes to Firebase Storage and patch the event with the public URL.
+    Runs as a background task after the response has been sent.
+    """
+    event_ref = db.collection('events').document(event_id)
+    blob = bucket.blob(blob_name)
+    session_url = None
+    last_error = None
     
-    finally:
-        # Clean up temp file
+    for attempt in range(1, POSTER_UPLOAD_RETRIES + 1):
         try:
-            os.unlink(tmp_path)
-        except:
-            pass
+            # predefined_acl makes the object public in the same request (no extra make_public call)
+            if len(content) > POSTER_RESUMABLE_THRESHOLD:
+                if session_url is None:
+                    session_url = blob.create_resumable_upload_session(
+                        content_type=content_type, size=len(content),
+                        predefined_acl="publicRead", checksum=None
+                    )
+                resume_poster_upload(session_url, content)
+            else:
+                blob.upload_from_string(content, content_type=content_type, predefined_acl="publicRead")
+            
+            event_ref.update({
+                "posterUrl": blob.public_url,
+                "posterStatus": PosterStatus.UPLOADED.value
+            })
+            print(f"✅ Poster uploaded for event {event_id} ({len(content):,} bytes, attempt {attempt})")
+            return
+        except Exception as e:
+            last_error = e
+            if isinstance(e, requests.HTTPError) and e.response is not None and e.response.status_code in (404, 410):
+                session_url = None  # Session expired; the next attempt starts a new one
+            print(f"⚠️ Poster upload attempt {attempt}/{POSTER_UPLOAD_RETRIES} failed for event {event_id}: {e}")
+            if attempt < POSTER_UPLOAD_RETRIES:
+                time.sleep(POSTER_UPLOAD_BACKOFF_SECONDS * 2 ** (attempt - 1))
+    
+    try:
+        event_ref.update({
+            "posterStatus": PosterStatus.FAILED.value,
+            "posterError": str(last_error)
+        })
+    except Exception as e:
+        print(f"❌ Could not record poster upload failure for event {event_id}: {e}")
 
 @app.post("/events/from-poster")
 async def create_event_from_poster(
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
-    coordinator_id: str = Form(...)
+    coordinator_id: str = Form(...),
+    allow_duplicate: bool = Form(False)
 ):
     """
-    Upload poster, analyze it, and create event with extracted data
+    Upload poster, analyze it, and create event with extracted data.
+    The event is created immediately; the poster is uploaded to storage in the
+    background and posterUrl is filled in once the upload finishes.
+    If the poster is a near-duplicate of an existing event's poster, returns 409
+    unless allow_duplicate is set (the earlier analysis is then reused).
     """
     validate_firebase()
     
@@ -774,71 +987,84 @@ async def create_event_from_poster(
     if len(content) > 10 * 1024 * 1024:
         raise HTTPException(status_code=400, detail="Image size must be less than 10MB")
     
-    # Upload to Firebase Storage
-    import tempfile
-    import os
-    from datetime import datetime
+    fingerprint = await fingerprint_poster(content)
+    # Only posters of existing events block creation; analyze-only matches just share their analysis
+    event_duplicate = poster_index.find_duplicate(fingerprint, event_only=True) if fingerprint else None
+    
+    if event_duplicate and not allow_duplicate:
+        raise HTTPException(
+            status_code=409,
+            detail={
+                "error": "Duplicate poster",
+                "message": "An event already exists for this poster. Resend with allow_duplicate=true to create another one.",
+                "duplicateOf": duplicate_summary(event_duplicate)
+            }
+        )
+    duplicate = event_duplicate or (poster_index.find_duplicate(fingerprint) if fingerprint else None)
+    
+    # Analyze poster (skip OCR for near-duplicates)
+    analysis_result = None
+    if duplicate:
+        analysis_result = duplicate["analysis"]
+    elif poster_analysis_available():
+        analysis_result = await run_poster_analysis(content)
+    
+    if analysis_result:
+        extracted = analysis_result.get("extractedData", {})
+        raw_text = analysis_result.get("rawText", "")
+    else:
+        # Fallback: create empty event
+        extracted = {}
+        raw_text = ""
     
-    # Save temporarily for analysis
-    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(file.filename)[1]) as tmp:
-        tmp.write(content)
-        tmp_path = tmp.name
+    blob_name = None
+    if bucket:
+        blob_name = f"posters/{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}"
     
-    try:
-        # Analyze poster
-        if ai_pipeline:
-            analysis_result = ai_pipeline.analyze_poster(tmp_path)
-            extracted = analysis_result.get("extractedData", {})
-            raw_text = analysis_result.get("rawText", "")
-        else:
-            # Fallback: create empty event
-            extracted = {}
-            raw_text = ""
-        
-        # Upload to Firebase Storage
-        if bucket:
-            blob_name = f"posters/{datetime.now().strftime('%Y%m%d_%H%M%S')}_{file.filename}"
-            blob = bucket.blob(blob_name)
-            blob.upload_from_filename(tmp_path)
-            blob.make_public()
-            poster_url = blob.public_url
-        else:
-            poster_url = None
-        
-        # Create event with extracted data
-        event_data = {
-            "title": extracted.get("title", "Untitled Event"),
-            "category": extracted.get("category", "Technical"),
-            "date": extracted.get("date", ""),
-            "time": extracted.get("time", ""),
-            "location": extracted.get("location", ""),
-            "organizer": extracted.get("organizer", ""),
-            "registrationDeadline": extracted.get("registrationDeadline", ""),
-            "school": extracted.get("school", AMITY_SCHOOLS[0]),
-            "description": extracted.get("description", ""),
-            "posterUrl": poster_url,
-            "rawText": raw_text,
-            "createdBy": coordinator_id,
-            "createdAt": datetime.now().isoformat(),
-            "subUsers": []
-        }
-        
-        # Add to Firestore
-        event_ref = db.collection('events').document()
-        event_ref.set(event_data)
-        
-        return {
-            "eventId": event_ref.id,
-            "extractedData": event_data,
-            "needsReview": analysis_result.get("needsReview", True) if ai_pipeline else True,
-            "message": "Event created from poster. Please review and edit if needed."
-        }
+    # Create event with extracted data
+    event_data = {
+        "title": extracted.get("title", "Untitled Event"),
+        "category": extracted.get("category", "Technical"),
+        "date": extracted.get("date", ""),
+        "time": extracted.get("time", ""),
+        "location": extracted.get("location", ""),
+        "organizer": extracted.get("organizer", ""),
+        "registrationDeadline": extracted.get("registrationDeadline", ""),
+        "school": extracted.get("school", AMITY_SCHOOLS[0]),
+        "description": extracted.get("description", ""),
+        "posterUrl": None,
+        "posterStatus": PosterStatus.PENDING.value if blob_name else None,
+        "posterHash": fingerprint.to_hex() if fingerprint else None,
+        "rawText": raw_text,
+        "createdBy": coordinator_id,
+        "createdAt": datetime.now().isoformat(),
+        "subUsers": []
+    }
     
-    finally:
-        try:
-            os.unlink(tmp_path)
-        except:
-            pass
+    # Add to Firestore
+    event_ref = db.collection('events').document()
+    event_ref.set(event_data)
+    invalidate_recommendations()
+    event_text_index.upsert(event_ref.id, event_data)
+    
+    if fingerprint and analysis_result and analysis_result.get("success"):
+        poster_index.add(fingerprint, {"eventId": event_ref.id, "analysis": analysis_result})
+    
+    # Upload to Firebase Storage after the response is sent
+    if blob_name:
+        background_tasks.add_task(
+            upload_poster_to_storage, event_ref.id, blob_name, content, file.content_type
+        )
+    
+    response = {
+        "eventId": event_ref.id,
+        "extractedData": event_data,
+        "needsReview": analysis_result.get("needsReview", True) if analysis_result else True,
+        "message": "Event created from poster. Please review and edit if needed."
+    }
+    if duplicate:
+        response["duplicateOf"] = duplicate_summary(duplicate)
+    return response
 
 # ========================
 # PHASE 3: ATTENDANCE TRACKING
@@ -1072,13 +1298,14 @@ async def get_coordinator_dashboard(coordinator_id: str):
     # Get upcoming events
     upcoming = []
     past = []
-    today = datetime.now().strftime("%Y-%m-%d")
+    today = datetime.now().date()
     
     for event_doc in events:
         event_data = event_doc.to_dict()
-        event_date = event_data.get('date', '')
+        # Multi-day events stay upcoming until their last day
+        event_dates = parse_date_range(event_data.get('date'))
         
-        if event_date >= today:
+        if event_dates and event_dates.end >= today:
             upcoming.append(event_data)
         else:
             past.append(event_data)
@@ -1246,11 +1473,8 @@ async def export_report(filters: ReportFilter, format: str = Query("csv", regex=
                 if filters.category and event_data.get('category') != filters.category:
                     continue
         
-        # Date filtering
-        timestamp = data.get('timestamp', '')
-        if filters.startDate and timestamp < filters.startDate:
-            continue
-        if filters.endDate and timestamp > filters.endDate:
+        # Date filtering (inclusive, compares calendar dates of the timestamp)
+        if not date_in_range(data.get('timestamp'), filters.startDate, filters.endDate):
             continue
         
         filtered_records.append({**data, 'attendanceId': doc.id})
@@ -1361,8 +1585,11 @@ async def approve_od_request(request_id: str, teacher_id: str = Query(...)):
     }
 
 @app.post("/events/{event_id}/register")
-async def register_for_event(event_id: str, registration: EventRegistrationCreate):
-    """Register student for event with optional team members"""
+async def register_for_event(event_id: str, registration: EventRegistrationCreate, background_tasks: BackgroundTasks):
+    """
+    Register student for event with optional team members.
+    Guidance for the event is computed after the response is sent and stored on the registration.
+    """
     validate_firebase()
     
     # Verify event exists
@@ -1404,12 +1631,17 @@ async def register_for_event(event_id: str, registration: EventRegistrationCreat
         "teamName": registration.teamName,
         "teamMembers": [member.dict() for member in registration.teamMembers],
         "registeredAt": datetime.now().isoformat(),
-        "status": "registered"
+        "status": "registered",
+        "guidanceStatus": GuidanceStatus.PENDING.value,
+        "guidanceQueuedAt": datetime.now().isoformat()
     }
     
     # Add to Firestore
     reg_ref = db.collection('event_registrations').document()
     reg_ref.set(registration_data)
+    background_tasks.add_task(
+        compute_registration_guidance, reg_ref.id, event_id, registration.eventTitle, registration.studentId
+    )
     
     return {
         "success": True,
@@ -1458,6 +1690,447 @@ async def get_student_registrations(student_id: str):
         "registrations": results
     }
 
+# ========================
+# EVENT GUIDANCE
+# ========================
+
+# Historical feedback behind registration guidance (the columnar copy is used if converted, see feedback_store.py)
+GUIDANCE_FEEDBACK_PATH = os.getenv("GUIDANCE_FEEDBACK_PATH", "event_feedback_dataset.csv")
+# Seconds after which a still-pending guidance task is presumed lost (e.g. the process restarted) and queued again
+GUIDANCE_PENDING_TIMEOUT = float(os.getenv("GUIDANCE_PENDING_TIMEOUT", "300"))
+
+class GuidanceStatus(str, Enum):
+    PENDING = "pending"
+    READY = "ready"
+    UNAVAILABLE = "unavailable"
+    FAILED = "failed"
+
+# One long-lived guidance system per process; results are shared by students with the same profile
+guidance_system = None
+guidance_error = None
+
+@app.on_event("startup")
+async def load_guidance_system():
+    """Load the feedback history and its per-event indexes once, off the event loop"""
+    global guidance_system, guidance_error
+    try:
+        guidance_system = await asyncio.get_running_loop().run_in_executor(
+            None, EventGuidanceSystem, GUIDANCE_FEEDBACK_PATH)
+        print(f"✅ Event guidance loaded ({len(guidance_system.event_table)} events with feedback history)")
+    except Exception as e:
+        guidance_error = str(e)
+        print(f"⚠️ Event guidance not available: {e}")
+
+def compute_registration_guidance(registration_id: str, event_id: str, event_title: str, student_id: str):
+    """
+    Compute guidance for a registration and store it on the registration document.
+    Runs as a background task after the response has been sent. The event's
+    current title is used (event_title, as stored on the registration, only if
+    the event document is gone).
+    """
+    reg_ref = db.collection('event_registrations').document(registration_id)
+    try:
+        event_doc = db.collection('events').document(event_id).get() if event_id else None
+        if event_doc is not None and event_doc.exists:
+            event_title = event_doc.to_dict().get('title') or event_title
+        
+        if guidance_system is None:
+            reg_ref.update({
+                "guidanceStatus": GuidanceStatus.UNAVAILABLE.value,
+                "guidanceError": f"Guidance not loaded: {guidance_error}"
+            })
+            return
+        
+        user_doc = db.collection('users').document(student_id).get()
+        user_data = user_doc.to_dict() if user_doc.exists else {}
+        # Missing (or unreadable) profile fields only make the similar-student cohort broader
+        try:
+            profile, _ = build_student_profile(user_data, {})
+        except ValueError:
+            profile, _ = build_student_profile({k: v for k, v in user_data.items() if k != "year"}, {})
+        guidance = guidance_system.get_cached_guidance(profile, event_title)
+        
+        if "error" in guidance:
+            reg_ref.update({
+                "guidanceStatus": GuidanceStatus.UNAVAILABLE.value,
+                "guidanceError": guidance["error"]
+            })
+            return
+        reg_ref.update({
+            "guidance": guidance,
+            "guidanceStatus": GuidanceStatus.READY.value,
+            "guidanceComputedAt": datetime.now().isoformat()
+        })
+    except Exception as e:
+        print(f"⚠️ Guidance failed for registration {registration_id}: {e}")
+        try:
+            reg_ref.update({"guidanceStatus": GuidanceStatus.FAILED.value, "guidanceError": str(e)})
+        except Exception as update_error:
+            print(f"❌ Could not record guidance failure for registration {registration_id}: {update_error}")
+
+@app.get("/registrations/{registration_id}/guidance")
+async def get_registration_guidance(registration_id: str, background_tasks: BackgroundTasks):
+    """
+    Precomputed guidance for a registration (for the student dashboard).
+    Registrations made before guidance existed, whose guidance failed, or that have
+    been pending longer than GUIDANCE_PENDING_TIMEOUT are queued again.
+    """
+    validate_firebase()
+    
+    reg_doc = db.collection('event_registrations').document(registration_id).get()
+    if not reg_doc.exists:
+        raise HTTPException(status_code=404, detail="Registration not found")
+    data = reg_doc.to_dict()
+    
+    status = data.get("guidanceStatus")
+    queued_at = data.get("guidanceQueuedAt")
+    stale = status == GuidanceStatus.PENDING.value and (
+        not queued_at or datetime.now() - datetime.fromisoformat(queued_at) > timedelta(seconds=GUIDANCE_PENDING_TIMEOUT)
+    )
+    if status in (None, GuidanceStatus.FAILED.value) or stale:
+        db.collection('event_registrations').document(registration_id).update({
+            "guidanceStatus": GuidanceStatus.PENDING.value,
+            "guidanceQueuedAt": datetime.now().isoformat()
+        })
+        background_tasks.add_task(
+            compute_registration_guidance, registration_id, data.get("eventId"),
+            data.get("eventTitle"), data.get("studentId")
+        )
+        status = GuidanceStatus.PENDING.value
+    
+    return {
+        "registrationId": registration_id,
+        "eventId": data.get("eventId"),
+        "guidanceStatus": status,
+        "guidance": data.get("guidance") if status == GuidanceStatus.READY.value else None,
+        "guidanceError": data.get("guidanceError") if status == GuidanceStatus.UNAVAILABLE.value else None
+    }
+
+# ========================
+# EVENT RECOMMENDATIONS
+# ========================
+
+# Models are loaded once per process at startup; requests are micro-batched
+# (up to RECOMMENDATION_BATCH_SIZE requests or RECOMMENDATION_BATCH_WAIT_MS) into one model call
+RECOMMENDER_MODELS_PATH = os.getenv("RECOMMENDER_MODELS_PATH", ".")
+RECOMMENDATION_BATCH_SIZE = int(os.getenv("RECOMMENDATION_BATCH_SIZE", "32"))
+RECOMMENDATION_BATCH_WAIT_MS = float(os.getenv("RECOMMENDATION_BATCH_WAIT_MS", "5"))
+# Seconds the event catalogue (and its candidate index) is reused before re-reading Firestore
+RECOMMENDATION_CATALOGUE_TTL = float(os.getenv("RECOMMENDATION_CATALOGUE_TTL", "60"))
+# Score small batches with the compiled (flattened-array) tree engine
+RECOMMENDER_COMPILED_TREES = os.getenv("RECOMMENDER_COMPILED_TREES", "1") == "1"
+
+# Seconds between checks for a newly published model version (0 disables hot swapping)
+RECOMMENDER_RELOAD_INTERVAL = float(os.getenv("RECOMMENDER_RELOAD_INTERVAL", "30"))
+
+# Offline-trained ALS factors over registrations/attendance (collaborative_filtering.py); optional
+COLLABORATIVE_MODEL_PATH = os.getenv(
+    "COLLABORATIVE_MODEL_PATH", os.path.join(RECOMMENDER_MODELS_PATH, "collaborative_model.joblib"))
+
+# Share of the ranking score given to text similarity with the student's past registrations
+CONTENT_SCORE_WEIGHT = float(os.getenv("CONTENT_SCORE_WEIGHT", "0.2"))
+
+recommender = None
+recommender_error = None
+collaborative_model = None
+recommendation_batcher = None
+_catalogue_cache = {"index": None, "loadedAt": 0.0}
+_reload_state = {"task": None, "lock": asyncio.Lock()}
+
+def _load_and_warm_recommender():
+    from recommendation_system import EventRecommendationSystem
+    system = EventRecommendationSystem(models_path=RECOMMENDER_MODELS_PATH, compile_trees=RECOMMENDER_COMPILED_TREES)
+    # First predictions pay for lazy imports and allocations - do that now, not on a user request
+    encoders = system.label_encoders
+    warmup_profile = {
+        "branch": encoders["student_branch"].classes_[0],
+        "year": 1,
+        "gender": encoders["gender"].classes_[0],
+        "skill_level": encoders["skill_level"].classes_[0],
+    }
+    warmup_events = [
+        {"name": name, "type": encoders["event_type"].classes_[0], "level": DEFAULT_EVENT_LEVEL, "duration_days": 1}
+        for name in encoders["event_name"].classes_[:8]
+    ]
+    system.predict_many([(warmup_profile, warmup_events, None)])
+    system.result_cache.clear()
+    return system
+
+@app.on_event("startup")
+async def load_recommender():
+    """Load and warm the recommendation models, then start the micro-batcher"""
+    global recommender, recommender_error, recommendation_batcher
+    try:
+        recommender = await asyncio.get_running_loop().run_in_executor(None, _load_and_warm_recommender)
+        recommendation_batcher = RecommendationBatcher(
+            recommender,
+            max_batch_size=RECOMMENDATION_BATCH_SIZE,
+            max_wait_ms=RECOMMENDATION_BATCH_WAIT_MS,
+        )
+        recommendation_batcher.start()
+        if RECOMMENDER_RELOAD_INTERVAL > 0:
+            _reload_state["task"] = asyncio.get_running_loop().create_task(watch_recommender_versions())
+        load_stats = recommender.load_stats
+        print(f"✅ Recommendation models loaded (version {recommender.model_version}, "
+              f"{load_stats['seconds']:.2f}s, +{load_stats['uss_delta_mb']:.1f} MB unique memory"
+              f"{', shared artifacts' if load_stats['shared_artifacts'] else ''})")
+    except Exception as e:
+        recommender_error = str(e)
+        print(f"⚠️ Recommendation models not available: {e}")
+    
+    global collaborative_model
+    if os.path.exists(COLLABORATIVE_MODEL_PATH):
+        try:
+            collaborative_model = CollaborativeRecommender.load(COLLABORATIVE_MODEL_PATH)
+            print(f"✅ Collaborative model loaded ({len(collaborative_model.student_ids)} students, "
+                  f"{len(collaborative_model.event_ids)} events)")
+        except Exception as e:
+            print(f"⚠️ Collaborative model not available: {e}")
+
+event_text_index = EventTextIndex()
+
+@app.on_event("startup")
+async def load_event_text_index():
+    """Index title/description/OCR text of all events for similarity queries"""
+    def _load():
+        if validate_firebase():
+            events = {doc.id: doc.to_dict() for doc in db.collection('events').stream()}
+        else:
+            events = {event['eventId']: event for event in MOCK_EVENTS}
+        event_text_index.build(events)
+        return len(events)
+    
+    try:
+        count = await asyncio.get_running_loop().run_in_executor(None, _load)
+        print(f"✅ Event text index loaded ({count} events)")
+    except Exception as e:
+        print(f"⚠️ Could not load event text index: {e}")
+
+async def reload_recommender_if_changed() -> bool:
+    """
+    Load the CURRENT model version if it differs from the one being served.
+    The new system is loaded and warmed in a worker thread while the old one keeps
+    serving; the swap itself is a reference assignment, picked up by the next batch.
+    """
+    global recommender
+    async with _reload_state["lock"]:
+        if recommender is None or resolve_models_path(RECOMMENDER_MODELS_PATH) == recommender.models_path:
+            return False
+        previous_version = recommender.model_version
+        replacement = await asyncio.get_running_loop().run_in_executor(None, _load_and_warm_recommender)
+        recommender = replacement
+        recommendation_batcher.recommender = replacement
+        print(f"🔄 Recommendation models swapped: {previous_version} -> {replacement.model_version}")
+        return True
+
+async def watch_recommender_versions():
+    """Poll the model root for a newly published version (see incremental_training.py)"""
+    while True:
+        await asyncio.sleep(RECOMMENDER_RELOAD_INTERVAL)
+        try:
+            await reload_recommender_if_changed()
+        except Exception as e:
+            print(f"⚠️ Could not load new recommendation models, keeping the current ones: {e}")
+
+@app.post("/recommendations/reload")
+async def reload_recommendation_models():
+    """Load a newly published model version now instead of waiting for the next poll"""
+    if recommendation_batcher is None:
+        raise HTTPException(status_code=503, detail=f"Recommendation models not loaded: {recommender_error}")
+    try:
+        swapped = await reload_recommender_if_changed()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Could not load new models: {e}")
+    return {"reloaded": swapped, "modelVersion": recommender.model_version}
+
+@app.on_event("shutdown")
+async def stop_recommender():
+    if _reload_state["task"] is not None:
+        _reload_state["task"].cancel()
+    if recommendation_batcher is not None:
+        await recommendation_batcher.stop()
+
+def invalidate_recommendations(event_id: Optional[str] = None):
+    """Refresh the catalogue after an event is created; also drop cached scores when one is edited or deleted"""
+    _catalogue_cache["index"] = None
+    if recommender is not None and event_id:
+        recommender.invalidate_events([event_id])
+
+async def get_candidate_index() -> CandidateIndex:
+    """Candidate index over all events, rebuilt at most every RECOMMENDATION_CATALOGUE_TTL seconds"""
+    now = datetime.now().timestamp()
+    if _catalogue_cache["index"] is not None and now - _catalogue_cache["loadedAt"] < RECOMMENDATION_CATALOGUE_TTL:
+        return _catalogue_cache["index"]
+    
+    if validate_firebase():
+        def _load():
+            return [{**doc.to_dict(), "eventId": doc.id} for doc in db.collection('events').stream()]
+        events = await asyncio.get_running_loop().run_in_executor(None, _load)
+    else:
+        events = [dict(event) for event in MOCK_EVENTS]
+    
+    index = CandidateIndex(events, default_level=DEFAULT_EVENT_LEVEL)
+    _catalogue_cache.update(index=index, loadedAt=now)
+    return index
+
+def _registered_event_ids(student_id: str) -> List[str]:
+    if not validate_firebase():
+        return []
+    query = db.collection('event_registrations').where('studentId', '==', student_id)
+    return [doc.to_dict().get('eventId') for doc in query.stream()]
+
+@app.get("/students/{student_id}/recommendations")
+async def get_student_recommendations(
+    student_id: str,
+    top_n: int = Query(5, ge=1, le=50),
+    branch: Optional[str] = Query(None),
+    year: Optional[int] = Query(None, ge=1, le=6),
+    gender: Optional[str] = Query(None),
+    skill_level: Optional[str] = Query(None),
+    school: Optional[str] = Query(None, description="Defaults to the student's school; campus-wide events are always included"),
+    category: Optional[List[EventCategory]] = Query(None),
+    days_ahead: Optional[int] = Query(None, ge=1, le=365),
+    include_closed: bool = Query(False, description="Include events whose registration deadline has passed")
+):
+    """
+    Top N upcoming events for a student. Profile fields come from the user document; query params override them.
+    Only candidates the student can attend are scored (see candidate_index.py); candidateFilters reports
+    how many events each filter removed.
+    """
+    if recommendation_batcher is None:
+        raise HTTPException(status_code=503, detail=f"Recommendation models not loaded: {recommender_error}")
+    
+    if validate_firebase():
+        user_doc = db.collection('users').document(student_id).get()
+        user_data = user_doc.to_dict() if user_doc.exists else {}
+    else:
+        user_data = MOCK_STUDENTS_DATA.get(student_id, {})
+    
+    try:
+        profile, missing = build_student_profile(user_data, {
+            "branch": branch, "year": year, "gender": gender, "skill_level": skill_level
+        })
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid student profile: {e}")
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Student profile is missing: {', '.join(missing)}")
+    
+    index = await get_candidate_index()
+    today = datetime.now().date()
+    school = school or user_data.get('school')
+    schools = None
+    if school:
+        # Events organised outside the schools (Student Affairs, clubs, ...) are open to everyone
+        schools = {school} | {value for value in index.values("school") if value not in AMITY_SCHOOLS}
+    registered = await asyncio.get_running_loop().run_in_executor(None, _registered_event_ids, student_id)
+    candidates = index.query(
+        date_from=today,
+        date_to=today + timedelta(days=days_ahead) if days_ahead else None,
+        registration_open_on=None if include_closed else today,
+        exclude_ids=registered,
+        schools=schools,
+        types=[value.value for value in category] if category else None,
+    )
+    
+    catalogue = candidates.events
+    events = [event_to_recommender_input(event['eventId'], event) for event in catalogue]
+    predictions = await recommendation_batcher.predict(profile, events) if events else []
+    
+    event_ids = [event['id'] for event in events]
+    confidences = [prediction['confidence'] for prediction in predictions]
+    if collaborative_model is not None and events:
+        blended = collaborative_model.blend(student_id, event_ids, confidences)
+        scores = blended['score'].tolist()
+        collaborative_scores = [None if math.isnan(value) else round(value, 4) for value in blended['collaborative'].tolist()]
+    else:
+        scores = confidences
+        collaborative_scores = [None] * len(events)
+    
+    # Text similarity to past registrations also covers new events nobody has registered for yet
+    content_scores = [None] * len(events)
+    if registered and events:
+        for i, value in enumerate(event_text_index.content_scores(registered, event_ids).tolist()):
+            if not math.isnan(value):
+                content_scores[i] = round(value, 4)
+                scores[i] = (1 - CONTENT_SCORE_WEIGHT) * scores[i] + CONTENT_SCORE_WEIGHT * value
+    
+    ranked = sorted(
+        zip(catalogue, predictions, scores, collaborative_scores, content_scores),
+        key=lambda item: (item[2], item[1]['predicted_satisfaction']),
+        reverse=True
+    )[:top_n]
+    
+    return {
+        "studentId": student_id,
+        "modelVersion": recommender.model_version,
+        "totalCandidates": len(events),
+        "candidateFilters": candidates.diagnostics_dict(),
+        "recommendations": [
+            {
+                "eventId": event['eventId'],
+                "title": event.get('title'),
+                "category": event.get('category'),
+                "date": event.get('date'),
+                "school": event.get('school'),
+                "score": round(score, 4),
+                "confidence": round(prediction['confidence'], 4),
+                "collaborativeScore": collaborative_score,
+                "contentScore": content_score,
+                "predictedSatisfaction": round(prediction['predicted_satisfaction'], 2),
+                "recommendation": prediction['recommendation_text'],
+                "wouldRecommend": prediction['would_recommend'],
+            }
+            for event, prediction, score, collaborative_score, content_score in ranked
+        ]
+    }
+
+@app.get("/events/{event_id}/similar")
+async def get_similar_events(event_id: str, k: int = Query(10, ge=1, le=50)):
+    """Events with the most similar title/description/poster text (TF-IDF cosine)"""
+    similar = event_text_index.similar(event_id, k)
+    if similar is None:
+        raise HTTPException(status_code=404, detail="Event not found")
+    index = await get_candidate_index()
+    results = []
+    for other_id, similarity in similar:
+        event = index.get(other_id) or {}
+        results.append({
+            "eventId": other_id,
+            "title": event.get('title'),
+            "category": event.get('category'),
+            "date": event.get('date'),
+            "similarity": round(similarity, 4),
+        })
+    return {"eventId": event_id, "similarEvents": results}
+
+def _require_collaborative_model():
+    if collaborative_model is None:
+        raise HTTPException(status_code=503, detail="Collaborative model not loaded (train it with collaborative_filtering.py)")
+
+@app.get("/students/{student_id}/similar")
+async def get_similar_students(student_id: str, k: int = Query(10, ge=1, le=50)):
+    """Students with similar registration/attendance history"""
+    _require_collaborative_model()
+    similar = collaborative_model.similar_students(student_id, k)
+    if similar is None:
+        raise HTTPException(status_code=404, detail="No registration history for this student")
+    return {
+        "studentId": student_id,
+        "similarStudents": [{"studentId": item["id"], "similarity": round(item["similarity"], 4)} for item in similar]
+    }
+
+@app.get("/events/{event_id}/similar-audience")
+async def get_similar_audience_events(event_id: str, k: int = Query(10, ge=1, le=50)):
+    """Events attended by the same kind of students as this one"""
+    _require_collaborative_model()
+    similar = collaborative_model.similar_events(event_id, k)
+    if similar is None:
+        raise HTTPException(status_code=404, detail="No registrations for this event")
+    return {
+        "eventId": event_id,
+        "similarEvents": [{"eventId": item["id"], "similarity": round(item["similarity"], 4)} for item in similar]
+    }
+
 # Run server
 if __name__ == "__main__":
     import uvicorn
@@ -1,20 +1,129 @@
 """
 Event Guidance System
 Provides recommendations and advice to students based on past event feedback
+
+Every event-level statistic (rating means, best team size, top-performer
+stats) is computed once at load time with a groupby and kept in
+`event_table`, indexed by event name. Satisfaction ranges come from quantile
+sketches per event and per cohort (feedback_indexes.SatisfactionSketches). Issue reports are kept as
+per-event counts (feedback_indexes.IssueIndex) and similar-student cohorts
+as per-event bitmaps (feedback_indexes.CohortIndex). A guidance request is a
+lookup in those plus the parts that depend on the student. New feedback is
+folded in with add_feedback() without reloading the dataset.
 """
 
+import threading
+from collections import OrderedDict
+
 import pandas as pd
 import numpy as np
-from collections import Counter
 import warnings
+
+from feedback_indexes import IssueIndex, CohortIndex, SatisfactionSketches, COHORT_FIELDS
+from feedback_store import load_feedback, append_feedback
 warnings.filterwarnings('ignore')
 
+RATING_COLUMNS = [
+    'venue_rating', 'organization_rating', 'content_quality', 'mentor_support',
+    'food_quality', 'networking_opportunities', 'time_management', 'infrastructure',
+    'registration_process', 'learning_outcome',
+]
+CONCERN_AREAS = {
+    'venue_rating': 'Venue Quality',
+    'organization_rating': 'Organization & Coordination',
+    'content_quality': 'Content Quality',
+    'mentor_support': 'Mentor Support',
+    'food_quality': 'Food & Refreshments',
+    'infrastructure': 'Infrastructure & Facilities',
+    'time_management': 'Time Management',
+    'registration_process': 'Registration Process'
+}
+STRENGTH_AREAS = {
+    'venue_rating': 'Venue Quality',
+    'organization_rating': 'Organization & Coordination',
+    'content_quality': 'Content Quality',
+    'mentor_support': 'Mentor Support',
+    'networking_opportunities': 'Networking Opportunities',
+    'learning_outcome': 'Learning Outcome',
+    'infrastructure': 'Infrastructure'
+}
+PRIZE_ACHIEVEMENTS = ['Won Prize', 'Runner Up']
+# Guidance results kept by get_cached_guidance (one per event x branch x year x skill level)
+GUIDANCE_CACHE_SIZE = 4096
+
+
+def build_event_table(df):
+    """
+    One row per event_name with every event-level statistic the guidance uses:
+    event type and duration, attendee count, mean of each rating,
+    overall_satisfaction and would_recommend, the team size with the highest
+    mean satisfaction, and stats over successful participants (satisfaction
+    >= 8 and would recommend). Satisfaction quartiles come from
+    SatisfactionSketches instead, so new feedback does not need the raw rows.
+    """
+    events = df.groupby('event_name', sort=False, observed=True)
+    table = events.agg(
+        event_type=('event_type', 'first'),
+        event_duration_days=('event_duration_days', 'first'),
+        attendees=('event_name', 'size'),
+    )
+    table = table.join(events[RATING_COLUMNS + ['overall_satisfaction', 'would_recommend']].mean())
+
+    # Team sizes ascending, so ties go to the smallest size (as Series.idxmax would)
+    team_satisfaction = df.groupby(['event_name', 'team_size'], observed=True)['overall_satisfaction'].mean().unstack()
+    table['best_team_size'] = team_satisfaction.idxmax(axis=1)
+
+    successful = df[(df['overall_satisfaction'] >= 8.0) & (df['would_recommend'] == 1)]
+    by_event = successful.groupby('event_name', observed=True)
+    table['successful'] = by_event.size()
+    table['successful'] = table['successful'].fillna(0).astype(int)
+    table['successful_solo_pct'] = (successful['participated_alone'] == 1).groupby(successful['event_name'], observed=True).mean() * 100
+    table['successful_content_quality'] = by_event['content_quality'].mean()
+    table['successful_networking'] = by_event['networking_opportunities'].mean()
+    winners = successful[successful['achievement'].isin(PRIZE_ACHIEVEMENTS)]
+    table['winner_learning_outcome'] = winners.groupby('event_name', observed=True)['learning_outcome'].mean()
+    skill_counts = successful.groupby(['event_name', 'skill_level'], observed=True).size().unstack()
+    table['successful_skill_level'] = skill_counts.idxmax(axis=1)
+    return table
+
+
 class EventGuidanceSystem:
-    def __init__(self):
-        """Initialize by loading historical feedback data"""
+    def __init__(self, data_path='event_feedback_dataset.csv', cache_size=GUIDANCE_CACHE_SIZE):
+        """Initialize by loading historical feedback data (columnar copy if converted)"""
         print("Loading historical event feedback data...")
-        self.df = pd.read_csv('event_feedback_dataset.csv')
+        self.df = load_feedback(data_path)
         print(f"✓ Loaded {len(self.df):,} feedback records from past events\n")
+        self._build_indexes()
+        self.cache_size = cache_size
+        self._guidance_cache = OrderedDict()   # (event, branch, year, skill level) -> guidance (LRU order)
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+    
+    def _build_indexes(self):
+        """Per-event statistics table, issue counts and similar-student cohort bitmaps"""
+        self.event_table = build_event_table(self.df)
+        self._event_stats = self.event_table.to_dict('index')
+        self.issue_index = IssueIndex.from_feedback(self.df)
+        self.cohort_index = CohortIndex.from_feedback(self.df)
+        self.satisfaction_sketches = SatisfactionSketches.from_feedback(self.df)
+    
+    def add_feedback(self, feedback):
+        """
+        Fold new feedback rows into the loaded data. Issue counts, cohort
+        bitmaps and satisfaction sketches are updated in place; the statistics
+        table is recomputed for the affected events only.
+        """
+        self.df = append_feedback(self.df, feedback)
+        affected = list(pd.unique(feedback['event_name'].astype(object)))
+        self.issue_index.add(feedback)
+        self.cohort_index.add(feedback)
+        self.satisfaction_sketches.add(feedback)
+        updated = build_event_table(self.df[self.df['event_name'].isin(affected)])
+        self.event_table = pd.concat([self.event_table.drop(index=affected, errors='ignore'), updated])
+        self._event_stats.update(updated.to_dict('index'))
+        with self._cache_lock:
+            self._guidance_cache.clear()
     
     def get_recommendations_for_registered_event(self, student_profile, event_name):
         """
@@ -23,99 +132,175 @@ class EventGuidanceSystem:
         Args:
             student_profile: dict with student information
             event_name: name of event student registered for
-            
+        
         Returns:
             dict with recommendations, warnings, tips, and insights
         """
-        # Get all past feedback for this event
-        event_feedback = self.df[self.df['event_name'] == event_name]
+        stats = self._event_stats.get(event_name)
         
-        if len(event_feedback) == 0:
+        if stats is None:
             return {"error": f"No historical data found for {event_name}"}
         
-        # Get feedback from similar students
-        similar_students = event_feedback[
-            (event_feedback['student_branch'] == student_profile.get('branch', '')) |
-            (event_feedback['student_year'] == student_profile.get('year', 0)) |
-            (event_feedback['skill_level'] == student_profile.get('skill_level', ''))
-        ]
-        
-        if len(similar_students) == 0:
-            similar_students = event_feedback
+        # Get feedback from similar students (same branch, year or skill level)
+        similar_count, similar_satisfaction = self.cohort_index.similar_satisfaction(event_name, student_profile)
         
         # Analyze feedback
         guidance = {
             'event_name': event_name,
-            'event_type': event_feedback.iloc[0]['event_type'],
-            'total_past_attendees': len(event_feedback),
-            'similar_profile_attendees': len(similar_students),
-            'overall_satisfaction': event_feedback['overall_satisfaction'].mean(),
-            'recommendation_rate': event_feedback['would_recommend'].mean() * 100,
+            'event_type': stats['event_type'],
+            'total_past_attendees': stats['attendees'],
+            'similar_profile_attendees': similar_count,
+            'overall_satisfaction': stats['overall_satisfaction'],
+            'recommendation_rate': stats['would_recommend'] * 100,
         }
         
         # 1. COMMON ISSUES & WARNINGS
-        guidance['common_issues'] = self._analyze_common_issues(event_feedback)
+        guidance['common_issues'] = self._analyze_common_issues(event_name)
         
         # 2. AREAS OF CONCERN (Low ratings)
-        guidance['areas_of_concern'] = self._identify_concerns(event_feedback)
+        guidance['areas_of_concern'] = self._identify_concerns(stats)
         
         # 3. SUCCESS FACTORS (High ratings)
-        guidance['strengths'] = self._identify_strengths(event_feedback)
+        guidance['strengths'] = self._identify_strengths(stats)
         
         # 4. ACTIONABLE RECOMMENDATIONS
-        guidance['recommendations'] = self._generate_recommendations(
-            event_feedback, similar_students, student_profile
-        )
+        guidance['recommendations'] = self._generate_recommendations(stats, student_profile)
         
         # 5. SUCCESS TIPS from high performers
-        guidance['success_tips'] = self._get_success_tips(event_feedback, student_profile)
+        guidance['success_tips'] = self._get_success_tips(stats, student_profile)
         
         # 6. WHAT TO EXPECT
-        guidance['expectations'] = self._set_expectations(event_feedback, similar_students)
+        guidance['expectations'] = self._set_expectations(
+            event_name, stats, student_profile, similar_count, similar_satisfaction
+        )
         
         # 7. PREPARATION ADVICE
-        guidance['preparation'] = self._get_preparation_advice(event_feedback, student_profile)
+        guidance['preparation'] = self._get_preparation_advice(stats, student_profile)
         
         return guidance
     
-    def _analyze_common_issues(self, event_feedback):
-        """Find most common issues faced by past attendees"""
-        all_issues = []
-        for issues_str in event_feedback['issues_faced'].values:
-            if issues_str and str(issues_str) != 'None' and str(issues_str) != 'nan':
-                all_issues.extend([issue.strip() for issue in str(issues_str).split(',')])
-        
-        issue_counts = Counter(all_issues)
-        total_attendees = len(event_feedback)
-        
-        common_issues = []
-        for issue, count in issue_counts.most_common(5):
-            if issue and issue != 'None':
-                percentage = (count / total_attendees) * 100
-                common_issues.append({
-                    'issue': issue,
-                    'reported_by': count,
-                    'percentage': percentage
-                })
-        
-        return common_issues
+    def get_cached_guidance(self, student_profile, event_name):
+        """
+        get_recommendations_for_registered_event, memoized per (event, branch,
+        year, skill level) - the only profile fields the guidance depends on.
+        Students with the same profile share one result dict; treat it as read-only.
+        """
+        key = (event_name, student_profile.get('branch', ''), student_profile.get('year', 0),
+               student_profile.get('skill_level', ''))
+        with self._cache_lock:
+            guidance = self._guidance_cache.get(key)
+            if guidance is not None:
+                self._guidance_cache.move_to_end(key)
+                self.cache_hits += 1
+                return guidance
+            self.cache_misses += 1
+        
+        guidance = self.get_recommendations_for_registered_event(student_profile, event_name)
+        with self._cache_lock:
+            self._guidance_cache[key] = guidance
+            while len(self._guidance_cache) > self.cache_size:
+                self._guidance_cache.popitem(last=False)
+        return guidance
     
-    def _identify_concerns(self, event_feedback):
-        """Identify areas with low ratings"""
-        rating_columns = {
-            'venue_rating': 'Venue Quality',
-            'organization_rating': 'Organization & Coordination',
-            'content_quality': 'Content Quality',
-            'mentor_support': 'Mentor Support',
-            'food_quality': 'Food & Refreshments',
-            'infrastructure': 'Infrastructure & Facilities',
-            'time_management': 'Time Management',
-            'registration_process': 'Registration Process'
+    def get_batch_guidance(self, event_name, student_profiles):
+        """
+        Guidance for every student registered for one event, as an iterator
+        in input order.
+        
+        The event-level sections (issues, concerns, strengths, success tips,
+        preparation) are computed once and shared by all yielded dicts. The
+        similar-student cohort is computed for all students at once from
+        per-(branch, year, skill level) satisfaction totals, and cohort ranges
+        once per distinct profile. Each dict has the same fields as
+        get_recommendations_for_registered_event (cohort means agree up to
+        floating-point rounding).
+        
+        Raises:
+            KeyError: if there is no historical data for the event (raised
+                before anything is yielded)
+        """
+        stats = self._event_stats.get(event_name)
+        if stats is None:
+            raise KeyError(f"No historical data found for {event_name}")
+        
+        profiles = list(student_profiles)
+        similar_counts, similar_means = self._batch_cohort_satisfaction(event_name, profiles)
+        q25, q75 = self.satisfaction_sketches.event_quantiles(event_name)
+        
+        shared = {
+            'event_name': event_name,
+            'event_type': stats['event_type'],
+            'total_past_attendees': stats['attendees'],
+            'overall_satisfaction': stats['overall_satisfaction'],
+            'recommendation_rate': stats['would_recommend'] * 100,
+            'common_issues': self._analyze_common_issues(event_name),
+            'areas_of_concern': self._identify_concerns(stats),
+            'strengths': self._identify_strengths(stats),
+            'success_tips': self._get_success_tips(stats, {}),
+            'preparation': self._get_preparation_advice(stats, {}),
+        }
+        event_recommendations = self._event_recommendations(stats)
+        expectations = {
+            'satisfaction_range': {'min': q25, 'max': q75, 'average': stats['overall_satisfaction']},
+            'likely_outcome': 'Positive' if stats['overall_satisfaction'] >= 7.0 else 'Mixed',
+            'recommendation_likelihood': stats['would_recommend'] * 100,
         }
         
+        def personalised():
+            ranges = {}
+            for profile, similar_count, similar_mean in zip(profiles, similar_counts, similar_means):
+                key = tuple(profile.get(field) for field in COHORT_FIELDS)
+                if key not in ranges:
+                    ranges[key] = self.satisfaction_sketches.cohort_quantiles(event_name, profile) or [q25, q75]
+                guidance = dict(shared)
+                guidance['similar_profile_attendees'] = int(similar_count)
+                guidance['recommendations'] = event_recommendations + self._student_recommendations(profile)
+                guidance['expectations'] = {
+                    **expectations,
+                    'similar_students_satisfaction': float(similar_mean),
+                    'similar_students_range': {'min': ranges[key][0], 'max': ranges[key][1]},
+                }
+                yield guidance
+        
+        return personalised()
+    
+    def _batch_cohort_satisfaction(self, event_name, profiles):
+        """
+        (students, mean satisfaction) of each profile's similar-student cohort:
+        a students x cells match matrix times per-cell counts and sums.
+        """
+        event = self.df[self.df['event_name'] == event_name]
+        columns = list(COHORT_FIELDS.values())
+        cells = event.groupby(columns, observed=True, dropna=False)['overall_satisfaction'].agg(['size', 'sum'])
+        defaults = {'branch': '', 'year': 0, 'skill_level': ''}
+        
+        matches = np.zeros((len(profiles), len(cells)), dtype=bool)
+        for level, field in enumerate(COHORT_FIELDS):
+            # Integer codes per distinct cell value; missing cell values get -2 and
+            # profile values not seen at the event -1, so neither ever matches
+            cell_values = cells.index.get_level_values(level)
+            codes = {value: code for code, value in enumerate(pd.unique(cell_values.dropna()))}
+            cell_codes = np.array([codes.get(value, -2) for value in cell_values], dtype=np.int64)
+            profile_codes = np.array([codes.get(profile.get(field, defaults[field]), -1) for profile in profiles],
+                                     dtype=np.int64)
+            matches |= profile_codes[:, None] == cell_codes[None, :]
+        
+        counts = matches @ cells['size'].to_numpy(dtype=np.float64)
+        sums = matches @ cells['sum'].to_numpy(dtype=np.float64)
+        nobody = counts == 0
+        counts[nobody] = len(event)
+        sums[nobody] = event['overall_satisfaction'].sum()
+        return counts.astype(np.int64), sums / np.maximum(counts, 1)
+    
+    def _analyze_common_issues(self, event_name):
+        """Find most common issues faced by past attendees (precomputed counts)"""
+        return self.issue_index.top_issues(event_name)
+    
+    def _identify_concerns(self, stats):
+        """Identify areas with low ratings"""
         concerns = []
-        for col, label in rating_columns.items():
-            avg_rating = event_feedback[col].mean()
+        for col, label in CONCERN_AREAS.items():
+            avg_rating = stats[col]
             if avg_rating < 7.0:
                 concerns.append({
                     'area': label,
@@ -125,21 +310,11 @@ class EventGuidanceSystem:
         
         return sorted(concerns, key=lambda x: x['average_rating'])
     
-    def _identify_strengths(self, event_feedback):
+    def _identify_strengths(self, stats):
         """Identify areas with high ratings"""
-        rating_columns = {
-            'venue_rating': 'Venue Quality',
-            'organization_rating': 'Organization & Coordination',
-            'content_quality': 'Content Quality',
-            'mentor_support': 'Mentor Support',
-            'networking_opportunities': 'Networking Opportunities',
-            'learning_outcome': 'Learning Outcome',
-            'infrastructure': 'Infrastructure'
-        }
-        
         strengths = []
-        for col, label in rating_columns.items():
-            avg_rating = event_feedback[col].mean()
+        for col, label in STRENGTH_AREAS.items():
+            avg_rating = stats[col]
             if avg_rating >= 7.5:
                 strengths.append({
                     'area': label,
@@ -148,40 +323,44 @@ class EventGuidanceSystem:
         
         return sorted(strengths, key=lambda x: x['average_rating'], reverse=True)
     
-    def _generate_recommendations(self, event_feedback, similar_students, student_profile):
+    def _generate_recommendations(self, stats, student_profile):
         """Generate actionable recommendations based on past feedback"""
+        return self._event_recommendations(stats) + self._student_recommendations(student_profile)
+    
+    def _event_recommendations(self, stats):
+        """Recommendations that depend only on the event's past feedback"""
         recommendations = []
         
         # Based on common issues
-        if event_feedback['organization_rating'].mean() < 7.0:
+        if stats['organization_rating'] < 7.0:
             recommendations.append({
                 'category': 'Organization',
                 'advice': 'Past attendees reported coordination issues. Arrive early, keep emergency contacts handy, and be patient with organizers.',
                 'priority': 'High'
             })
         
-        if event_feedback['mentor_support'].mean() < 7.0:
+        if stats['mentor_support'] < 7.0:
             recommendations.append({
                 'category': 'Mentorship',
                 'advice': 'Mentor availability was limited. Prepare your questions in advance and try to connect with mentors early.',
                 'priority': 'High'
             })
         
-        if event_feedback['food_quality'].mean() < 6.5:
+        if stats['food_quality'] < 6.5:
             recommendations.append({
                 'category': 'Food',
                 'advice': 'Food quality received low ratings. Consider bringing your own snacks and water.',
                 'priority': 'Medium'
             })
         
-        if event_feedback['infrastructure'].mean() < 7.0:
+        if stats['infrastructure'] < 7.0:
             recommendations.append({
                 'category': 'Technical Setup',
                 'advice': 'Infrastructure issues were common. Bring backup chargers, power banks, and essential equipment.',
                 'priority': 'High'
             })
         
-        if event_feedback['time_management'].mean() < 7.0:
+        if stats['time_management'] < 7.0:
             recommendations.append({
                 'category': 'Time Management',
                 'advice': 'Timing issues were reported. Plan your schedule with buffer time and prioritize tasks.',
@@ -189,17 +368,19 @@ class EventGuidanceSystem:
             })
         
         # Event-specific recommendations
-        event_type = event_feedback.iloc[0]['event_type']
+        if stats['event_type'] == 'Hackathon' and pd.notna(stats['best_team_size']):
+            best_team_size = int(stats['best_team_size'])
+            recommendations.append({
+                'category': 'Team Formation',
+                'advice': f'Data shows teams of {best_team_size} members had highest satisfaction. Form your team before the event.',
+                'priority': 'High'
+            })
         
-        if event_type == 'Hackathon':
-            team_stats = event_feedback.groupby('team_size')['overall_satisfaction'].mean()
-            if len(team_stats) > 0:
-                best_team_size = team_stats.idxmax()
-                recommendations.append({
-                    'category': 'Team Formation',
-                    'advice': f'Data shows teams of {best_team_size} members had highest satisfaction. Form your team before the event.',
-                    'priority': 'High'
-                })
+        return recommendations
+    
+    def _student_recommendations(self, student_profile):
+        """Recommendations that depend on the student's profile"""
+        recommendations = []
         
         if student_profile.get('skill_level') == 'Beginner':
             recommendations.append({
@@ -210,66 +391,61 @@ class EventGuidanceSystem:
         
         return recommendations
     
-    def _get_success_tips(self, event_feedback, student_profile):
-        """Get tips from successful participants"""
-        # Define successful participants
-        successful = event_feedback[
-            (event_feedback['overall_satisfaction'] >= 8.0) &
-            (event_feedback['would_recommend'] == 1)
-        ]
-        
-        if len(successful) == 0:
+    def _get_success_tips(self, stats, student_profile):
+        """Get tips from successful participants (satisfaction >= 8 and would recommend)"""
+        if stats['successful'] == 0:
             return []
         
         tips = []
         
         # Team participation
-        solo_success = len(successful[successful['participated_alone'] == 1]) / len(successful) * 100
-        if solo_success < 20:
+        if stats['successful_solo_pct'] < 20:
             tips.append("Most successful participants came with teams. Teamwork is key!")
         
         # Achievement patterns
-        winners = successful[successful['achievement'].isin(['Won Prize', 'Runner Up'])]
-        if len(winners) > 0:
-            avg_learning = winners['learning_outcome'].mean()
+        if pd.notna(stats['winner_learning_outcome']):
+            avg_learning = stats['winner_learning_outcome']
             tips.append(f"Prize winners had average learning outcome of {avg_learning:.1f}/10. Focus on learning!")
         
         # Skill level insights
-        skill_success = successful.groupby('skill_level').size()
-        if len(skill_success) > 0:
-            tips.append(f"Successful participants were mostly {skill_success.idxmax()} level. Set realistic expectations.")
+        tips.append(f"Successful participants were mostly {stats['successful_skill_level']} level. Set realistic expectations.")
         
         # Content quality correlation
-        if successful['content_quality'].mean() >= 8.0:
+        if stats['successful_content_quality'] >= 8.0:
             tips.append("High content engagement correlates with success. Participate actively in all sessions.")
         
         # Networking
-        if successful['networking_opportunities'].mean() >= 8.0:
+        if stats['successful_networking'] >= 8.0:
             tips.append("Successful participants leveraged networking. Don't hesitate to connect with others.")
         
         return tips
     
-    def _set_expectations(self, event_feedback, similar_students):
-        """Set realistic expectations based on past data"""
+    def _set_expectations(self, event_name, stats, student_profile, similar_count, similar_satisfaction):
+        """Set realistic expectations based on past data (quartiles from the satisfaction sketches)"""
+        q25, q75 = self.satisfaction_sketches.event_quantiles(event_name)
         expectations = {
             'satisfaction_range': {
-                'min': event_feedback['overall_satisfaction'].quantile(0.25),
-                'max': event_feedback['overall_satisfaction'].quantile(0.75),
-                'average': event_feedback['overall_satisfaction'].mean()
+                'min': q25,
+                'max': q75,
+                'average': stats['overall_satisfaction']
             },
-            'likely_outcome': 'Positive' if event_feedback['overall_satisfaction'].mean() >= 7.0 else 'Mixed',
-            'recommendation_likelihood': event_feedback['would_recommend'].mean() * 100
+            'likely_outcome': 'Positive' if stats['overall_satisfaction'] >= 7.0 else 'Mixed',
+            'recommendation_likelihood': stats['would_recommend'] * 100
         }
         
-        if len(similar_students) > 0:
-            expectations['similar_students_satisfaction'] = similar_students['overall_satisfaction'].mean()
+        if similar_count > 0:
+            expectations['similar_students_satisfaction'] = similar_satisfaction
+        
+        # Same cohort as similar_students_satisfaction: the whole event when nobody matches
+        similar_range = self.satisfaction_sketches.cohort_quantiles(event_name, student_profile) or [q25, q75]
+        expectations['similar_students_range'] = {'min': similar_range[0], 'max': similar_range[1]}
         
         return expectations
     
-    def _get_preparation_advice(self, event_feedback, student_profile):
+    def _get_preparation_advice(self, stats, student_profile):
         """Provide preparation checklist"""
-        event_type = event_feedback.iloc[0]['event_type']
-        duration = event_feedback.iloc[0]['event_duration_days']
+        event_type = stats['event_type']
+        duration = stats['event_duration_days']
         
         checklist = []
         
@@ -309,7 +485,7 @@ class EventGuidanceSystem:
                 'description': 'Have 2-3 project ideas ready to pitch'
             })
         
-        if event_feedback['mentor_support'].mean() < 7.0:
+        if stats['mentor_support'] < 7.0:
             checklist.append({
                 'item': 'Questions List',
                 'description': 'Write down questions to ask mentors when available'
@@ -384,6 +560,8 @@ def print_guidance(guidance):
     print(f"  Overall Outlook: {exp['likely_outcome']}")
     if 'similar_students_satisfaction' in exp:
         print(f"  Students like you rated: {exp['similar_students_satisfaction']:.2f}/10")
+    if 'similar_students_range' in exp:
+        print(f"  Students like you ranged: {exp['similar_students_range']['min']:.2f} - {exp['similar_students_range']['max']:.2f}/10")
     
     # Preparation Checklist
     if guidance['preparation']:
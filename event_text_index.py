@@ -0,0 +1,243 @@
+"""
+Event Text Similarity Index
+"More like this" over event text (title, description, OCR rawText).
+
+Text is turned into hashed word 1-2 gram counts (HashingVectorizer), so
+adding an event never refits a vocabulary: each event is tokenized once, when
+it is created or updated. Document frequencies are kept as a running count
+per hashed feature. The TF-IDF matrix (sublinear tf x smoothed idf, rows L2
+normalized) is rebuilt from the stored count rows only when a query arrives
+after a change. A query is one sparse matrix-vector product plus an
+argpartition for the top k.
+
+Usage:
+    index = EventTextIndex()
+    index.upsert("evt1", {"title": ..., "description": ..., "rawText": ...})
+    index.similar("evt1", k=5)                    # [(event_id, cosine), ...]
+    index.content_scores(["evt1"], candidate_ids)  # recommender feature
+
+Benchmark:
+    python event_text_index.py --events 10000
+"""
+
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer
+
+TEXT_FIELDS = ["title", "description", "rawText"]
+# Title words are repeated so a shared title term outweighs a shared OCR term
+TITLE_WEIGHT = 2
+N_FEATURES = 2 ** 18
+
+
+def event_text(event_data: Dict[str, Any]) -> str:
+    title = event_data.get("title") or ""
+    parts = [title] * TITLE_WEIGHT + [event_data.get(field) or "" for field in TEXT_FIELDS if field != "title"]
+    return " ".join(part for part in parts if part)
+
+
+class EventTextIndex:
+    """Incrementally maintained TF-IDF index with cosine top-k queries"""
+
+    def __init__(self, n_features: int = N_FEATURES):
+        self.vectorizer = HashingVectorizer(
+            n_features=n_features, ngram_range=(1, 2), stop_words="english",
+            alternate_sign=False, norm=None,
+        )
+        self._counts: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}   # event id -> (feature indices, counts)
+        self._document_frequency = np.zeros(n_features, dtype=np.int64)
+        self._lock = threading.Lock()
+        self._matrix: Optional[sparse.csr_matrix] = None
+        self._ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __contains__(self, event_id: str) -> bool:
+        return str(event_id) in self._counts
+
+    def _vectorize(self, text: str) -> sparse.csr_matrix:
+        return self.vectorizer.transform([text]).tocsr()
+
+    @staticmethod
+    def _row(counts: sparse.csr_matrix, i: int = 0) -> Tuple[np.ndarray, np.ndarray]:
+        start, end = counts.indptr[i], counts.indptr[i + 1]
+        return counts.indices[start:end].copy(), counts.data[start:end].copy()
+
+    def upsert(self, event_id: str, event_data: Dict[str, Any]):
+        """Add an event or replace its text"""
+        row = self._row(self._vectorize(event_text(event_data)))
+        with self._lock:
+            self._remove_locked(str(event_id))
+            self._counts[str(event_id)] = row
+            self._document_frequency[row[0]] += 1
+            self._matrix = None
+
+    def remove(self, event_id: str):
+        with self._lock:
+            self._remove_locked(str(event_id))
+
+    def _remove_locked(self, event_id: str):
+        previous = self._counts.pop(event_id, None)
+        if previous is not None:
+            self._document_frequency[previous[0]] -= 1
+            self._matrix = None
+
+    def build(self, events: Dict[str, Dict[str, Any]]):
+        """Index many events at once (one vectorizer call)"""
+        ids = [str(event_id) for event_id in events]
+        if not ids:
+            return
+        counts = self.vectorizer.transform([event_text(data) for data in events.values()]).tocsr()
+        with self._lock:
+            for i, event_id in enumerate(ids):
+                self._remove_locked(event_id)
+                row = self._row(counts, i)
+                self._counts[event_id] = row
+                self._document_frequency[row[0]] += 1
+            self._matrix = None
+
+    def _idf(self) -> np.ndarray:
+        n_documents = len(self._counts)
+        return np.log((1 + n_documents) / (1 + self._document_frequency)) + 1.0
+
+    def _weigh(self, counts: sparse.csr_matrix, idf: np.ndarray) -> sparse.csr_matrix:
+        weighted = counts.astype(np.float64)
+        weighted.data = 1.0 + np.log(weighted.data)
+        weighted = weighted.multiply(idf[np.newaxis, :]).tocsr()
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        return sparse.diags(1.0 / np.maximum(norms, 1e-12)) @ weighted
+
+    def _snapshot(self) -> Tuple[sparse.csr_matrix, List[str], Dict[str, int], np.ndarray]:
+        """Normalized TF-IDF matrix, rebuilt only after changes"""
+        with self._lock:
+            if self._matrix is None:
+                self._ids = list(self._counts)
+                self._positions = {event_id: i for i, event_id in enumerate(self._ids)}
+                self._idf_values = self._idf()
+                rows = [self._counts[event_id] for event_id in self._ids]
+                indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+                np.cumsum([len(indices) for indices, _ in rows], out=indptr[1:])
+                stacked = sparse.csr_matrix(
+                    (np.concatenate([data for _, data in rows]) if rows else np.empty(0),
+                     np.concatenate([indices for indices, _ in rows]) if rows else np.empty(0, dtype=np.int32),
+                     indptr),
+                    shape=(len(rows), self._document_frequency.shape[0]))
+                self._matrix = self._weigh(stacked, self._idf_values).tocsr()
+            return self._matrix, self._ids, self._positions, self._idf_values
+
+    @staticmethod
+    def _dense(row: sparse.csr_matrix) -> np.ndarray:
+        # CSR x dense vector is one pass over the matrix; sparse x sparse is far slower here
+        return row.toarray().ravel()
+
+    @staticmethod
+    def _top_k(similarity: np.ndarray, k: int, exclude: Optional[int] = None) -> np.ndarray:
+        if exclude is not None:
+            similarity[exclude] = -np.inf
+        k = min(k, len(similarity) - (exclude is not None))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64)
+        top = np.argpartition(-similarity, k - 1)[:k]
+        return top[np.argsort(-similarity[top], kind="stable")]
+
+    def similar(self, event_id: str, k: int = 10) -> Optional[List[Tuple[str, float]]]:
+        """Most similar other events by cosine over TF-IDF; None if the event is not indexed"""
+        matrix, ids, positions, _ = self._snapshot()
+        position = positions.get(str(event_id))
+        if position is None:
+            return None
+        similarity = matrix @ self._dense(matrix[position])
+        top = self._top_k(similarity, k, exclude=position)
+        return [(ids[i], float(similarity[i])) for i in top if similarity[i] > 0]
+
+    def similar_to_text(self, text: str, k: int = 10) -> List[Tuple[str, float]]:
+        """Indexed events most similar to free text (e.g. a poster's OCR before it is saved)"""
+        matrix, ids, _, idf = self._snapshot()
+        if not ids:
+            return []
+        query = self._weigh(self._vectorize(text), idf)
+        similarity = matrix @ self._dense(query)
+        top = self._top_k(similarity, k)
+        return [(ids[i], float(similarity[i])) for i in top if similarity[i] > 0]
+
+    def content_scores(self, liked_event_ids: List[str], candidate_ids: List[str]) -> np.ndarray:
+        """
+        Per candidate, the highest cosine similarity to any of the liked events
+        (e.g. a student's past registrations). NaN for candidates that are not
+        indexed or when no liked event is indexed. Usable for new events that
+        have no registrations yet (cold start).
+        """
+        matrix, _, positions, _ = self._snapshot()
+        scores = np.full(len(candidate_ids), np.nan)
+        liked = [positions[str(event_id)] for event_id in liked_event_ids if str(event_id) in positions]
+        candidates = np.array([positions.get(str(event_id), -1) for event_id in candidate_ids], dtype=np.int64)
+        known = candidates >= 0
+        if not liked or not known.any():
+            return scores
+        similarity = (matrix[candidates[known]] @ matrix[liked].T).toarray()
+        scores[known] = similarity.max(axis=1)
+        return scores
+
+
+if __name__ == "__main__":
+    import time
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Event text index benchmark")
+    parser.add_argument("--events", type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    topics = {
+        "hackathon": "coding hackathon teams build prototypes prizes mentors 24 hour",
+        "music": "cultural night music dance performances bands singing",
+        "career": "career fair recruiters internships resume placement interviews",
+        "ml": "machine learning workshop python neural networks hands-on",
+        "sports": "inter college football cricket tournament sports meet",
+    }
+    names = list(topics)
+    catalogue = {}
+    for i in range(args.events):
+        topic = names[i % len(names)]
+        words = topics[topic].split()
+        catalogue[f"E{i}"] = {
+            "title": f"{topic.title()} {i}",
+            "description": " ".join(rng.choice(words, 8)),
+            "rawText": " ".join(rng.choice(words + ["amity", "university", "register", "venue"], 20)),
+        }
+
+    index = EventTextIndex()
+    start = time.perf_counter()
+    index.build(catalogue)
+    index.similar("E0")
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index.upsert("E_new", {"title": "Ml Bootcamp", "description": topics["ml"]})
+    upsert_time = time.perf_counter() - start
+    start = time.perf_counter()
+    index.similar("E_new")
+    rebuild_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i in range(200):
+        results = index.similar(f"E{i}", k=10)
+    query_time = (time.perf_counter() - start) / 200
+    same_topic = np.mean([
+        np.mean([int(other[1:]) % len(names) == i % len(names) for other, _ in index.similar(f"E{i}", k=10)])
+        for i in range(200)
+    ])
+
+    print("\n" + "=" * 70)
+    print(f"EVENT TEXT INDEX ({len(index)} events)")
+    print("=" * 70)
+    print(f"  initial build + first query: {build_time * 1000:8.1f} ms")
+    print(f"  upsert one event:            {upsert_time * 1000:8.2f} ms")
+    print(f"  first query after a change:  {rebuild_time * 1000:8.1f} ms")
+    print(f"  top-10 query:                {query_time * 1000:8.2f} ms")
+    print(f"  ✅ {same_topic * 100:.0f}% of neighbours share the event's topic")
@@ -0,0 +1,290 @@
+"""
+Feedback Indexes
+Per-event indexes over the feedback dataset used by event_guidance_system.py,
+built once at load time and updated in place as new feedback rows arrive.
+
+IssueIndex - the comma-separated `issues_faced` strings exploded once into an
+(event, issue) table of report counts. Each event keeps its issue counts and
+its number of attendees, so the top issues come from a small per-event
+ranking that is cached until that event receives new feedback.
+
+CohortIndex - per event, one bitmap (packed uint64 words over the event's
+feedback rows) for every branch, year and skill level seen at that event.
+A similar-student cohort (same branch OR same year OR same skill level) is
+the OR of at most three bitmaps; cohort size is a popcount and cohort
+satisfaction is read through the cohort's bits.
+
+SatisfactionSketches - KLL quantile sketches (quantile_sketch.py) of
+overall_satisfaction per event and per (branch, year, skill level) cell.
+Cells are disjoint, so a cohort's sketch is the merge of its matching cells.
+Adding feedback is an O(1) amortized sketch update per row; quantiles are
+cached per event and per cohort until the event changes.
+
+Usage:
+    issues = IssueIndex.from_feedback(df)
+    issues.top_issues("Hacksetu")            # [{'issue', 'reported_by', 'percentage'}, ...]
+    issues.add(new_rows)                      # incremental update
+    issues.table()                            # exploded (event, issue) table
+    cohorts = CohortIndex.from_feedback(df)
+    cohorts.similar_satisfaction("Hacksetu", {"branch": "CSE", "year": 2})   # (students, mean)
+    sketches = SatisfactionSketches.from_feedback(df)
+    sketches.event_quantiles("Hacksetu")     # [q25, q75]
+"""
+
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from quantile_sketch import KLLSketch, DEFAULT_K
+
+TOP_ISSUES = 5
+# Tokens that are counted but never reported (e.g. "WiFi issues, None")
+IGNORED_ISSUES = {"", "None"}
+# Student profile key -> feedback column; a cohort matches on any of them
+COHORT_FIELDS = {"branch": "student_branch", "year": "student_year", "skill_level": "skill_level"}
+SATISFACTION_QUANTILES = (0.25, 0.75)
+
+
+def explode_issues(feedback: pd.DataFrame) -> pd.DataFrame:
+    """
+    One row per (feedback row, reported issue) with columns event_name and
+    issue, in feedback row order. Rows with no issues ('', 'None', missing)
+    produce nothing.
+    """
+    raw = feedback["issues_faced"].astype(object)
+    text = raw.astype(str)
+    reported = raw.notna() & (text != "") & (text != "None") & (text != "nan")
+    exploded = pd.DataFrame({
+        "event_name": feedback.loc[reported, "event_name"].astype(object).to_numpy(),
+        "issue": text[reported].str.split(",").to_numpy(),
+    }).explode("issue", ignore_index=True)
+    exploded["issue"] = exploded["issue"].str.strip()
+    return exploded
+
+
+class IssueIndex:
+    """Issue report counts per event, kept current as feedback is added"""
+
+    def __init__(self):
+        # event -> issue -> [reports, first report sequence number]; insertion order breaks ties
+        self._counts: Dict[str, Dict[str, List[int]]] = {}
+        self._attendees: Dict[str, int] = {}
+        self._top: Dict[str, List[Dict[str, Any]]] = {}
+        self._sequence = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_feedback(cls, feedback: pd.DataFrame) -> "IssueIndex":
+        index = cls()
+        index.add(feedback)
+        return index
+
+    def add(self, feedback: pd.DataFrame):
+        """Count the issues in new feedback rows (columns event_name, issues_faced)"""
+        exploded = explode_issues(feedback)
+        exploded["order"] = np.arange(len(exploded))
+        grouped = exploded.groupby(["event_name", "issue"], sort=False).agg(
+            reports=("order", "size"), first=("order", "min")).sort_values("first")
+        attendees = feedback["event_name"].astype(object).value_counts(sort=False)
+
+        with self._lock:
+            for event_name, count in attendees.items():
+                self._attendees[event_name] = self._attendees.get(event_name, 0) + int(count)
+                self._top.pop(event_name, None)
+            for (event_name, issue), reports, first in zip(grouped.index, grouped["reports"], grouped["first"]):
+                entry = self._counts.setdefault(event_name, {}).get(issue)
+                if entry is None:
+                    self._counts[event_name][issue] = [int(reports), self._sequence + int(first)]
+                else:
+                    entry[0] += int(reports)
+            self._sequence += len(exploded)
+
+    def attendees(self, event_name: str) -> int:
+        return self._attendees.get(event_name, 0)
+
+    def top_issues(self, event_name: str, k: int = TOP_ISSUES) -> List[Dict[str, Any]]:
+        """
+        The k most reported issues (ties: first reported first) with report
+        counts and the percentage of the event's attendees reporting them.
+        Placeholder tokens in the top k are dropped, not replaced.
+        """
+        with self._lock:
+            top = self._top.get(event_name) if k == TOP_ISSUES else None
+            if top is None:
+                top = self._rank(event_name, k)
+                if k == TOP_ISSUES:
+                    self._top[event_name] = top
+        return [dict(issue) for issue in top]
+
+    def _rank(self, event_name: str, k: int) -> List[Dict[str, Any]]:
+        counts = self._counts.get(event_name, {})
+        total_attendees = self._attendees.get(event_name, 0)
+        ranked = sorted(counts.items(), key=lambda item: (-item[1][0], item[1][1]))[:k]
+        return [
+            {'issue': issue, 'reported_by': reports, 'percentage': (reports / total_attendees) * 100}
+            for issue, (reports, _) in ranked if issue not in IGNORED_ISSUES
+        ]
+
+    def table(self, event_name: Optional[str] = None) -> pd.DataFrame:
+        """The exploded (event, issue) table: reports and percentage of attendees"""
+        with self._lock:
+            rows = [
+                (event, issue, reports, reports / self._attendees[event] * 100)
+                for event, counts in self._counts.items() if event_name in (None, event)
+                for issue, (reports, _) in counts.items()
+            ]
+        return pd.DataFrame(rows, columns=["event_name", "issue", "reported_by", "percentage"])
+
+
+def _pack(mask: np.ndarray) -> np.ndarray:
+    """Boolean mask -> bitmap of uint64 words (bit i = row i)"""
+    packed = np.packbits(mask, bitorder="little")
+    words = np.zeros(-(-len(packed) // 8) * 8, dtype=np.uint8)
+    words[:len(packed)] = packed
+    return words.view(np.uint64)
+
+
+def _unpack(words: np.ndarray, size: int) -> np.ndarray:
+    return np.unpackbits(words.view(np.uint8), count=size, bitorder="little").view(bool)
+
+
+def popcount(words: np.ndarray) -> int:
+    if hasattr(np, "bitwise_count"):
+        return int(np.bitwise_count(words).sum())
+    return int(np.unpackbits(words.view(np.uint8)).sum())
+
+
+class CohortIndex:
+    """Per-event bitmaps of feedback rows by branch, year and skill level"""
+
+    def __init__(self, fields: Optional[Dict[str, str]] = None):
+        self.fields = fields or COHORT_FIELDS
+        # event -> {"size": rows, "satisfaction": array, "bitmaps": {field: {value: words}}}
+        self._events: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_feedback(cls, feedback: pd.DataFrame) -> "CohortIndex":
+        index = cls()
+        index.add(feedback)
+        return index
+
+    def add(self, feedback: pd.DataFrame):
+        """Append new feedback rows to their events' bitmaps"""
+        satisfaction = feedback["overall_satisfaction"].to_numpy(dtype=np.float64)
+        columns = {field: feedback[column].to_numpy() for field, column in self.fields.items()}
+        groups = feedback.groupby("event_name", sort=False, observed=True).indices
+        with self._lock:
+            for event_name, rows in groups.items():
+                entry = self._events.get(event_name) or {"size": 0, "satisfaction": np.empty(0),
+                                                         "bitmaps": {field: {} for field in self.fields}}
+                size = entry["size"]
+                updated = {}
+                for field, values in columns.items():
+                    values = values[rows]
+                    bitmaps = entry["bitmaps"][field]
+                    updated[field] = {}
+                    for value in set(bitmaps) | set(pd.unique(values).tolist()):
+                        existing = _unpack(bitmaps[value], size) if value in bitmaps else np.zeros(size, dtype=bool)
+                        updated[field][value] = _pack(np.concatenate([existing, values == value]))
+                # Replace the entry in one assignment so readers never see a half-updated event
+                self._events[event_name] = {
+                    "size": size + len(rows),
+                    "satisfaction": np.concatenate([entry["satisfaction"], satisfaction[rows]]),
+                    "bitmaps": updated,
+                }
+
+    def cohort(self, event_name: str, profile: Dict[str, Any]) -> Optional[np.ndarray]:
+        """OR of the event's bitmaps for the profile's branch, year and skill level (None if unknown event)"""
+        entry = self._events.get(event_name)
+        if entry is None:
+            return None
+        words = np.zeros(-(-entry["size"] // 64), dtype=np.uint64)
+        for field, bitmaps in entry["bitmaps"].items():
+            bitmap = bitmaps.get(profile.get(field))
+            if bitmap is not None:
+                words |= bitmap
+        return words
+
+    def satisfaction(self, event_name: str, words: np.ndarray) -> Tuple[int, float]:
+        """(students, mean overall_satisfaction) of a cohort bitmap"""
+        entry = self._events[event_name]
+        count = popcount(words)
+        if count == 0:
+            return 0, float("nan")
+        return count, entry["satisfaction"][_unpack(words, entry["size"])].mean()
+
+    def similar_satisfaction(self, event_name: str, profile: Dict[str, Any]) -> Optional[Tuple[int, float]]:
+        """
+        (students, mean satisfaction) of past attendees sharing the profile's
+        branch, year or skill level; the whole event if nobody does.
+        """
+        entry = self._events.get(event_name)
+        if entry is None:
+            return None
+        count, mean = self.satisfaction(event_name, self.cohort(event_name, profile))
+        if count == 0:
+            return entry["size"], entry["satisfaction"].mean()
+        return count, mean
+
+
+class SatisfactionSketches:
+    """Satisfaction quantile sketches per event and per branch/year/skill-level cell"""
+
+    def __init__(self, k: int = DEFAULT_K, fields: Optional[Dict[str, str]] = None):
+        self.k = k
+        self.fields = fields or COHORT_FIELDS
+        # event -> {"sketch": KLLSketch, "cells": {(branch, year, skill): KLLSketch}, "quantiles": cache}
+        self._events: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_feedback(cls, feedback: pd.DataFrame, k: int = DEFAULT_K) -> "SatisfactionSketches":
+        index = cls(k)
+        index.add(feedback)
+        return index
+
+    def add(self, feedback: pd.DataFrame):
+        """Feed new feedback rows into their event and cell sketches"""
+        satisfaction = feedback["overall_satisfaction"].to_numpy(dtype=np.float64)
+        cells = feedback.groupby(["event_name"] + list(self.fields.values()),
+                                 sort=False, observed=True, dropna=False).indices
+        with self._lock:
+            for (event_name, *cell), rows in cells.items():
+                entry = self._events.setdefault(event_name, {"sketch": KLLSketch(self.k), "cells": {}})
+                values = satisfaction[rows]
+                entry["sketch"].update_many(values)
+                entry["cells"].setdefault(tuple(cell), KLLSketch(self.k)).update_many(values)
+                entry["quantiles"] = {}
+
+    def event_quantiles(self, event_name: str, qs=SATISFACTION_QUANTILES) -> Optional[List[float]]:
+        """Satisfaction quantiles over all of the event's feedback (None if unknown event)"""
+        return self._cached(event_name, None, qs)
+
+    def cohort_quantiles(self, event_name: str, profile: Dict[str, Any],
+                         qs=SATISFACTION_QUANTILES) -> Optional[List[float]]:
+        """
+        Satisfaction quantiles over past attendees sharing the profile's branch,
+        year or skill level; None if the event is unknown or nobody matches.
+        """
+        return self._cached(event_name, tuple(profile.get(field) for field in self.fields), qs)
+
+    def _cached(self, event_name: str, cohort: Optional[tuple], qs) -> Optional[List[float]]:
+        with self._lock:
+            entry = self._events.get(event_name)
+            if entry is None:
+                return None
+            if cohort is not None:
+                matching = [key for key in entry["cells"] if any(a == b for a, b in zip(key, cohort))]
+                # Normalize to the matching cells, so arbitrary profile values share cache entries
+                cohort = tuple(sorted(matching, key=repr))
+                if not cohort:
+                    return None
+            key = (cohort, tuple(qs))
+            if key not in entry["quantiles"]:
+                sketch = entry["sketch"] if cohort is None else KLLSketch.merged(
+                    (entry["cells"][cell] for cell in cohort), self.k)
+                entry["quantiles"][key] = sketch.quantiles(qs)
+            return list(entry["quantiles"][key])
@@ -0,0 +1,164 @@
+"""
+Columnar Feedback Storage
+One-time conversion of event_feedback_dataset.csv to an uncompressed Arrow
+IPC (Feather v2) file that loads by memory-mapping instead of parsing:
+
+  - low-cardinality text columns (event name, type, branch, skill level, ...)
+    are stored dictionary-encoded and load as pandas categoricals
+  - integer columns are downcast to the smallest type that holds them;
+    float columns stay float64 so rating means match the CSV exactly
+  - the file is read through pyarrow.memory_map, so pages come from the OS
+    page cache and are shared by every process loading the same file
+
+load_feedback() prefers the columnar file next to the CSV when it is at least
+as new as the CSV, and falls back to parsing the CSV otherwise.
+
+Usage:
+    python feedback_store.py convert --csv event_feedback_dataset.csv
+    python feedback_store.py compare --csv event_feedback_dataset.csv
+"""
+
+import io
+import os
+import time
+import multiprocessing as mp
+from typing import Dict, Any, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+FEEDBACK_CSV = "event_feedback_dataset.csv"
+COLUMNAR_SUFFIX = ".arrow"
+CATEGORICAL_COLUMNS = [
+    "event_name", "event_type", "event_level", "student_branch", "gender",
+    "previous_participation", "skill_level", "achievement", "sentiment",
+]
+
+
+def columnar_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + COLUMNAR_SUFFIX
+
+
+def compact_feedback(df: pd.DataFrame) -> pd.DataFrame:
+    """Categorical text columns and downcast integer columns (values unchanged)"""
+    df = df.copy()
+    for column in CATEGORICAL_COLUMNS:
+        if column in df.columns:
+            df[column] = df[column].astype("category")
+    for column in df.select_dtypes(include="integer").columns:
+        df[column] = pd.to_numeric(df[column], downcast="integer")
+    return df
+
+
+def convert_feedback(csv_path: str = FEEDBACK_CSV, output_path: Optional[str] = None) -> str:
+    """Write the compacted CSV as an uncompressed Feather file (uncompressed so it can be mapped)"""
+    if not PYARROW_AVAILABLE:
+        raise ImportError("pyarrow is required for columnar feedback storage")
+    output_path = output_path or columnar_path(csv_path)
+    df = compact_feedback(pd.read_csv(csv_path))
+    temporary = f"{output_path}.{os.getpid()}.tmp"
+    feather.write_feather(df, temporary, compression="uncompressed")
+    os.replace(temporary, output_path)
+    return output_path
+
+
+def read_columnar(path: str) -> pd.DataFrame:
+    """Memory-mapped Feather read; primitive columns without nulls are not copied"""
+    with pa.memory_map(path, "r") as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def load_feedback(csv_path: str = FEEDBACK_CSV) -> pd.DataFrame:
+    """The feedback dataset, from the columnar copy when it is present and current"""
+    path = columnar_path(csv_path)
+    if PYARROW_AVAILABLE and os.path.exists(path):
+        if not os.path.exists(csv_path) or os.path.getmtime(path) >= os.path.getmtime(csv_path):
+            return read_columnar(path)
+        print(f"⚠️ {path} is older than {csv_path}; reading the CSV (re-run feedback_store.py convert)")
+    return pd.read_csv(csv_path)
+
+
+def append_feedback(df: pd.DataFrame, rows: pd.DataFrame) -> pd.DataFrame:
+    """df with rows appended; categorical columns stay categorical (categories are merged)"""
+    rows = rows.reindex(columns=df.columns)
+    df = df.copy(deep=False)
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            categories = df[column].cat.categories.union(pd.Index(rows[column].dropna().unique()))
+            df[column] = df[column].cat.set_categories(categories)
+            rows[column] = pd.Categorical(rows[column], categories=categories)
+    return pd.concat([df, rows], ignore_index=True)
+
+
+def _warm_up():
+    """Run both readers once on tiny inputs so one-time import costs are not counted"""
+    pd.read_csv(io.StringIO("a,b\nx,1\n"))
+    if PYARROW_AVAILABLE:
+        pa.table({"a": pa.array(["x"]).dictionary_encode(), "b": [1]}).to_pandas(split_blocks=True)
+
+
+def _measure_load(path: str) -> Dict[str, Any]:
+    from model_artifacts import memory_usage
+    _warm_up()
+    before = memory_usage()
+    start = time.perf_counter()
+    df = read_columnar(path) if path.endswith(COLUMNAR_SUFFIX) else pd.read_csv(path)
+    seconds = time.perf_counter() - start
+    after = memory_usage()
+    return {
+        "rows": len(df),
+        "seconds": seconds,
+        "uss_delta_mb": after.get("uss_mb", 0.0) - before.get("uss_mb", 0.0),
+        "rss_delta_mb": after.get("rss_mb", 0.0) - before.get("rss_mb", 0.0),
+        "frame_mb": df.memory_usage(deep=True).sum() / 1e6,
+    }
+
+
+def compare_formats(csv_path: str = FEEDBACK_CSV) -> Dict[str, Dict[str, Any]]:
+    """Load time and memory of CSV vs columnar, each measured in a fresh process"""
+    path = columnar_path(csv_path)
+    if not os.path.exists(path):
+        convert_feedback(csv_path, path)
+    context = mp.get_context("spawn")
+    results = {}
+    for name, source in [("csv", csv_path), ("columnar", path)]:
+        with context.Pool(1) as pool:
+            results[name] = {"bytes": os.path.getsize(source), **pool.apply(_measure_load, (source,))}
+    return results
+
+
+def print_comparison(results: Dict[str, Dict[str, Any]]):
+    print("\n" + "=" * 70)
+    print(f"FEEDBACK DATASET LOADING ({results['csv']['rows']:,} rows)")
+    print("=" * 70)
+    print(f"  {'format':10s} {'file':>9s} {'load':>9s} {'frame':>9s} {'USS +':>9s} {'RSS +':>9s}")
+    for name, result in results.items():
+        print(f"  {name:10s} {result['bytes'] / 1e6:7.1f}MB {result['seconds'] * 1000:7.1f}ms "
+              f"{result['frame_mb']:7.1f}MB {result['uss_delta_mb']:7.1f}MB {result['rss_delta_mb']:7.1f}MB")
+    print("  frame = pandas deep memory usage; USS + = unique memory added by loading")
+    print(f"  ✅ {results['csv']['seconds'] / max(results['columnar']['seconds'], 1e-9):.1f}x faster load")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Columnar storage for the feedback dataset")
+    commands = parser.add_subparsers(dest="command", required=True)
+    for command, help_text in [("convert", "Write the columnar copy of the CSV"),
+                               ("compare", "Compare CSV and columnar load time and memory")]:
+        sub = commands.add_parser(command, help=help_text)
+        sub.add_argument("--csv", default=FEEDBACK_CSV)
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        written = convert_feedback(args.csv)
+        print(f"✅ Wrote {written} ({os.path.getsize(written) / 1e6:.1f} MB)")
+    else:
+        print_comparison(compare_formats(args.csv))
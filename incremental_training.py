@@ -0,0 +1,257 @@
+"""
+Incremental Recommender Training
+Refreshes the recommendation and satisfaction models from feedback rows
+added since the last model version, without a full offline retrain:
+
+  - XGBoost models continue boosting from the current booster (xgb_model=)
+  - sklearn gradient boosting / random forests are warm-started: the fitted
+    stages or trees are kept and new ones are fitted on the new rows
+  - a sample of older rows is replayed with the new ones so the added trees
+    do not chase only the latest events
+  - the update is scored against the current model on held-out new rows and
+    only published if it is not worse (unless --force)
+
+Each update is written as a new version directory (see model_artifacts.py):
+    <root>/versions/<version>/   recommendation/satisfaction models, scaler,
+                                 label encoders, metadata (model_version,
+                                 parent_version, training_rows, ...)
+    <root>/CURRENT               switched atomically on publish
+The API polls CURRENT and hot-swaps the new version in the background.
+
+The feedback CSV is treated as append-only: metadata['training_rows'] is the
+number of CSV rows the current version has seen, and every later row is "new".
+Rows passed with --new-feedback are not in the CSV and do not move that offset.
+
+Usage:
+    python incremental_training.py --root models/recommender --feedback event_feedback_dataset.csv
+    python incremental_training.py --root models/recommender --new-feedback new_rows.csv
+    python incremental_training.py --root models/recommender --rollback 20260301-120000-ab12cd
+"""
+
+import os
+import copy
+import time
+import shutil
+import hashlib
+from typing import Dict, Any, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from model_artifacts import VERSIONS_DIR, current_version, publish_version, resolve_models_path
+from recommendation_system import CategoryLookup
+
+DEFAULT_ADDED_ESTIMATORS = 20
+DEFAULT_REPLAY_ROWS = 5000
+HOLDOUT_FRACTION = 0.2
+MIN_HOLDOUT_ROWS = 50
+# Publish only if holdout accuracy drops by no more than this
+ACCURACY_TOLERANCE = 0.01
+
+RECOMMEND_LABEL = "would_recommend"
+SATISFACTION_LABEL = "overall_satisfaction"
+RATING_GROUPS = {
+    "total_experience_score": ["venue_rating", "organization_rating", "content_quality", "mentor_support"],
+    "facility_score": ["food_quality", "infrastructure", "registration_process"],
+    "engagement_score": ["networking_opportunities", "time_management", "learning_outcome"],
+}
+
+
+def feedback_features(feedback: pd.DataFrame, label_encoders: Dict[str, Any], feature_columns) -> pd.DataFrame:
+    """Model input from raw feedback rows: categories encoded (unknown -> -1), composite scores filled in"""
+    feedback = feedback.copy()
+    for score, columns in RATING_GROUPS.items():
+        if score not in feedback.columns:
+            feedback[score] = feedback[columns].mean(axis=1)
+    features = {}
+    for column in feature_columns:
+        if column.endswith("_encoded") and column not in feedback.columns:
+            name = column[:-len("_encoded")]
+            features[column] = CategoryLookup(label_encoders[name].classes_).encode_many(feedback[name].tolist())
+        else:
+            features[column] = feedback[column].to_numpy()
+    return pd.DataFrame(features, columns=list(feature_columns)).astype(float)
+
+
+def continue_training(model, X: pd.DataFrame, y: np.ndarray, added_estimators: int):
+    """A copy of model with added_estimators more trees / boosting rounds fitted on X, y"""
+    name = type(model).__name__
+    updated = copy.deepcopy(model)
+    if name in ("XGBClassifier", "XGBRegressor"):
+        updated.set_params(n_estimators=added_estimators)
+        updated.fit(X, y, xgb_model=model.get_booster())
+        return updated
+    if "warm_start" in model.get_params() and "n_estimators" in model.get_params():
+        updated.set_params(warm_start=True, n_estimators=model.n_estimators + added_estimators)
+        updated.fit(X, y)
+        updated.set_params(warm_start=False)
+        return updated
+    raise TypeError(f"{name} cannot be updated incrementally; run a full retrain")
+
+
+def _evaluate(recommendation_model, satisfaction_model, X: pd.DataFrame,
+              feedback: pd.DataFrame) -> Dict[str, float]:
+    if len(X) == 0:
+        return {}
+    return {
+        "accuracy": float(np.mean(recommendation_model.predict(X) == feedback[RECOMMEND_LABEL].to_numpy())),
+        "satisfaction_mae": float(np.mean(np.abs(
+            satisfaction_model.predict(X) - feedback[SATISFACTION_LABEL].to_numpy()))),
+    }
+
+
+def _new_version_name(parent: Optional[str]) -> str:
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    suffix = hashlib.sha1(f"{parent}-{time.time()}".encode()).hexdigest()[:6]
+    return f"{stamp}-{suffix}"
+
+
+def load_new_feedback(feedback_path: Optional[str], new_feedback_path: Optional[str],
+                      training_rows: Optional[int], since_row: Optional[int]) -> Tuple[pd.DataFrame, pd.DataFrame, Optional[int]]:
+    """
+    (new rows, older rows available for replay, feedback CSV rows the updated
+    model has seen). New rows are either a separate file or the tail of the
+    append-only feedback CSV. Rows from a separate file are not in the CSV, so
+    they leave the CSV offset unchanged.
+    """
+    if new_feedback_path:
+        new_rows = pd.read_csv(new_feedback_path)
+        history = pd.read_csv(feedback_path) if feedback_path else pd.DataFrame()
+        return new_rows, history, training_rows
+
+    offset = since_row if since_row is not None else training_rows
+    if offset is None:
+        raise ValueError("The current model does not record how many feedback rows it was trained on; "
+                         "pass --since-row or --new-feedback")
+    feedback = pd.read_csv(feedback_path)
+    return feedback.iloc[offset:], feedback.iloc[:offset], len(feedback)
+
+
+def update_models(root: str, feedback_path: Optional[str] = "event_feedback_dataset.csv",
+                  new_feedback_path: Optional[str] = None, since_row: Optional[int] = None,
+                  added_estimators: int = DEFAULT_ADDED_ESTIMATORS, replay_rows: int = DEFAULT_REPLAY_ROWS,
+                  publish: bool = True, force: bool = False, seed: int = 42) -> Dict[str, Any]:
+    """
+    Fit added trees on new feedback (plus replayed older rows), write a new
+    version directory, and publish it if it holds up on held-out new rows.
+    A plain model directory (no CURRENT) is treated as the parent version.
+    """
+    parent_dir = resolve_models_path(root)
+    parent_version = current_version(root)
+    metadata = joblib.load(os.path.join(parent_dir, "model_metadata.pkl"))
+    label_encoders = joblib.load(os.path.join(parent_dir, "label_encoders.pkl"))
+    recommendation_model = joblib.load(os.path.join(parent_dir, "recommendation_model.pkl"))
+    satisfaction_model = joblib.load(os.path.join(parent_dir, "satisfaction_model.pkl"))
+    feature_columns = metadata["feature_columns"]
+
+    new_rows, history, total_rows = load_new_feedback(
+        feedback_path, new_feedback_path, metadata.get("training_rows"), since_row)
+    if len(new_rows) == 0:
+        return {"updated": False, "reason": "no new feedback rows", "parent_version": parent_version}
+
+    rng = np.random.default_rng(seed)
+    shuffled = new_rows.iloc[rng.permutation(len(new_rows))]
+    holdout_size = int(len(shuffled) * HOLDOUT_FRACTION) if len(shuffled) >= MIN_HOLDOUT_ROWS / HOLDOUT_FRACTION else 0
+    holdout, train = shuffled.iloc[:holdout_size], shuffled.iloc[holdout_size:]
+    if replay_rows and len(history):
+        replay = history.iloc[rng.choice(len(history), min(replay_rows, len(history)), replace=False)]
+        train = pd.concat([train, replay], ignore_index=True)
+
+    start = time.perf_counter()
+    X_train = feedback_features(train, label_encoders, feature_columns)
+    updated_recommendation = continue_training(
+        recommendation_model, X_train, train[RECOMMEND_LABEL].to_numpy(), added_estimators)
+    updated_satisfaction = continue_training(
+        satisfaction_model, X_train, train[SATISFACTION_LABEL].to_numpy(), added_estimators)
+    training_seconds = time.perf_counter() - start
+
+    X_holdout = feedback_features(holdout, label_encoders, feature_columns)
+    before = _evaluate(recommendation_model, satisfaction_model, X_holdout, holdout)
+    after = _evaluate(updated_recommendation, updated_satisfaction, X_holdout, holdout)
+    acceptable = force or not before or after["accuracy"] >= before["accuracy"] - ACCURACY_TOLERANCE
+
+    version = _new_version_name(parent_version)
+    version_dir = os.path.join(root, VERSIONS_DIR, version)
+    os.makedirs(version_dir)
+    joblib.dump(updated_recommendation, os.path.join(version_dir, "recommendation_model.pkl"))
+    joblib.dump(updated_satisfaction, os.path.join(version_dir, "satisfaction_model.pkl"))
+    shutil.copy2(os.path.join(parent_dir, "scaler.pkl"), os.path.join(version_dir, "scaler.pkl"))
+    shutil.copy2(os.path.join(parent_dir, "label_encoders.pkl"), os.path.join(version_dir, "label_encoders.pkl"))
+    joblib.dump({
+        **metadata,
+        "model_version": version,
+        "parent_version": parent_version or metadata.get("model_version"),
+        "training_rows": total_rows,
+        "incremental_rows": len(new_rows),
+        "accuracy": after.get("accuracy", metadata.get("accuracy")),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }, os.path.join(version_dir, "model_metadata.pkl"))
+
+    published = publish and acceptable
+    if published:
+        publish_version(root, version)
+    return {
+        "updated": True,
+        "version": version,
+        "parent_version": parent_version,
+        "published": published,
+        "new_rows": len(new_rows),
+        "train_rows": len(train),
+        "holdout_rows": len(holdout),
+        "training_seconds": training_seconds,
+        "before": before,
+        "after": after,
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    print("\n" + "=" * 70)
+    print("INCREMENTAL MODEL UPDATE")
+    print("=" * 70)
+    if not report["updated"]:
+        print(f"  ⚠️ Not updated: {report['reason']}")
+        return
+    print(f"  Version:        {report['version']} (parent {report['parent_version'] or 'unversioned'})")
+    print(f"  New rows:       {report['new_rows']} ({report['train_rows']} trained incl. replay, "
+          f"{report['holdout_rows']} held out)")
+    print(f"  Training time:  {report['training_seconds']:.1f} s")
+    for name in ["accuracy", "satisfaction_mae"]:
+        if name in report["before"]:
+            print(f"  {name:15s} {report['before'][name]:.4f} -> {report['after'][name]:.4f}")
+    if report["published"]:
+        print("  ✅ Published (CURRENT updated; running APIs pick it up on their next poll)")
+    else:
+        print("  ⚠️ Written but not published (holdout accuracy dropped; use --force to publish anyway)")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Update the recommender models from new feedback")
+    parser.add_argument("--root", required=True, help="Versioned model root (or a plain model directory to start from)")
+    parser.add_argument("--feedback", default="event_feedback_dataset.csv", help="Append-only feedback CSV")
+    parser.add_argument("--new-feedback", default=None, help="CSV with only the new rows")
+    parser.add_argument("--since-row", type=int, default=None,
+                        help="First new row in --feedback (when the current version does not record it)")
+    parser.add_argument("--added-estimators", type=int, default=DEFAULT_ADDED_ESTIMATORS)
+    parser.add_argument("--replay-rows", type=int, default=DEFAULT_REPLAY_ROWS)
+    parser.add_argument("--no-publish", action="store_true")
+    parser.add_argument("--force", action="store_true", help="Publish even if holdout accuracy drops")
+    parser.add_argument("--rollback", default=None, help="Publish an existing version instead of training")
+    args = parser.parse_args()
+
+    if args.rollback:
+        publish_version(args.root, args.rollback)
+        print(f"✅ CURRENT -> {args.rollback}")
+    else:
+        try:
+            update_report = update_models(
+                args.root, feedback_path=args.feedback, new_feedback_path=args.new_feedback,
+                since_row=args.since_row, added_estimators=args.added_estimators,
+                replay_rows=args.replay_rows, publish=not args.no_publish, force=args.force,
+            )
+        except (ValueError, TypeError) as e:
+            print(f"❌ {e}")
+        else:
+            print_report(update_report)
@@ -0,0 +1,227 @@
+"""
+Shared Model Artifacts
+Exports the recommender's models in a memory-mappable layout so several
+processes on one node (uvicorn workers, batch job workers) share one copy
+of the weights through the OS page cache instead of each holding its own:
+
+  - both tree ensembles are compiled to flat NumPy arrays (tree_inference.py)
+    and saved uncompressed with joblib; loading them with mmap_mode='r' maps
+    the arrays read-only from the file instead of copying them into the heap
+  - scaler, label encoders and metadata are small and copied as-is
+  - manifest.json records the model version and the source artifacts
+
+sklearn / XGBoost models unpickle into their own native buffers, so the
+original .pkl files cannot be shared this way - only the compiled arrays can.
+
+Zero-shot transformer weights can be exported as safetensors (memory-mapped
+read, no unpickling) for poster_analysis_ai (ZERO_SHOT_MODEL=<output dir>).
+
+Versioned model directories (written by incremental_training.py):
+    <root>/versions/<version>/*.pkl   one complete artifact set per version
+    <root>/CURRENT                    name of the version to serve
+Anything that loads models from <root> resolves CURRENT first, so publishing
+a version is one atomic file replace.
+
+Usage:
+    python model_artifacts.py export --models . --out models/shared
+    python model_artifacts.py measure --models models/shared --workers 4
+    python model_artifacts.py export-zero-shot --out models/zero_shot
+"""
+
+import os
+import json
+import time
+import shutil
+import multiprocessing as mp
+from typing import Dict, Any, List, Optional
+
+import joblib
+
+MANIFEST_FILE = "manifest.json"
+COMPILED_MODELS = {
+    "recommendation_model": "recommendation_model.pkl",
+    "satisfaction_model": "satisfaction_model.pkl",
+}
+COPIED_FILES = ["scaler.pkl", "label_encoders.pkl", "model_metadata.pkl"]
+CURRENT_FILE = "CURRENT"
+VERSIONS_DIR = "versions"
+
+
+def current_version(root: str) -> Optional[str]:
+    """Version named in <root>/CURRENT, or None for a plain (unversioned) model directory"""
+    try:
+        with open(os.path.join(root, CURRENT_FILE)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def resolve_models_path(models_path: str) -> str:
+    """The directory to load: the current version under a versioned root, else models_path itself"""
+    version = current_version(models_path)
+    return os.path.join(models_path, VERSIONS_DIR, version) if version else models_path
+
+
+def publish_version(root: str, version: str):
+    """Point <root>/CURRENT at an existing version directory (atomic replace)"""
+    if not os.path.isdir(os.path.join(root, VERSIONS_DIR, version)):
+        raise FileNotFoundError(f"No model version {version} under {root}")
+    temporary = os.path.join(root, f".{CURRENT_FILE}.{os.getpid()}")
+    with open(temporary, "w") as f:
+        f.write(version)
+    os.replace(temporary, os.path.join(root, CURRENT_FILE))
+
+
+def is_shared_artifact_dir(models_path: str) -> bool:
+    return os.path.exists(os.path.join(models_path, MANIFEST_FILE))
+
+
+def export_shared_artifacts(models_path: str, output_dir: str) -> Dict[str, Any]:
+    """
+    Compile both tree models and write them, with the other artifacts, to output_dir.
+    Refuses to export a model whose compiled outputs do not match the original.
+    """
+    from recommendation_system import MODEL_FILES, artifact_version
+    from tree_inference import compile_model, check_parity, sample_inputs
+
+    models_path = resolve_models_path(models_path)
+    os.makedirs(output_dir, exist_ok=True)
+    models = {}
+    for name, filename in COMPILED_MODELS.items():
+        model = joblib.load(os.path.join(models_path, filename))
+        compiled = compile_model(model)
+        parity = check_parity(model, compiled, sample_inputs(compiled, 2000))
+        if not parity["passed"]:
+            raise ValueError(f"{filename}: compiled model does not match the original ({parity})")
+        path = os.path.join(output_dir, f"{name}.joblib")
+        # Uncompressed, so every array can be memory-mapped on load
+        joblib.dump(compiled, path)
+        models[name] = {
+            "file": os.path.basename(path),
+            "source": filename,
+            "type": type(model).__name__,
+            "trees": compiled.n_trees,
+            "nodes": compiled.n_nodes,
+            "bytes": os.path.getsize(path),
+            "max_abs_difference": parity["max_abs_difference"],
+        }
+
+    for filename in COPIED_FILES:
+        shutil.copy2(os.path.join(models_path, filename), os.path.join(output_dir, filename))
+
+    metadata = joblib.load(os.path.join(models_path, "model_metadata.pkl"))
+    manifest = {
+        "model_version": metadata.get("model_version") or artifact_version(
+            [os.path.join(models_path, name) for name in MODEL_FILES]),
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "models": models,
+    }
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def load_shared_artifacts(models_path: str) -> Dict[str, Any]:
+    """Manifest plus the compiled models, memory-mapped read-only"""
+    with open(os.path.join(models_path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    artifacts = {"manifest": manifest}
+    for name, entry in manifest["models"].items():
+        artifacts[name] = joblib.load(os.path.join(models_path, entry["file"]), mmap_mode="r")
+    return artifacts
+
+
+def memory_usage() -> Dict[str, float]:
+    """
+    RSS, PSS and USS (unique set size) of this process in MB. USS is what the
+    process would free on exit: pages shared with other processes are excluded.
+    Linux only (reads /proc/self/smaps_rollup); empty elsewhere.
+    """
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            fields = {}
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0].endswith(":") and parts[1].isdigit():
+                    fields[parts[0][:-1]] = int(parts[1]) / 1024
+    except OSError:
+        return {}
+    return {
+        "rss_mb": fields.get("Rss", 0.0),
+        "pss_mb": fields.get("Pss", 0.0),
+        "uss_mb": fields.get("Private_Clean", 0.0) + fields.get("Private_Dirty", 0.0),
+    }
+
+
+def _load_in_worker(models_path: str, barrier) -> Dict[str, Any]:
+    from recommendation_system import EventRecommendationSystem
+    from tree_inference import sample_inputs
+    system = EventRecommendationSystem(models_path, result_cache_size=0)
+    # Touch every array so mapped pages are actually resident before measuring
+    for model in (system.recommendation_model, system.satisfaction_model):
+        compiled = getattr(model, "compiled", None)
+        if compiled is not None:
+            compiled.predict(sample_inputs(compiled, 64))
+    # Measure only once every worker has loaded, so shared pages are counted as shared
+    barrier.wait()
+    return {"pid": os.getpid(), **system.load_stats, "after": memory_usage()}
+
+
+def measure_workers(models_path: str, workers: int = 2) -> List[Dict[str, Any]]:
+    """Load the recommender in `workers` concurrent processes and report each one's cost"""
+    context = mp.get_context("spawn")
+    with context.Manager() as manager:
+        barrier = manager.Barrier(workers)
+        with context.Pool(workers) as pool:
+            return pool.starmap(_load_in_worker, [(os.path.abspath(models_path), barrier)] * workers)
+
+
+def export_zero_shot_model(output_dir: str, model_name: Optional[str] = None) -> str:
+    """Save the zero-shot classification model as safetensors for memory-mapped loading"""
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+    model_name = model_name or os.getenv("ZERO_SHOT_MODEL", "facebook/bart-large-mnli")
+    AutoTokenizer.from_pretrained(model_name).save_pretrained(output_dir)
+    AutoModelForSequenceClassification.from_pretrained(model_name).save_pretrained(
+        output_dir, safe_serialization=True)
+    return output_dir
+
+
+def print_worker_report(results: List[Dict[str, Any]]):
+    print("\n" + "=" * 70)
+    print(f"MODEL LOADING ({len(results)} concurrent workers)")
+    print("=" * 70)
+    print(f"  {'pid':>8s} {'load':>9s} {'USS +':>9s} {'USS':>9s} {'PSS':>9s} {'RSS':>9s}")
+    for result in results:
+        after = result["after"]
+        print(f"  {result['pid']:8d} {result['seconds'] * 1000:7.0f}ms "
+              f"{result.get('uss_delta_mb', 0.0):7.1f}MB {after.get('uss_mb', 0.0):7.1f}MB "
+              f"{after.get('pss_mb', 0.0):7.1f}MB {after.get('rss_mb', 0.0):7.1f}MB")
+    print("  USS + = unique memory added by loading the models")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export and measure memory-mappable model artifacts")
+    commands = parser.add_subparsers(dest="command", required=True)
+    export = commands.add_parser("export", help="Compile the tree models into a shared artifact directory")
+    export.add_argument("--models", default=".", help="Directory with the model .pkl files")
+    export.add_argument("--out", default=os.path.join("models", "shared"))
+    measure = commands.add_parser("measure", help="Load the models in N processes and report memory")
+    measure.add_argument("--models", default=".", help="Shared artifact directory or .pkl directory")
+    measure.add_argument("--workers", type=int, default=2)
+    zero_shot = commands.add_parser("export-zero-shot", help="Save the zero-shot model as safetensors")
+    zero_shot.add_argument("--model", default=None)
+    zero_shot.add_argument("--out", default=os.path.join("models", "zero_shot"))
+    args = parser.parse_args()
+
+    if args.command == "export":
+        exported = export_shared_artifacts(args.models, args.out)
+        print(f"✅ Exported version {exported['model_version']} to {args.out}")
+        for model_name, model_entry in exported["models"].items():
+            print(f"  {model_name}: {model_entry['type']}, {model_entry['trees']} trees, "
+                  f"{model_entry['bytes'] / 1e6:.1f} MB, max |diff| {model_entry['max_abs_difference']:.1e}")
+    elif args.command == "measure":
+        print_worker_report(measure_workers(args.models, args.workers))
+    else:
+        print(f"✅ Saved {export_zero_shot_model(args.out, args.model)}")
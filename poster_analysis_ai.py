@@ -3,18 +3,17 @@ AI Poster Analysis Module
 Phase 2: OCR + Classification + NER Pipeline
 """
 
+import os
 import re
 import json
-from typing import Dict, Any, List, Optional, Tuple
+import time
+from typing import Dict, Any, List, Optional, Tuple, Union
 from datetime import datetime
 import numpy as np
 
-# Check if dateutil is available for better date parsing
-try:
-    from dateutil import parser as date_parser
-    DATEUTIL_AVAILABLE = True
-except ImportError:
-    DATEUTIL_AVAILABLE = False
+from date_utils import normalize_date, parse_date_range, parse_time_range, DATEUTIL_AVAILABLE
+
+if not DATEUTIL_AVAILABLE:
     print("⚠️ python-dateutil not installed. Date parsing will be basic.")
 
 # Check OCR libraries availability
@@ -47,6 +46,10 @@ except ImportError:
     TRANSFORMERS_AVAILABLE = False
     print("⚠️ Transformers not installed. Install with: pip install transformers torch")
 
+# Zero-shot model for category/school classification: a hub name, or a local
+# directory exported with `python model_artifacts.py export-zero-shot ...`
+ZERO_SHOT_MODEL = os.getenv("ZERO_SHOT_MODEL", "facebook/bart-large-mnli")
+
 # Check if spaCy is available
 try:
     import spacy
@@ -55,6 +58,12 @@ except ImportError:
     SPACY_AVAILABLE = False
     print("⚠️ spaCy not installed. Install with: pip install spacy")
 
+def _describe_image_source(image: Union[str, bytes]) -> str:
+    """Readable label for an image given as a path or as in-memory bytes"""
+    if isinstance(image, (bytes, bytearray, memoryview)):
+        return f"<in-memory image, {len(image):,} bytes>"
+    return str(image)
+
 class PosterAnalysisPipeline:
     """
     AI Pipeline for analyzing event posters:
@@ -145,15 +154,18 @@ class PosterAnalysisPipeline:
         """Initialize DistilBERT classifiers"""
         if TRANSFORMERS_AVAILABLE:
             try:
-                # Try to load trained models or use zero-shot classification
-                self.category_classifier = pipeline(
-                    "zero-shot-classification",
-                    model="facebook/bart-large-mnli"
-                )
-                self.school_classifier = pipeline(
-                    "zero-shot-classification",
-                    model="facebook/bart-large-mnli"
-                )
+                # Both classifiers are the same zero-shot model: load its weights once.
+                # Prefer safetensors (no unpickling, read from a memory-mapped file)
+                try:
+                    zero_shot = pipeline(
+                        "zero-shot-classification",
+                        model=ZERO_SHOT_MODEL,
+                        model_kwargs={"use_safetensors": True}
+                    )
+                except (OSError, ValueError):
+                    zero_shot = pipeline("zero-shot-classification", model=ZERO_SHOT_MODEL)
+                self.category_classifier = zero_shot
+                self.school_classifier = zero_shot
                 print("✅ Classifiers initialized (zero-shot)")
             except Exception as e:
                 print(f"⚠️ Classifier initialization failed: {e}")
@@ -178,13 +190,18 @@ class PosterAnalysisPipeline:
         else:
             print("⚠️ NER not available - using rule-based")
     
-    def extract_text_from_image(self, image_path: str) -> str:
-        """Extract text from poster image using OCR (tries EasyOCR first, then PaddleOCR)"""
+    def extract_text_from_image(self, image_path: Union[str, bytes]) -> str:
+        """Extract text from poster image using OCR (tries EasyOCR first, then PaddleOCR)
+        
+        Accepts a file path or the raw encoded image bytes (used by the worker pool,
+        which hands images over in shared memory instead of temp files).
+        """
+        source = _describe_image_source(image_path)
         
         # Try EasyOCR first (more accurate)
         if self.easyocr_reader:
             try:
-                print(f"🔍 Running EasyOCR on image: {image_path}")
+                print(f"🔍 Running EasyOCR on image: {source}")
                 result = self.easyocr_reader.readtext(image_path)
                 
                 if not result:
@@ -210,8 +227,13 @@ class PosterAnalysisPipeline:
         # Try PaddleOCR as fallback
         if self.paddle_ocr:
             try:
-                print(f"🔍 Running PaddleOCR on image: {image_path}")
-                result = self.paddle_ocr.ocr(image_path, cls=True)
+                print(f"🔍 Running PaddleOCR on image: {source}")
+                paddle_input = image_path
+                if isinstance(image_path, (bytes, bytearray, memoryview)):
+                    if not CV2_AVAILABLE:
+                        raise RuntimeError("OpenCV is required to decode in-memory images for PaddleOCR")
+                    paddle_input = cv2.imdecode(np.frombuffer(image_path, dtype=np.uint8), cv2.IMREAD_COLOR)
+                result = self.paddle_ocr.ocr(paddle_input, cls=True)
                 
                 if not result or not result[0]:
                     print("⚠️ PaddleOCR: No text detected")
@@ -406,6 +428,9 @@ class PosterAnalysisPipeline:
             match = re.search(pattern, text, re.IGNORECASE)
             if match:
                 entities["date"] = self._normalize_date(match.group(1))
+                date_range = parse_date_range(match.group(1))
+                if date_range:
+                    entities["date_range"] = date_range.to_dict()
                 break
         
         # Enhanced Time extraction - multiple formats
@@ -432,6 +457,9 @@ class PosterAnalysisPipeline:
                 # Normalize separators
                 time_str = re.sub(r'\s*to\s*', ' - ', time_str, flags=re.IGNORECASE)
                 entities["time"] = time_str
+                time_range = parse_time_range(time_str)
+                if time_range:
+                    entities["time_range"] = time_range.to_dict()
                 break
         
         # Enhanced Location extraction
@@ -498,64 +526,32 @@ class PosterAnalysisPipeline:
     
     def _normalize_date(self, date_str: str) -> str:
         """Normalize date to ISO format (YYYY-MM-DD) for frontend compatibility"""
-        if DATEUTIL_AVAILABLE:
-            try:
-                parsed_date = date_parser.parse(date_str, fuzzy=True)
-                return parsed_date.strftime('%Y-%m-%d')
-            except:
-                pass
-        
-        # Basic normalization without dateutil
-        try:
-            # Try to handle common formats manually
-            # Format: "15 March 2026" or "March 15, 2026"
-            months = {
-                'january': '01', 'february': '02', 'march': '03', 'april': '04',
-                'may': '05', 'june': '06', 'july': '07', 'august': '08',
-                'september': '09', 'october': '10', 'november': '11', 'december': '12',
-                'jan': '01', 'feb': '02', 'mar': '03', 'apr': '04',
-                'may': '05', 'jun': '06', 'jul': '07', 'aug': '08',
-                'sep': '09', 'oct': '10', 'nov': '11', 'dec': '12'
-            }
-            
-            date_lower = date_str.lower().strip()
-            
-            # Try DD/MM/YYYY or MM/DD/YYYY
-            if '/' in date_str or '-' in date_str:
-                parts = re.split(r'[-/]', date_str)
-                if len(parts) == 3:
-                    day, month, year = parts
-                    if len(year) == 4:
-                        return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
-            
-            # Try month name format
-            for month_name, month_num in months.items():
-                if month_name in date_lower:
-                    # Extract day and year
-                    numbers = re.findall(r'\d+', date_str)
-                    if len(numbers) >= 2:
-                        day = numbers[0]
-                        year = numbers[-1]
-                        if len(year) == 4:
-                            return f"{year}-{month_num}-{day.zfill(2)}"
-        except:
-            pass
-        
-        # If all parsing fails, return original
-        return date_str
+        # Ranges ("15-16 March 2026") normalize to their start date
+        return normalize_date(date_str)
     
-    def analyze_poster(self, image_path: str) -> Dict[str, Any]:
+    def analyze_poster(self, image_path: Union[str, bytes]) -> Dict[str, Any]:
         """
         Complete poster analysis pipeline
         Returns structured JSON with extracted event data
         """
         print("="*80)
-        print("🔍 Starting poster analysis for:", image_path)
+        print("🔍 Starting poster analysis for:", _describe_image_source(image_path))
         print("="*80)
         
+        # Per-stage wall-clock timings (seconds), reported in the result
+        timings = {}
+        stage_start = time.perf_counter()
+        
+        def _mark(stage: str):
+            nonlocal stage_start
+            now = time.perf_counter()
+            timings[stage] = round(now - stage_start, 6)
+            stage_start = now
+        
         # Step 1: OCR
         print("📝 Step 1: Extracting text from image...")
         raw_text = self.extract_text_from_image(image_path)
+        _mark("ocr")
         
         if not raw_text or len(raw_text.strip()) < 10:
             error_msg = "Could not extract sufficient text from image. Please ensure:"
@@ -567,29 +563,36 @@ class PosterAnalysisPipeline:
                 "success": False,
                 "error": error_msg,
                 "rawText": raw_text,
-                "extractedData": {}
+                "extractedData": {},
+                "timings": timings
             }
         
         # Step 2: Clean text
         cleaned_text = self.clean_text(raw_text)
+        _mark("clean")
         
         # Step 3: Classify category
         print("🏷️ Classifying category...")
         category, category_confidence = self.classify_category(cleaned_text)
+        _mark("category")
         
         # Step 4: Classify school
         print("🏫 Identifying school...")
         school, school_confidence = self.classify_school(cleaned_text)
+        _mark("school")
         
         # Step 5: Extract entities
         print("🎯 Extracting entities...")
         entities = self.extract_entities(cleaned_text)
+        _mark("entities")
         
         # Step 6: Extract title
         title = self._extract_title(cleaned_text)
+        _mark("title")
         
         # Step 7: Generate description
         description = self._generate_description(cleaned_text, entities)
+        _mark("description")
         
         # Calculate field confidence scores
         field_confidence = {
@@ -626,7 +629,9 @@ class PosterAnalysisPipeline:
                 "registrationDeadline": entities.get("deadline", ""),
                 "description": description,
                 "email": entities.get("email", ""),
-                "phone": entities.get("phone", "")
+                "phone": entities.get("phone", ""),
+                "dateRange": entities.get("date_range"),
+                "timeRange": entities.get("time_range")
             },
             "confidence": {
                 "category": round(category_confidence, 2),
@@ -636,7 +641,8 @@ class PosterAnalysisPipeline:
             },
             "rawText": raw_text,
             "needsReview": overall_confidence < 0.7,
-            "suggestions": self._generate_suggestions(field_confidence)
+            "suggestions": self._generate_suggestions(field_confidence),
+            "timings": timings
         }
         
         print("✅ Analysis complete!")
@@ -0,0 +1,344 @@
+"""
+Poster Extraction Benchmark
+Renders synthetic posters (from generate_synthetic_training_data.generate_poster_text)
+into realistic images with ground-truth JSON, and measures the poster analysis
+pipeline against them: per-stage latency, throughput and field-level accuracy.
+
+Usage:
+    # 1. Generate a corpus (images + ground truth)
+    python poster_benchmark.py generate --count 200 --out benchmark_data/posters
+
+    # 2. Run PosterAnalysisPipeline.analyze_poster over it
+    python poster_benchmark.py run --corpus benchmark_data/posters --report benchmark_report.json
+"""
+
+import os
+import re
+import json
+import glob
+import time
+import random
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont, ImageFilter
+
+from date_utils import normalize_date, parse_time_range
+from generate_synthetic_training_data import generate_poster_text, EVENT_CATEGORIES, AMITY_SCHOOLS
+
+# Poster canvas sizes (portrait A-series / phone screenshot / square social post)
+CANVAS_SIZES = [(1240, 1754), (1080, 1920), (1080, 1080), (900, 1200)]
+
+FONT_DIRS = [
+    "/usr/share/fonts",
+    "/usr/local/share/fonts",
+    "/Library/Fonts",
+    "/System/Library/Fonts",
+    "C:\\Windows\\Fonts",
+]
+
+# Fields compared against ground truth, in report order
+BENCHMARK_FIELDS = ["title", "category", "school", "date", "time", "location", "organizer", "registrationDeadline"]
+
+
+# ========================
+# POSTER RENDERING
+# ========================
+
+def find_fonts() -> List[str]:
+    """TrueType/OpenType fonts installed on this machine"""
+    fonts = []
+    for font_dir in FONT_DIRS:
+        for pattern in ("**/*.ttf", "**/*.otf"):
+            fonts.extend(glob.glob(os.path.join(font_dir, pattern), recursive=True))
+    return sorted(set(fonts))
+
+
+def _load_font(font_paths: List[str], size: int, rng: random.Random):
+    if font_paths:
+        try:
+            return ImageFont.truetype(rng.choice(font_paths), size)
+        except OSError:
+            pass
+    return ImageFont.load_default(size=size)
+
+
+def _strip_unrenderable(line: str) -> str:
+    """Drop emoji / symbols most fonts cannot draw (the OCR would not see them either)"""
+    return "".join(ch for ch in line if ord(ch) < 0x2000).strip()
+
+
+def _wrap(draw: ImageDraw.ImageDraw, text: str, font, max_width: int) -> List[str]:
+    words, lines, current = text.split(), [], ""
+    for word in words:
+        candidate = f"{current} {word}".strip()
+        if current and draw.textlength(candidate, font=font) > max_width:
+            lines.append(current)
+            current = word
+        else:
+            current = candidate
+    if current:
+        lines.append(current)
+    return lines
+
+
+def _background(size, rng: random.Random) -> Image.Image:
+    """Solid, vertical gradient or textured background"""
+    width, height = size
+    base = np.array([rng.randint(0, 255) for _ in range(3)], dtype=np.float32)
+    style = rng.choice(["solid", "gradient", "texture"])
+
+    if style == "solid":
+        pixels = np.broadcast_to(base, (height, width, 3)).copy()
+    elif style == "gradient":
+        other = np.array([rng.randint(0, 255) for _ in range(3)], dtype=np.float32)
+        weights = np.linspace(0, 1, height, dtype=np.float32)[:, None, None]
+        pixels = np.broadcast_to(base * (1 - weights) + other * weights, (height, width, 3)).copy()
+    else:
+        np_rng = np.random.default_rng(rng.randint(0, 2**31))
+        texture = np_rng.normal(0, 25, (height // 16 + 1, width // 16 + 1, 1)).astype(np.float32)
+        texture = np.kron(texture, np.ones((16, 16, 1), dtype=np.float32))[:height, :width]
+        pixels = base + texture
+
+    return Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+
+def _text_color(background: Image.Image, rng: random.Random):
+    """Dark text on light backgrounds and vice versa"""
+    luminance = np.asarray(background.convert("L"), dtype=np.float32).mean()
+    level = rng.randint(0, 60) if luminance > 128 else rng.randint(200, 255)
+    return (level, level, level)
+
+
+def render_poster(poster_data: Dict[str, Any], rng: random.Random,
+                  font_paths: Optional[List[str]] = None) -> Image.Image:
+    """Render poster text into an image with varied fonts, sizes, background and noise"""
+    font_paths = font_paths if font_paths is not None else find_fonts()
+    size = rng.choice(CANVAS_SIZES)
+    width, height = size
+    image = _background(size, rng)
+    draw = ImageDraw.Draw(image)
+    color = _text_color(image, rng)
+
+    margin = int(width * rng.uniform(0.06, 0.12))
+    max_width = width - 2 * margin
+    title_font = _load_font(font_paths, int(width * rng.uniform(0.055, 0.08)), rng)
+    body_font = _load_font(font_paths, int(width * rng.uniform(0.026, 0.036)), rng)
+    centered = rng.random() < 0.5
+
+    lines = [_strip_unrenderable(line) for line in poster_data["text"].split("\n")]
+    y = int(height * rng.uniform(0.04, 0.1))
+    first_line = True
+    for line in lines:
+        if not line:
+            y += body_font.size // 2
+            continue
+        font = title_font if first_line else body_font
+        first_line = False
+        for wrapped in _wrap(draw, line, font, max_width):
+            line_width = draw.textlength(wrapped, font=font)
+            x = (width - line_width) / 2 if centered else margin
+            draw.text((x, y), wrapped, font=font, fill=color)
+            y += int(font.size * 1.35)
+
+    # Camera / messaging-app artifacts: slight rotation, blur, sensor noise
+    angle = rng.uniform(-2.5, 2.5)
+    image = image.rotate(angle, expand=False, fillcolor=tuple(int(c) for c in image.getpixel((0, 0))))
+    if rng.random() < 0.5:
+        image = image.filter(ImageFilter.GaussianBlur(rng.uniform(0.3, 1.2)))
+    noise_sigma = rng.uniform(0, 12)
+    if noise_sigma > 1:
+        np_rng = np.random.default_rng(rng.randint(0, 2**31))
+        pixels = np.asarray(image, dtype=np.float32)
+        pixels += np_rng.normal(0, noise_sigma, pixels.shape).astype(np.float32)
+        image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+    return image
+
+
+def ground_truth(poster_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Ground-truth fields in the same shape as PosterAnalysisPipeline extractedData"""
+    return {
+        "title": poster_data["title"],
+        "category": poster_data["category"],
+        "school": poster_data["school"],
+        "date": normalize_date(poster_data["date"]),
+        "time": poster_data["time"],
+        "location": poster_data["location"],
+        "organizer": poster_data["organizer"],
+        "registrationDeadline": normalize_date(poster_data["deadline"]),
+        "text": poster_data["text"],
+    }
+
+
+def generate_corpus(output_dir: str, count: int = 100, seed: int = 42) -> List[str]:
+    """Render count posters into output_dir (poster_XXXX.jpg + poster_XXXX.json)"""
+    os.makedirs(output_dir, exist_ok=True)
+    # generate_poster_text draws from the global random module
+    random.seed(seed)
+    rng = random.Random(seed)
+    font_paths = find_fonts()
+    print(f"🔄 Rendering {count} posters ({len(font_paths)} fonts found)...")
+
+    names = []
+    for i in range(count):
+        category = EVENT_CATEGORIES[i % len(EVENT_CATEGORIES)]
+        school = rng.choice(AMITY_SCHOOLS)
+        poster_data = generate_poster_text(category, school)
+
+        name = f"poster_{i:04d}"
+        image = render_poster(poster_data, rng, font_paths)
+        image.save(os.path.join(output_dir, f"{name}.jpg"), "JPEG", quality=rng.randint(55, 95))
+        with open(os.path.join(output_dir, f"{name}.json"), "w") as f:
+            json.dump(ground_truth(poster_data), f, indent=2)
+        names.append(name)
+
+        if (i + 1) % 50 == 0:
+            print(f"  Rendered {i + 1} posters...")
+
+    with open(os.path.join(output_dir, "manifest.json"), "w") as f:
+        json.dump({"count": count, "seed": seed, "posters": names}, f, indent=2)
+
+    print(f"✅ Corpus written to {output_dir}")
+    return names
+
+
+# ========================
+# BENCHMARK RUNNER
+# ========================
+
+def _normalize_text(value: Any) -> str:
+    return re.sub(r"[^a-z0-9]+", " ", str(value or "").lower()).strip()
+
+
+def field_matches(field: str, predicted: Any, expected: Any) -> bool:
+    """Field-level comparison with the tolerance each field needs"""
+    if field in ("date", "registrationDeadline"):
+        return bool(predicted) and normalize_date(str(predicted)) == expected
+    if field == "time":
+        predicted_range, expected_range = parse_time_range(predicted or ""), parse_time_range(expected or "")
+        return bool(predicted_range and expected_range) and predicted_range.start == expected_range.start
+    if field in ("category", "school"):
+        return predicted == expected
+
+    # Free text (title, location, organizer): normalized match, allowing the
+    # extraction to carry a little surrounding text
+    predicted_text, expected_text = _normalize_text(predicted), _normalize_text(expected)
+    return bool(predicted_text) and (predicted_text == expected_text or expected_text in predicted_text)
+
+
+def _percentile(values: List[float], q: float) -> float:
+    return float(np.percentile(values, q)) if values else 0.0
+
+
+def run_benchmark(corpus_dir: str, pipeline=None, limit: Optional[int] = None) -> Dict[str, Any]:
+    """Analyze every poster in corpus_dir and aggregate latency and accuracy"""
+    if pipeline is None:
+        from poster_analysis_ai import get_analysis_pipeline
+        pipeline = get_analysis_pipeline()
+
+    with open(os.path.join(corpus_dir, "manifest.json")) as f:
+        names = json.load(f)["posters"]
+    if limit:
+        names = names[:limit]
+
+    stage_timings: Dict[str, List[float]] = {}
+    total_latencies = []
+    correct = {field: 0 for field in BENCHMARK_FIELDS}
+    failures = 0
+
+    started = time.perf_counter()
+    for name in names:
+        with open(os.path.join(corpus_dir, f"{name}.json")) as f:
+            expected = json.load(f)
+        with open(os.path.join(corpus_dir, f"{name}.jpg"), "rb") as f:
+            image_bytes = f.read()
+
+        poster_started = time.perf_counter()
+        result = pipeline.analyze_poster(image_bytes)
+        total_latencies.append(time.perf_counter() - poster_started)
+
+        for stage, seconds in result.get("timings", {}).items():
+            stage_timings.setdefault(stage, []).append(seconds)
+
+        if not result.get("success"):
+            failures += 1
+            continue
+        extracted = result.get("extractedData", {})
+        for field in BENCHMARK_FIELDS:
+            if field_matches(field, extracted.get(field), expected.get(field)):
+                correct[field] += 1
+    elapsed = time.perf_counter() - started
+
+    count = len(names)
+    return {
+        "posters": count,
+        "failures": failures,
+        "throughput_per_sec": count / elapsed if elapsed else 0.0,
+        "latency": {
+            "mean": float(np.mean(total_latencies)) if total_latencies else 0.0,
+            "p50": _percentile(total_latencies, 50),
+            "p95": _percentile(total_latencies, 95),
+        },
+        "stages": {
+            stage: {
+                "mean": float(np.mean(values)),
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+            }
+            for stage, values in stage_timings.items()
+        },
+        "field_accuracy": {field: correct[field] / count if count else 0.0 for field in BENCHMARK_FIELDS},
+    }
+
+
+def print_report(report: Dict[str, Any]):
+    print("=" * 70)
+    print("POSTER EXTRACTION BENCHMARK")
+    print("=" * 70)
+    print(f"  Posters: {report['posters']}   Failed: {report['failures']}")
+    print(f"  Throughput: {report['throughput_per_sec']:.2f} posters/s")
+    latency = report["latency"]
+    print(f"  Latency: mean {latency['mean'] * 1000:.1f} ms, p50 {latency['p50'] * 1000:.1f} ms, "
+          f"p95 {latency['p95'] * 1000:.1f} ms")
+
+    print("\n  PER-STAGE LATENCY (ms)")
+    print("  " + "-" * 50)
+    print(f"  {'stage':15s} {'mean':>10s} {'p50':>10s} {'p95':>10s}")
+    for stage, stats in report["stages"].items():
+        print(f"  {stage:15s} {stats['mean'] * 1000:10.2f} {stats['p50'] * 1000:10.2f} {stats['p95'] * 1000:10.2f}")
+
+    print("\n  FIELD ACCURACY")
+    print("  " + "-" * 50)
+    for field, accuracy in report["field_accuracy"].items():
+        print(f"  {field:22s} {accuracy * 100:6.1f}%")
+    print("=" * 70)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Synthetic poster benchmark")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    generate_parser = subparsers.add_parser("generate", help="Render a synthetic poster corpus")
+    generate_parser.add_argument("--count", type=int, default=100)
+    generate_parser.add_argument("--out", default="benchmark_data/posters")
+    generate_parser.add_argument("--seed", type=int, default=42)
+
+    run_parser = subparsers.add_parser("run", help="Benchmark the analysis pipeline on a corpus")
+    run_parser.add_argument("--corpus", default="benchmark_data/posters")
+    run_parser.add_argument("--limit", type=int, default=None)
+    run_parser.add_argument("--report", default=None, help="Write the report as JSON to this path")
+
+    args = parser.parse_args()
+
+    if args.command == "generate":
+        generate_corpus(args.out, count=args.count, seed=args.seed)
+    else:
+        benchmark_report = run_benchmark(args.corpus, limit=args.limit)
+        print_report(benchmark_report)
+        if args.report:
+            with open(args.report, "w") as f:
+                json.dump(benchmark_report, f, indent=2)
+            print(f"📁 Report saved to {args.report}")
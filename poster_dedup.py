@@ -0,0 +1,246 @@
+"""
+Poster Duplicate Detection
+Perceptual fingerprints (pHash + dHash) and a BK-tree index for finding
+near-duplicate poster uploads (WhatsApp forwards, re-crops, screenshots)
+before paying for OCR again.
+
+Usage:
+    index = PosterDuplicateIndex()
+    fingerprint = compute_fingerprint(image_bytes)
+    match = index.find_duplicate(fingerprint)
+    if match is None:
+        index.add(fingerprint, {"eventId": ..., "analysis": ...})
+    index.find_duplicate(fingerprint, event_only=True)   # only posters of existing events
+    index.remove(fingerprint, event_id)                   # when the event is deleted
+"""
+
+import io
+import threading
+from typing import Callable, Dict, Any, List, Optional, Tuple, NamedTuple
+
+import numpy as np
+from PIL import Image
+
+HASH_SIZE = 8                 # 8x8 = 64-bit hashes
+PHASH_IMAGE_SIZE = 32         # pHash works on a 32x32 DCT
+# Max Hamming distances (out of 64 bits) to call two posters near-duplicates
+PHASH_MAX_DISTANCE = 10
+DHASH_MAX_DISTANCE = 14
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II basis, so dct2(x) = D @ x @ D.T"""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0, :] = np.sqrt(1.0 / n)
+    return matrix
+
+_DCT = _dct_matrix(PHASH_IMAGE_SIZE)
+
+
+class PosterFingerprint(NamedTuple):
+    phash: int
+    dhash: int
+
+    def to_hex(self) -> str:
+        return f"{self.phash:016x}{self.dhash:016x}"
+
+    @classmethod
+    def from_hex(cls, value: str) -> "PosterFingerprint":
+        return cls(int(value[:16], 16), int(value[16:32], 16))
+
+
+def _bits_to_int(bits: np.ndarray) -> int:
+    value = 0
+    for bit in bits.flatten():
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def _load_grayscale(image_bytes: bytes) -> Image.Image:
+    """Decode to grayscale; JPEGs are decoded at reduced scale (draft mode) for speed"""
+    image = Image.open(io.BytesIO(image_bytes))
+    image.draft("L", (PHASH_IMAGE_SIZE * 4, PHASH_IMAGE_SIZE * 4))
+    return image.convert("L")
+
+
+def phash(image: Image.Image) -> int:
+    """DCT-based perceptual hash: low-frequency coefficients vs their median"""
+    pixels = np.asarray(
+        image.resize((PHASH_IMAGE_SIZE, PHASH_IMAGE_SIZE), Image.Resampling.LANCZOS),
+        dtype=np.float64,
+    )
+    dct = _DCT @ pixels @ _DCT.T
+    low_freq = dct[:HASH_SIZE, :HASH_SIZE]
+    # Ignore the DC term when picking the threshold (it only encodes brightness)
+    median = np.median(low_freq.flatten()[1:])
+    return _bits_to_int(low_freq > median)
+
+
+def dhash(image: Image.Image) -> int:
+    """Difference hash: horizontal brightness gradients on a 9x8 thumbnail"""
+    pixels = np.asarray(
+        image.resize((HASH_SIZE + 1, HASH_SIZE), Image.Resampling.LANCZOS),
+        dtype=np.int16,
+    )
+    return _bits_to_int(pixels[:, 1:] > pixels[:, :-1])
+
+
+def compute_fingerprint(image_bytes: bytes) -> PosterFingerprint:
+    """pHash + dHash fingerprint of an encoded image"""
+    image = _load_grayscale(image_bytes)
+    return PosterFingerprint(phash(image), dhash(image))
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over 64-bit hashes with Hamming distance.
+    Range queries only visit subtrees whose edge distance can still match
+    (triangle inequality), so lookups stay far below a linear scan.
+    """
+
+    def __init__(self):
+        self._root = None  # (hash, [items], {distance: child})
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: int, item: Any):
+        self._size += 1
+        if self._root is None:
+            self._root = (value, [item], {})
+            return
+
+        node = self._root
+        while True:
+            node_value, items, children = node
+            distance = hamming_distance(value, node_value)
+            if distance == 0:
+                items.append(item)
+                return
+            child = children.get(distance)
+            if child is None:
+                children[distance] = (value, [item], {})
+                return
+            node = child
+
+    def remove(self, value: int, predicate: Callable[[Any], bool]) -> int:
+        """
+        Drop the items stored under exactly this value that match predicate;
+        returns how many were dropped. Emptied nodes stay in the tree, since
+        their children are reached through them.
+        """
+        node = self._root
+        while node is not None:
+            node_value, items, children = node
+            distance = hamming_distance(value, node_value)
+            if distance == 0:
+                kept = [item for item in items if not predicate(item)]
+                removed = len(items) - len(kept)
+                items[:] = kept
+                self._size -= removed
+                return removed
+            node = children.get(distance)
+        return 0
+
+    def search(self, value: int, max_distance: int) -> List[Tuple[int, Any]]:
+        """All items within max_distance of value, closest first"""
+        if self._root is None:
+            return []
+
+        matches = []
+        stack = [self._root]
+        while stack:
+            node_value, items, children = stack.pop()
+            distance = hamming_distance(value, node_value)
+            if distance <= max_distance:
+                matches.extend((distance, item) for item in items)
+            low, high = distance - max_distance, distance + max_distance
+            stack.extend(child for edge, child in children.items() if low <= edge <= high)
+
+        matches.sort(key=lambda match: match[0])
+        return matches
+
+
+class PosterDuplicateIndex:
+    """Thread-safe near-duplicate index of analyzed posters"""
+
+    def __init__(self, phash_max_distance: int = PHASH_MAX_DISTANCE,
+                 dhash_max_distance: int = DHASH_MAX_DISTANCE):
+        self.phash_max_distance = phash_max_distance
+        self.dhash_max_distance = dhash_max_distance
+        self._tree = BKTree()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._tree)
+
+    def add(self, fingerprint: PosterFingerprint, record: Dict[str, Any]):
+        """Index a poster; record is returned as-is by find_duplicate"""
+        with self._lock:
+            self._tree.add(fingerprint.phash, (fingerprint, record))
+
+    def remove(self, fingerprint: PosterFingerprint, event_id: str) -> int:
+        """Forget the poster of a deleted event; returns how many records were removed"""
+        with self._lock:
+            return self._tree.remove(
+                fingerprint.phash,
+                lambda item: item[0] == fingerprint and item[1].get("eventId") == event_id,
+            )
+
+    def find_duplicate(self, fingerprint: PosterFingerprint,
+                       event_only: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Closest indexed poster whose pHash and dHash are both within range,
+        or None. The returned dict is the stored record plus match details.
+        With event_only, posters that were only analyzed (no eventId) are skipped.
+        """
+        with self._lock:
+            candidates = self._tree.search(fingerprint.phash, self.phash_max_distance)
+
+        for phash_distance, (stored, record) in candidates:
+            if event_only and not record.get("eventId"):
+                continue
+            dhash_distance = hamming_distance(fingerprint.dhash, stored.dhash)
+            if dhash_distance <= self.dhash_max_distance:
+                return {
+                    **record,
+                    "phashDistance": phash_distance,
+                    "dhashDistance": dhash_distance,
+                    "similarity": round(1 - (phash_distance + dhash_distance) / (2 * HASH_SIZE * HASH_SIZE), 3),
+                }
+        return None
+
+    def load_events(self, events: List[Tuple[str, Dict[str, Any]]]) -> int:
+        """Index stored events that carry a posterHash; returns how many were added"""
+        added = 0
+        for event_id, event_data in events:
+            poster_hash = event_data.get("posterHash")
+            if not poster_hash:
+                continue
+            self.add(PosterFingerprint.from_hex(poster_hash), {
+                "eventId": event_id,
+                "analysis": analysis_from_event(event_data),
+            })
+            added += 1
+        return added
+
+
+def analysis_from_event(event_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Rebuild an analyze_poster-style result from a stored event document"""
+    fields = ["title", "category", "school", "date", "time", "location",
+              "organizer", "registrationDeadline", "description"]
+    return {
+        "success": True,
+        "extractedData": {field: event_data.get(field, "") for field in fields},
+        "confidence": {},
+        "rawText": event_data.get("rawText") or "",
+        "needsReview": True,
+        "suggestions": [],
+    }
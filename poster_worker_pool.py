@@ -0,0 +1,487 @@
+"""
+Poster Analysis Worker Pool
+Runs PosterAnalysisPipeline in dedicated worker processes so OCR / transformer
+inference does not compete with the API event loop for CPU threads.
+
+Each worker:
+  - is pinned to its own slice of CPU cores (where the OS supports affinity)
+  - runs torch / OpenCV / BLAS with a bounded number of threads
+  - receives images through shared memory and tasks through its own IPC queue,
+    and reports results over its own pipe, so a worker that is killed (e.g. by
+    the OOM killer) cannot leave a lock held that the other workers need; only
+    its own tasks are lost, and those fail instead of hanging
+
+Usage:
+    pool = PosterWorkerPool(num_workers=2, threads_per_worker=4)
+    pool.start()
+    result = pool.analyze(image_bytes)        # blocking
+    future = pool.submit(image_bytes)         # concurrent.futures.Future
+    pool.shutdown()
+
+Benchmark (find the best workers x threads split for this machine):
+    python poster_worker_pool.py --images poster1.jpg poster2.png --cores 8
+"""
+
+import os
+import time
+import itertools
+import threading
+import multiprocessing as mp
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+from concurrent.futures import Future, InvalidStateError
+from typing import Dict, Any, List, Optional, Tuple
+
+# Environment variables that control the native thread pools used by
+# torch, OpenCV and numpy's BLAS backend. They must be set before those
+# libraries are imported in the worker process.
+THREAD_ENV_VARS = [
+    "OMP_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+]
+
+# Message types sent from workers to the parent process
+_MSG_READY = "ready"
+_MSG_RESULT = "result"
+_MSG_FAILED = "failed"
+
+# How often the result collector checks whether the pool is shutting down
+COLLECTOR_POLL_SECONDS = 0.5
+
+
+def available_cpus() -> List[int]:
+    """CPU ids this process is allowed to run on"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_cpu_affinity(num_workers: int, threads_per_worker: int,
+                      cpus: Optional[List[int]] = None) -> List[List[int]]:
+    """
+    Split the available CPUs into one contiguous slice per worker.
+    If there are not enough cores, slices wrap around and share cores.
+    """
+    cpus = cpus or available_cpus()
+    plan = []
+    for worker_id in range(num_workers):
+        start = worker_id * threads_per_worker
+        plan.append([cpus[(start + i) % len(cpus)] for i in range(threads_per_worker)])
+    return plan
+
+
+def _limit_native_threads(num_threads: int):
+    """Bound BLAS / OpenMP thread pools (call before importing torch or cv2)"""
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(num_threads)
+
+
+def _worker_main(worker_id: int, cpu_ids: List[int], num_threads: int,
+                 models_path: str, task_queue, result_conn):
+    """
+    Worker process entry point: load the pipeline once, then serve tasks.
+    task_queue is read by this worker only; results go back over result_conn.
+    """
+    _limit_native_threads(num_threads)
+
+    if cpu_ids and hasattr(os, "sched_setaffinity"):
+        try:
+            os.sched_setaffinity(0, cpu_ids)
+        except OSError as e:
+            print(f"⚠️ Worker {worker_id}: could not set CPU affinity {cpu_ids}: {e}")
+
+    # Imported here so the thread limits above take effect (model_artifacts pulls in numpy)
+    import poster_analysis_ai
+    from model_artifacts import memory_usage
+
+    if poster_analysis_ai.TRANSFORMERS_AVAILABLE:
+        poster_analysis_ai.torch.set_num_threads(num_threads)
+        try:
+            poster_analysis_ai.torch.set_num_interop_threads(1)
+        except RuntimeError:
+            pass  # Already set (interop threads can only be configured once)
+    if poster_analysis_ai.CV2_AVAILABLE:
+        poster_analysis_ai.cv2.setNumThreads(num_threads)
+
+    memory_before = memory_usage()
+    load_start = time.perf_counter()
+    pipeline = poster_analysis_ai.PosterAnalysisPipeline(models_path=models_path)
+    load_stats = {
+        "seconds": time.perf_counter() - load_start,
+        "uss_delta_mb": memory_usage().get("uss_mb", 0.0) - memory_before.get("uss_mb", 0.0),
+    }
+    result_conn.send((_MSG_READY, worker_id, load_stats))
+
+    while True:
+        task = task_queue.get()
+        if task is None:
+            break
+
+        task_id, shm_name, size = task
+        try:
+            # The block is gone if the task was cancelled while it waited in the queue
+            shm = shared_memory.SharedMemory(name=shm_name)
+            try:
+                image_bytes = bytes(shm.buf[:size])
+            finally:
+                shm.close()
+
+            started = time.perf_counter()
+            result = pipeline.analyze_poster(image_bytes)
+            result["workerId"] = worker_id
+            result["analysisSeconds"] = round(time.perf_counter() - started, 4)
+            result_conn.send((_MSG_RESULT, task_id, result))
+        except Exception as e:
+            result_conn.send((_MSG_FAILED, task_id, f"{type(e).__name__}: {e}"))
+
+
+class PosterWorkerPool:
+    """
+    Pool of poster analysis worker processes. Each worker has its own task
+    queue and result pipe; the parent sends every task to the alive worker
+    with the fewest outstanding tasks. Image bytes are copied once into a
+    shared memory block; only the block name travels through the queue.
+    """
+
+    def __init__(self, num_workers: int = 2, threads_per_worker: int = 2,
+                 models_path: str = "./models", pin_cpus: bool = True,
+                 startup_timeout: float = 600.0):
+        if num_workers < 1 or threads_per_worker < 1:
+            raise ValueError("num_workers and threads_per_worker must be >= 1")
+
+        self.num_workers = num_workers
+        self.threads_per_worker = threads_per_worker
+        self.models_path = models_path
+        self.pin_cpus = pin_cpus
+        self.startup_timeout = startup_timeout
+
+        # spawn: never fork a parent that already holds torch / uvicorn threads
+        self._ctx = mp.get_context("spawn")
+        self._processes = []
+        self._task_queues = []
+        self._result_conns = []
+        # task_id -> (future, shared memory block, worker the task was sent to)
+        self._pending: Dict[int, Tuple[Future, shared_memory.SharedMemory, int]] = {}
+        self._outstanding: List[int] = []
+        self._dead_workers = set()
+        self._pending_lock = threading.Lock()
+        self._task_ids = itertools.count()
+        self._collector = None
+        self._running = False
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    @property
+    def alive_workers(self) -> int:
+        return len(self._processes) - len(self._dead_workers)
+
+    def start(self):
+        """Start workers and block until every worker has loaded its pipeline"""
+        if self._running:
+            return
+
+        affinity = (plan_cpu_affinity(self.num_workers, self.threads_per_worker)
+                    if self.pin_cpus else [[] for _ in range(self.num_workers)])
+
+        print(f"🔄 Starting poster worker pool: {self.num_workers} workers x "
+              f"{self.threads_per_worker} threads")
+        # Spawned workers inherit the environment they start with, so the thread limits
+        # also cover anything the parent's main module imports in the child
+        saved_env = {var: os.environ.get(var) for var in THREAD_ENV_VARS}
+        _limit_native_threads(self.threads_per_worker)
+        try:
+            for worker_id in range(self.num_workers):
+                task_queue = self._ctx.Queue()
+                result_conn, worker_conn = self._ctx.Pipe(duplex=False)
+                process = self._ctx.Process(
+                    target=_worker_main,
+                    args=(worker_id, affinity[worker_id], self.threads_per_worker,
+                          self.models_path, task_queue, worker_conn),
+                    name=f"poster-worker-{worker_id}",
+                    daemon=True,
+                )
+                process.start()
+                # Only the worker holds the write end now, so its death shows up as EOF
+                worker_conn.close()
+                self._processes.append(process)
+                self._task_queues.append(task_queue)
+                self._result_conns.append(result_conn)
+                self._outstanding.append(0)
+        finally:
+            for var, value in saved_env.items():
+                if value is None:
+                    os.environ.pop(var, None)
+                else:
+                    os.environ[var] = value
+
+        # Wait for all workers to finish loading models
+        loading = set(self._result_conns)
+        deadline = time.monotonic() + self.startup_timeout
+        while loading:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.shutdown()
+                raise TimeoutError("Poster workers did not start in time")
+            for conn in wait(list(loading), timeout=min(remaining, 1.0)):
+                try:
+                    msg_type, worker_id, payload = conn.recv()
+                except (EOFError, OSError):
+                    self.shutdown()
+                    raise RuntimeError("A poster worker exited during startup")
+                if msg_type == _MSG_READY:
+                    loading.discard(conn)
+                    print(f"  Worker {worker_id} loaded in {payload['seconds']:.1f}s "
+                          f"(+{payload['uss_delta_mb']:.0f} MB unique memory)")
+
+        self._running = True
+        self._collector = threading.Thread(target=self._collect_results,
+                                           name="poster-pool-collector", daemon=True)
+        self._collector.start()
+        print(f"✅ Poster worker pool ready ({self.num_workers} workers)")
+
+    def _collect_results(self):
+        """Resolve futures as workers report results (runs in a background thread)"""
+        while self._running:
+            live = {self._result_conns[worker_id]: worker_id
+                    for worker_id in range(len(self._processes)) if worker_id not in self._dead_workers}
+            if not live:
+                break
+            for conn in wait(list(live), timeout=COLLECTOR_POLL_SECONDS):
+                try:
+                    msg_type, task_id, payload = conn.recv()
+                except (EOFError, OSError):
+                    # Everything the worker sent before dying has already been read
+                    self._worker_exited(live[conn])
+                    continue
+                if msg_type == _MSG_RESULT:
+                    self._resolve(task_id, result=payload)
+                else:
+                    self._resolve(task_id, error=RuntimeError(payload))
+
+    def _worker_exited(self, worker_id: int):
+        """
+        Fail every task sent to a worker that died (OOM kill, crash in native
+        code): the one it was analyzing and the ones still in its queue. The
+        other workers keep serving; new tasks are no longer sent to this one.
+        """
+        process = self._processes[worker_id]
+        process.join(timeout=1.0)
+        with self._pending_lock:
+            self._dead_workers.add(worker_id)
+            lost = [task_id for task_id, (_, _, assigned) in self._pending.items() if assigned == worker_id]
+        self._result_conns[worker_id].close()
+        self._task_queues[worker_id].cancel_join_thread()
+        if not self._running:
+            return  # Workers exit on purpose during shutdown
+
+        print(f"❌ Poster worker {worker_id} exited unexpectedly (exit code {process.exitcode}); "
+              f"{len(lost)} task(s) lost, {self.alive_workers} worker(s) left")
+        for task_id in lost:
+            self._resolve(task_id, error=RuntimeError(
+                f"Poster worker {worker_id} exited (exit code {process.exitcode}) before finishing the analysis"))
+
+    def _release(self, task_id: int) -> Optional[Future]:
+        """Forget a task and free its shared memory; returns its future (None if already released)"""
+        with self._pending_lock:
+            future, shm, worker_id = self._pending.pop(task_id, (None, None, None))
+            if future is None:
+                return None
+            self._outstanding[worker_id] -= 1
+        shm.close()
+        shm.unlink()
+        return future
+
+    def _resolve(self, task_id: int, result: Optional[Dict[str, Any]] = None,
+                 error: Optional[Exception] = None):
+        """Release a task and settle its future (no-op if already released or cancelled)"""
+        future = self._release(task_id)
+        if future is None:
+            return
+        try:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+        except InvalidStateError:
+            pass  # Cancelled by the caller meanwhile
+
+    def _on_done(self, task_id: int, future: Future):
+        # A caller that gives up (e.g. a request timeout) cancels the future: free the
+        # image now; if the task is still queued the worker finds the block gone and skips it
+        if future.cancelled():
+            self._release(task_id)
+
+    def submit(self, image_bytes: bytes) -> Future:
+        """Queue an image for analysis; returns a Future resolving to the result dict"""
+        if not self._running:
+            raise RuntimeError("Poster worker pool is not running")
+        if not image_bytes:
+            raise ValueError("image_bytes is empty")
+
+        shm = shared_memory.SharedMemory(create=True, size=len(image_bytes))
+        shm.buf[:len(image_bytes)] = image_bytes
+
+        task_id = next(self._task_ids)
+        future = Future()
+        with self._pending_lock:
+            alive = [w for w in range(len(self._processes)) if w not in self._dead_workers]
+            if not alive:
+                shm.close()
+                shm.unlink()
+                raise RuntimeError("All poster workers have exited")
+            # Least outstanding tasks; ties rotate so idle workers share the load
+            worker_id = min(alive, key=lambda w: (self._outstanding[w], (w - task_id) % len(self._processes)))
+            self._outstanding[worker_id] += 1
+            self._pending[task_id] = (future, shm, worker_id)
+
+        future.add_done_callback(lambda done: self._on_done(task_id, done))
+        self._task_queues[worker_id].put((task_id, shm.name, len(image_bytes)))
+        return future
+
+    def analyze(self, image_bytes: bytes, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Analyze one image and wait for the result"""
+        return self.submit(image_bytes).result(timeout=timeout)
+
+    def shutdown(self, timeout: float = 10.0):
+        """Stop all workers and release any outstanding shared memory"""
+        self._running = False
+        for worker_id, task_queue in enumerate(self._task_queues):
+            if worker_id not in self._dead_workers:
+                task_queue.put(None)
+
+        for process in self._processes:
+            process.join(timeout=timeout)
+            if process.is_alive():
+                process.terminate()
+
+        if self._collector is not None:
+            self._collector.join(timeout=timeout)
+
+        with self._pending_lock:
+            outstanding = list(self._pending)
+        for task_id in outstanding:
+            self._resolve(task_id, error=RuntimeError("Poster worker pool shut down"))
+
+        for task_queue in self._task_queues:
+            task_queue.close()
+            task_queue.cancel_join_thread()
+        for conn in self._result_conns:
+            conn.close()
+
+        self._processes = []
+        self._task_queues = []
+        self._result_conns = []
+        self._outstanding = []
+        self._dead_workers = set()
+        self._collector = None
+        self._running = False
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.shutdown()
+
+
+# ========================
+# THROUGHPUT BENCHMARK
+# ========================
+
+def candidate_splits(total_cores: int) -> List[Tuple[int, int]]:
+    """All (workers, threads_per_worker) pairs that fit in total_cores"""
+    splits = []
+    for workers in range(1, total_cores + 1):
+        for threads in range(1, total_cores // workers + 1):
+            # Only keep splits that use the machine reasonably well
+            if workers * threads > total_cores // 2:
+                splits.append((workers, threads))
+    return splits
+
+
+def benchmark_pool_configurations(images: List[bytes], total_cores: Optional[int] = None,
+                                  requests_per_config: int = 32,
+                                  splits: Optional[List[Tuple[int, int]]] = None,
+                                  models_path: str = "./models") -> List[Dict[str, Any]]:
+    """
+    Measure end-to-end throughput for each workers x threads split.
+    Returns results sorted from highest to lowest throughput.
+    """
+    total_cores = total_cores or len(available_cpus())
+    splits = splits or candidate_splits(total_cores)
+    results = []
+
+    for workers, threads in splits:
+        with PosterWorkerPool(num_workers=workers, threads_per_worker=threads,
+                              models_path=models_path) as pool:
+            # Warm-up: one request per worker so lazy init is not measured
+            for future in [pool.submit(images[i % len(images)]) for i in range(workers)]:
+                future.result()
+
+            latencies = []
+
+            def _record(submitted_at):
+                return lambda _: latencies.append(time.perf_counter() - submitted_at)
+
+            started = time.perf_counter()
+            futures = []
+            for i in range(requests_per_config):
+                future = pool.submit(images[i % len(images)])
+                future.add_done_callback(_record(time.perf_counter()))
+                futures.append(future)
+            for future in futures:
+                future.result()
+            elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        result = {
+            "workers": workers,
+            "threads_per_worker": threads,
+            "requests": requests_per_config,
+            "throughput_per_sec": requests_per_config / elapsed,
+            "p50_latency_sec": latencies[len(latencies) // 2],
+            "p95_latency_sec": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        }
+        results.append(result)
+        print(f"  {workers:2d} workers x {threads:2d} threads: "
+              f"{result['throughput_per_sec']:6.2f} posters/s  "
+              f"p50 {result['p50_latency_sec']:.2f}s  p95 {result['p95_latency_sec']:.2f}s")
+
+    results.sort(key=lambda r: r["throughput_per_sec"], reverse=True)
+    return results
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark poster worker pool configurations")
+    parser.add_argument("--images", nargs="+", required=True, help="Poster images to analyze")
+    parser.add_argument("--cores", type=int, default=None, help="Cores to plan for (default: all available)")
+    parser.add_argument("--requests", type=int, default=32, help="Requests per configuration")
+    parser.add_argument("--models-path", default="./models")
+    args = parser.parse_args()
+
+    image_data = []
+    for path in args.images:
+        with open(path, "rb") as f:
+            image_data.append(f.read())
+
+    cores = args.cores or len(available_cpus())
+    print("=" * 70)
+    print(f"POSTER WORKER POOL BENCHMARK ({cores} cores, {len(image_data)} images)")
+    print("=" * 70)
+
+    ranking = benchmark_pool_configurations(image_data, total_cores=cores,
+                                            requests_per_config=args.requests,
+                                            models_path=args.models_path)
+
+    best = ranking[0]
+    print("\n" + "=" * 70)
+    print(f"BEST SPLIT: {best['workers']} workers x {best['threads_per_worker']} threads "
+          f"({best['throughput_per_sec']:.2f} posters/s)")
+    print(f"Set POSTER_POOL_WORKERS={best['workers']} POSTER_POOL_THREADS={best['threads_per_worker']}")
+    print("=" * 70)
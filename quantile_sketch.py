@@ -0,0 +1,195 @@
+"""
+Quantile Sketches
+KLL sketch (Karnin, Lang, Liberty 2016): a mergeable summary of a stream of
+numbers that answers quantile queries with a rank error of roughly 1.7/k,
+using O(k) memory however many values are added.
+
+Values enter level 0. When the sketch is full, the lowest full level is
+sorted and every other item (random offset) moves up a level with double
+weight. Levels below the top get geometrically smaller capacities (2/3 per
+level), so most of the budget keeps the heaviest items accurate. Two
+sketches merge by concatenating their levels and compacting again, so
+per-group sketches can be combined into the sketch of any union of groups.
+
+While nothing has been compacted the sketch holds every value and quantile()
+is exact (linear interpolation, same as pandas / numpy defaults).
+
+Usage:
+    sketch = KLLSketch()
+    sketch.update_many(values); sketch.update(7.5)
+    sketch.quantiles([0.25, 0.75])
+    combined = KLLSketch.merged([sketch_a, sketch_b])
+
+Benchmark:
+    python quantile_sketch.py --values 100000
+"""
+
+import math
+import random
+from typing import List, Iterable, Optional
+
+import numpy as np
+
+DEFAULT_K = 200
+CAPACITY_DECAY = 2 / 3
+MIN_CAPACITY = 2
+
+
+class KLLSketch:
+    """Mergeable streaming quantile sketch"""
+
+    def __init__(self, k: int = DEFAULT_K, seed: Optional[int] = 0):
+        self.k = k
+        self.n = 0
+        self._levels: List[List[float]] = [[]]
+        self._size = 0
+        self._max_size = self._capacity(0)
+        self._rng = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self.n
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self._levels) - level - 1
+        return max(int(math.ceil(self.k * CAPACITY_DECAY ** depth)), MIN_CAPACITY)
+
+    def _grow(self):
+        self._levels.append([])
+        self._max_size = sum(self._capacity(level) for level in range(len(self._levels)))
+
+    def update(self, value: float):
+        self._levels[0].append(float(value))
+        self._size += 1
+        self.n += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def update_many(self, values: Iterable[float]):
+        values = np.asarray(values, dtype=np.float64).tolist()
+        start = 0
+        while start < len(values):
+            chunk = values[start:start + max(self._max_size - self._size, 1)]
+            self._levels[0].extend(chunk)
+            self._size += len(chunk)
+            self.n += len(chunk)
+            start += len(chunk)
+            if self._size >= self._max_size:
+                self._compress()
+
+    def _compress(self):
+        level = 0
+        while level < len(self._levels):
+            items = self._levels[level]
+            if len(items) >= self._capacity(level):
+                if level + 1 == len(self._levels):
+                    self._grow()
+                items.sort()
+                # An odd item out stays at this level, so total weight is preserved
+                kept = [items.pop()] if len(items) % 2 else []
+                self._levels[level + 1].extend(items[self._rng.random() < 0.5::2])
+                self._levels[level] = kept
+                self._size = sum(len(items) for items in self._levels)
+                if self._size < self._max_size:
+                    break
+            level += 1
+
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """Fold another sketch into this one (other is unchanged)"""
+        while len(self._levels) < len(other._levels):
+            self._grow()
+        for level, items in enumerate(other._levels):
+            self._levels[level].extend(items)
+        self.n += other.n
+        self._size = sum(len(items) for items in self._levels)
+        if self._size >= self._max_size:
+            self._compress()
+        return self
+
+    @classmethod
+    def merged(cls, sketches: Iterable["KLLSketch"], k: int = DEFAULT_K) -> "KLLSketch":
+        combined = cls(k)
+        for sketch in sketches:
+            combined.merge(sketch)
+        return combined
+
+    @property
+    def exact(self) -> bool:
+        """True while no value has been compacted away"""
+        return all(not items for items in self._levels[1:])
+
+    def quantiles(self, qs: Iterable[float]) -> List[float]:
+        """Values at the given quantiles (linearly interpolated between ranks); NaN if empty"""
+        qs = list(qs)
+        if self.n == 0:
+            return [float("nan")] * len(qs)
+        values = np.concatenate([np.asarray(items, dtype=np.float64) for items in self._levels])
+        weights = np.concatenate([np.full(len(items), 2 ** level, dtype=np.int64)
+                                  for level, items in enumerate(self._levels)])
+        order = np.argsort(values, kind="stable")
+        values, ends = values[order], np.cumsum(weights[order])
+
+        def at_rank(rank: int) -> float:
+            return values[min(np.searchsorted(ends, rank, side="right"), len(values) - 1)]
+
+        results = []
+        for q in qs:
+            position = q * (self.n - 1)
+            lower = int(math.floor(position))
+            low_value = at_rank(lower)
+            results.append(float(low_value + (position - lower) * (at_rank(lower + 1) - low_value)))
+        return results
+
+    def quantile(self, q: float) -> float:
+        return self.quantiles([q])[0]
+
+
+if __name__ == "__main__":
+    import time
+    import argparse
+
+    parser = argparse.ArgumentParser(description="KLL sketch accuracy and speed")
+    parser.add_argument("--values", type=int, default=100_000)
+    parser.add_argument("--k", type=int, default=DEFAULT_K)
+    parser.add_argument("--groups", type=int, default=100, help="Groups to sketch separately and merge")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    data = np.clip(np.round(rng.normal(7.0, 1.2, args.values), 1), 0, 10)
+    probes = [0.05, 0.25, 0.5, 0.75, 0.95]
+
+    start = time.perf_counter()
+    sketch = KLLSketch(args.k)
+    for x in data:
+        sketch.update(x)
+    update_time = (time.perf_counter() - start) / len(data)
+
+    start = time.perf_counter()
+    parts = [KLLSketch(args.k, seed=i) for i in range(args.groups)]
+    for i, part in enumerate(parts):
+        part.update_many(data[i::args.groups])
+    bulk_time = time.perf_counter() - start
+    start = time.perf_counter()
+    combined = KLLSketch.merged(parts, args.k)
+    merge_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    estimates = sketch.quantiles(probes)
+    query_time = time.perf_counter() - start
+    merged_estimates = combined.quantiles(probes)
+    exact = np.quantile(data, probes)
+    sorted_data = np.sort(data)
+
+    def rank_error(value: float, q: float) -> float:
+        low = np.searchsorted(sorted_data, value, side="left") / len(data)
+        high = np.searchsorted(sorted_data, value, side="right") / len(data)
+        return 0.0 if low <= q <= high else min(abs(low - q), abs(high - q))
+
+    print("\n" + "=" * 70)
+    print(f"KLL SKETCH (k={args.k}, {len(data):,} values, {sum(len(items) for items in sketch._levels)} retained)")
+    print("=" * 70)
+    print(f"  update:            {update_time * 1e6:8.2f} us/value")
+    print(f"  bulk ({args.groups} groups): {bulk_time * 1000:8.1f} ms, merge all: {merge_time * 1000:.1f} ms")
+    print(f"  quantile query:    {query_time * 1000:8.2f} ms")
+    print(f"  {'q':>5s} {'exact':>8s} {'sketch':>8s} {'merged':>8s} {'rank err':>9s}")
+    for q, e, s, m in zip(probes, exact, estimates, merged_estimates):
+        print(f"  {q:5.2f} {e:8.2f} {s:8.2f} {m:8.2f} {max(rank_error(s, q), rank_error(m, q)) * 100:8.2f}%")
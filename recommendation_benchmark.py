@@ -0,0 +1,288 @@
+"""
+Recommendation Scoring Benchmark
+Times EventRecommendationSystem on a synthetic event catalogue and checks
+that the batch scoring path returns exactly what the per-event path does.
+Also measures categorical encoding overhead (LabelEncoder vs lookup tables)
+many-students x many-events scoring through the feature cache,
+repeated requests served from the result cache, and per-student vs
+cohort-wide past-event insights.
+
+Usage:
+    python recommendation_benchmark.py --events 1000 --students 200
+    python recommendation_benchmark.py --sampled     # legacy random rating estimates
+    python recommendation_benchmark.py --feedback event_feedback_dataset.csv
+"""
+
+import time
+from typing import Dict, Any, List
+
+import numpy as np
+import pandas as pd
+
+from recommendation_system import EventRecommendationSystem
+
+SAMPLE_STUDENT = {
+    'branch': 'CSE',
+    'year': 2,
+    'age': 19,
+    'gender': 'Male',
+    'skill_level': 'Intermediate',
+    'previous_participation': 'Low',
+    'team_size': 3,
+    'participated_alone': 0,
+    'achievement': 'Participation'
+}
+
+
+def make_catalogue(recommender: EventRecommendationSystem, count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Random events built from the categories the models were trained on"""
+    rng = np.random.default_rng(seed)
+    names = recommender.label_encoders['event_name'].classes_
+    types = recommender.label_encoders['event_type'].classes_
+    levels = recommender.label_encoders['event_level'].classes_
+    return [
+        {
+            'name': str(rng.choice(names)),
+            'type': str(rng.choice(types)),
+            'level': str(rng.choice(levels)),
+            'duration_days': int(rng.integers(1, 7)),
+        }
+        for _ in range(count)
+    ]
+
+
+def make_students(recommender: EventRecommendationSystem, count: int, seed: int = 42) -> List[Dict[str, Any]]:
+    """Random student profiles built from the trained categories"""
+    rng = np.random.default_rng(seed)
+    encoders = recommender.label_encoders
+    students = []
+    for _ in range(count):
+        year = int(rng.integers(1, 5))
+        students.append({
+            'branch': str(rng.choice(encoders['student_branch'].classes_)),
+            'year': year,
+            'age': 18 + year,
+            'gender': str(rng.choice(encoders['gender'].classes_)),
+            'skill_level': str(rng.choice(encoders['skill_level'].classes_)),
+            'previous_participation': str(rng.choice(encoders['previous_participation'].classes_)),
+        })
+    return students
+
+
+def benchmark_batch_scoring(recommender: EventRecommendationSystem, events: List[Dict[str, Any]],
+                            student: Dict[str, Any] = None, seed: int = 7) -> Dict[str, Any]:
+    """Per-event predict_recommendation loop vs one predict_recommendations call"""
+    student = student or SAMPLE_STUDENT
+
+    # Same seed for both paths so the estimated ratings match draw for draw
+    np.random.seed(seed)
+    start = time.perf_counter()
+    sequential = [recommender.predict_recommendation(student, event) for event in events]
+    sequential_time = time.perf_counter() - start
+
+    recommender.result_cache.clear()
+    np.random.seed(seed)
+    start = time.perf_counter()
+    batch = recommender.predict_recommendations(student, events)
+    batch_time = time.perf_counter() - start
+
+    return {
+        'events': len(events),
+        'sequential_seconds': sequential_time,
+        'batch_seconds': batch_time,
+        'speedup': sequential_time / batch_time if batch_time else float('inf'),
+        'identical': sequential == batch,
+    }
+
+
+def benchmark_encoding(recommender: EventRecommendationSystem, runs: int = 2000) -> Dict[str, Any]:
+    """Per-call cost of LabelEncoder.transform vs the compiled lookup tables"""
+    results = {}
+    for name, encoder in recommender.label_encoders.items():
+        lookup = recommender.lookups[name]
+        classes = encoder.classes_.tolist()
+        value = classes[0]
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            encoder.transform([value])[0]
+        transform_time = (time.perf_counter() - start) / runs
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            lookup.encode(value)
+        lookup_time = (time.perf_counter() - start) / runs
+
+        batch = classes * (1000 // len(classes) + 1)
+        results[name] = {
+            'transform_us': transform_time * 1e6,
+            'lookup_us': lookup_time * 1e6,
+            'identical': list(encoder.transform(batch)) == list(lookup.encode_many(batch)),
+        }
+    return results
+
+
+def benchmark_pair_scoring(recommender: EventRecommendationSystem, students: List[Dict[str, Any]],
+                           events: List[Dict[str, Any]], seed: int = 7) -> Dict[str, Any]:
+    """Per-student batch calls vs one score_pairs call, with a cold and a warm feature cache"""
+    recommender.result_cache.clear()
+    np.random.seed(seed)
+    start = time.perf_counter()
+    per_student = [recommender.predict_recommendations(student, events) for student in students]
+    per_student_time = time.perf_counter() - start
+
+    recommender.feature_cache.clear()
+    np.random.seed(seed)
+    start = time.perf_counter()
+    scores = recommender.score_pairs(students, events)
+    cold_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    recommender.prepare_pair_input(students, events)
+    warm_assembly_time = time.perf_counter() - start
+
+    identical = all(
+        [prediction['confidence'] for prediction in predictions] == scores['confidence'][i].tolist()
+        for i, predictions in enumerate(per_student)
+    )
+    return {
+        'pairs': len(students) * len(events),
+        'per_student_seconds': per_student_time,
+        'pairs_cold_seconds': cold_time,
+        'warm_assembly_seconds': warm_assembly_time,
+        'cache': recommender.feature_cache.stats(),
+        'identical': identical,
+    }
+
+
+def print_pair_report(report: Dict[str, Any]):
+    print("\n" + "=" * 70)
+    print(f"PAIR SCORING ({report['pairs']} student x event pairs)")
+    print("=" * 70)
+    print(f"  per-student calls:         {report['per_student_seconds'] * 1000:10.1f} ms")
+    print(f"  score_pairs (cold cache):  {report['pairs_cold_seconds'] * 1000:10.1f} ms")
+    print(f"  feature assembly (warm):   {report['warm_assembly_seconds'] * 1000:10.1f} ms")
+    print(f"  cache: {report['cache']}")
+    print(f"  {'✅ outputs identical' if report['identical'] else '❌ outputs differ'}")
+
+
+def benchmark_result_cache(recommender: EventRecommendationSystem, events: List[Dict[str, Any]],
+                           student: Dict[str, Any] = None, repeats: int = 20) -> Dict[str, Any]:
+    """First (cold) vs repeated (cached) recommend_events_for_student calls"""
+    student = student or SAMPLE_STUDENT
+    recommender.result_cache.clear()
+
+    start = time.perf_counter()
+    first = recommender.recommend_events_for_student(student, events, top_n=10)
+    cold_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(repeats):
+        repeat = recommender.recommend_events_for_student(student, events, top_n=10)
+    warm_time = (time.perf_counter() - start) / repeats
+
+    return {
+        'events': len(events),
+        'cold_seconds': cold_time,
+        'warm_seconds': warm_time,
+        'cache': recommender.result_cache.stats(),
+        'identical': first == repeat,
+    }
+
+
+def print_cache_report(report: Dict[str, Any]):
+    print("\n" + "=" * 70)
+    print(f"RESULT CACHE ({report['events']} events, repeated requests)")
+    print("=" * 70)
+    print(f"  first request:     {report['cold_seconds'] * 1000:10.1f} ms")
+    print(f"  repeated request:  {report['warm_seconds'] * 1000:10.1f} ms")
+    print(f"  cache: {report['cache']}")
+    print(f"  {'✅ repeated results identical' if report['identical'] else '❌ repeated results differ'}")
+
+
+def benchmark_cohort_insights(recommender: EventRecommendationSystem, feedback: pd.DataFrame,
+                              by: str = 'student_id') -> Dict[str, Any]:
+    """get_insights_from_past_events per student vs one get_cohort_insights call"""
+    start = time.perf_counter()
+    per_student = {key: recommender.get_insights_from_past_events(rows) for key, rows in feedback.groupby(by)}
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    cohort = recommender.get_cohort_insights(feedback, by=by)
+    cohort_time = time.perf_counter() - start
+
+    def _same(expected, actual):
+        if isinstance(expected, list):
+            return (len(expected) == len(actual) and all(
+                a['area'] == b['area'] and np.isclose(a['average_rating'], b['average_rating'])
+                for a, b in zip(expected, actual)))
+        if isinstance(expected, float):
+            return bool(np.isclose(expected, actual, equal_nan=True))
+        return expected == actual
+
+    mismatches = sum(
+        not _same(value, cohort.at[key, field])
+        for key, insights in per_student.items()
+        for field, value in insights.items()
+    )
+    return {
+        'groups': len(per_student),
+        'rows': len(feedback),
+        'loop_seconds': loop_time,
+        'cohort_seconds': cohort_time,
+        'mismatches': mismatches,
+    }
+
+
+def print_cohort_report(report: Dict[str, Any]):
+    print("\n" + "=" * 70)
+    print(f"PAST-EVENT INSIGHTS ({report['groups']} students, {report['rows']} feedback rows)")
+    print("=" * 70)
+    print(f"  per-student calls:  {report['loop_seconds'] * 1000:10.1f} ms")
+    print(f"  cohort groupby:     {report['cohort_seconds'] * 1000:10.1f} ms")
+    print(f"  speedup:            {report['loop_seconds'] / report['cohort_seconds']:10.1f}x")
+    if report['mismatches']:
+        print(f"  ❌ {report['mismatches']} fields differ")
+    else:
+        print("  ✅ insights match")
+
+
+def print_encoding_report(results: Dict[str, Any]):
+    print("\n" + "=" * 70)
+    print("CATEGORICAL ENCODING (per scalar call)")
+    print("=" * 70)
+    print(f"  {'encoder':25s} {'transform':>12s} {'lookup':>12s} {'speedup':>9s}")
+    for name, stats in results.items():
+        print(f"  {name:25s} {stats['transform_us']:10.2f}µs {stats['lookup_us']:10.3f}µs "
+              f"{stats['transform_us'] / stats['lookup_us']:8.0f}x {'✅' if stats['identical'] else '❌'}")
+
+
+def print_report(report: Dict[str, Any]):
+    print("\n" + "=" * 70)
+    print(f"BATCH SCORING ({report['events']} events)")
+    print("=" * 70)
+    print(f"  per-event loop: {report['sequential_seconds'] * 1000:10.1f} ms")
+    print(f"  batch:          {report['batch_seconds'] * 1000:10.1f} ms")
+    print(f"  speedup:        {report['speedup']:10.1f}x")
+    print(f"  {'✅ outputs identical' if report['identical'] else '❌ outputs differ'}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Recommendation scoring benchmark")
+    parser.add_argument("--events", type=int, default=1000, help="Catalogue size")
+    parser.add_argument("--students", type=int, default=200, help="Students for pair scoring")
+    parser.add_argument("--sampled", action="store_true", help="Use sampled (random) rating estimates")
+    parser.add_argument("--feedback", default=None, help="Feedback CSV (with student_id) for the insights benchmark")
+    args = parser.parse_args()
+
+    recommender = EventRecommendationSystem(rating_estimation="sampled" if args.sampled else "expected")
+    catalogue = make_catalogue(recommender, args.events)
+    print_encoding_report(benchmark_encoding(recommender))
+    print_report(benchmark_batch_scoring(recommender, catalogue))
+    print_pair_report(benchmark_pair_scoring(recommender, make_students(recommender, args.students), catalogue))
+    if recommender.rating_estimation == "expected":
+        print_cache_report(benchmark_result_cache(recommender, catalogue))
+    if args.feedback:
+        print_cohort_report(benchmark_cohort_insights(recommender, pd.read_csv(args.feedback)))
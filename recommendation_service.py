@@ -0,0 +1,165 @@
+"""
+Recommendation Service
+Glue between the API and EventRecommendationSystem:
+  - RecommendationBatcher collects concurrent requests for a few milliseconds
+    and scores them together with one predict_many call (one model call)
+  - helpers that turn Firestore event / user documents into recommender inputs
+
+Usage (inside an asyncio app):
+    batcher = RecommendationBatcher(EventRecommendationSystem(), max_batch_size=32, max_wait_ms=5)
+    batcher.start()
+    predictions = await batcher.predict(student_profile, events)
+    await batcher.stop()
+"""
+
+import asyncio
+from typing import Dict, Any, List, Optional, Tuple
+
+from date_utils import parse_date_range
+
+DEFAULT_MAX_BATCH_SIZE = 32
+DEFAULT_MAX_WAIT_MS = 5.0
+
+# Events in Firestore carry no level; most campus events are university-wide
+DEFAULT_EVENT_LEVEL = "University"
+REQUIRED_PROFILE_FIELDS = ["branch", "year", "gender", "skill_level"]
+OPTIONAL_PROFILE_FIELDS = ["age", "previous_participation", "team_size", "participated_alone", "achievement"]
+
+
+class RecommendationBatcher:
+    """
+    Cross-request micro-batcher. The first queued request opens a batch; the batch
+    is scored once max_batch_size requests are waiting or max_wait_ms has passed.
+    Scoring runs in a thread so the event loop keeps accepting requests meanwhile.
+    """
+
+    def __init__(self, recommender, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+                 max_wait_ms: float = DEFAULT_MAX_WAIT_MS):
+        self.recommender = recommender
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.requests = 0
+
+    def start(self):
+        """Start the batching loop on the running event loop"""
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # Fail anything still waiting rather than leaving callers hanging
+        while not self._queue.empty():
+            *_, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Recommendation service stopped"))
+
+    async def predict(self, student_profile: Dict[str, Any], events: List[Dict[str, Any]],
+                      past_feedback: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Predictions for one student (same format as predict_recommendations)"""
+        if self._task is None:
+            raise RuntimeError("RecommendationBatcher is not started")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((student_profile, events, past_feedback, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple]:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            requests = [(profile, events, past_feedback) for profile, events, past_feedback, _ in batch]
+            try:
+                results = await loop.run_in_executor(None, self.recommender.predict_many, requests)
+            except Exception:
+                # One bad request must not fail the others in its batch: score them one by one
+                results = await loop.run_in_executor(None, self._predict_each, requests)
+
+            self.batches += 1
+            self.requests += len(batch)
+            for (*_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _predict_each(self, requests: List[Tuple]) -> List[Any]:
+        """Score requests separately; a request that raises gets its exception as its result"""
+        results = []
+        for request in requests:
+            try:
+                results.append(self.recommender.predict_many([request])[0])
+            except Exception as e:
+                results.append(e)
+        return results
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "averageBatchSize": round(self.requests / self.batches, 2) if self.batches else 0.0,
+            "maxBatchSize": self.max_batch_size,
+            "maxWaitMs": self.max_wait * 1000,
+        }
+
+
+def event_to_recommender_input(event_id: str, event_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Map an API event document onto the recommender's event fields"""
+    date_range = parse_date_range(event_data.get("date"))
+    duration_days = (date_range.end - date_range.start).days + 1 if date_range else 1
+    return {
+        "id": event_id,
+        "name": event_data.get("title", ""),
+        "type": event_data.get("category", ""),
+        "level": event_data.get("level", DEFAULT_EVENT_LEVEL),
+        "duration_days": duration_days,
+    }
+
+
+def build_student_profile(user_data: Dict[str, Any],
+                          overrides: Dict[str, Any]) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Recommender profile from a user document, with non-None overrides applied.
+    Returns the profile and the required fields that are still missing.
+    Raises ValueError if year is not a whole number.
+    """
+    profile = {
+        field: user_data[field]
+        for field in REQUIRED_PROFILE_FIELDS + OPTIONAL_PROFILE_FIELDS
+        if user_data.get(field) is not None
+    }
+    profile.update({field: value for field, value in overrides.items() if value is not None})
+    if "year" in profile:
+        try:
+            profile["year"] = int(profile["year"])
+        except (TypeError, ValueError):
+            raise ValueError(f"year must be a whole number, got {profile['year']!r}") from None
+    missing = [field for field in REQUIRED_PROFILE_FIELDS if field not in profile]
+    return profile, missing
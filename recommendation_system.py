@@ -1,23 +1,331 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
 import pandas as pd
 import numpy as np
 import joblib
 import warnings
 warnings.filterwarnings('ignore')
 
+from model_artifacts import is_shared_artifact_dir, load_shared_artifacts, memory_usage, resolve_models_path
+
+# Rating features estimated when no past feedback is given, in the order
+# prepare_input draws their noise (registration_process is a constant 8.0)
+ESTIMATED_RATINGS = [
+    'venue_rating', 'organization_rating', 'content_quality', 'mentor_support',
+    'food_quality', 'prize_satisfaction', 'networking_opportunities',
+    'time_management', 'infrastructure', 'learning_outcome',
+]
+RATING_DEFAULTS = {
+    'venue_rating': 7.0, 'organization_rating': 7.0, 'content_quality': 7.0,
+    'mentor_support': 7.0, 'food_quality': 7.0, 'prize_satisfaction': 7.0,
+    'networking_opportunities': 7.0, 'time_management': 7.0, 'infrastructure': 7.0,
+    'registration_process': 8.0, 'learning_outcome': 7.0,
+}
+
+# Code given to categories the encoders never saw (new events, new branches).
+# LabelEncoder codes start at 0, so -1 never collides with a trained category.
+UNKNOWN_CATEGORY = -1
+
+
+class CategoryLookup:
+    """
+    A fitted LabelEncoder compiled into a plain dict lookup table.
+    Skips sklearn's per-call validation, and maps unseen values to an explicit
+    unknown bucket instead of raising.
+    """
+    
+    def __init__(self, classes, unknown_code=UNKNOWN_CATEGORY):
+        self.classes_ = np.asarray(classes)
+        self.codes = {value: code for code, value in enumerate(self.classes_.tolist())}
+        self.unknown_code = unknown_code
+    
+    def encode(self, value):
+        """Code for one value"""
+        return self.codes.get(value, self.unknown_code)
+    
+    def encode_many(self, values):
+        """Codes for a sequence of values, as an int64 array"""
+        get, unknown = self.codes.get, self.unknown_code
+        return np.fromiter((get(value, unknown) for value in values), dtype=np.int64, count=len(values))
+    
+    def is_known(self, value):
+        return value in self.codes
+
+
+EVENT_FEATURES = ['event_name_encoded', 'event_type_encoded', 'event_level_encoded', 'event_duration_days']
+STUDENT_FEATURES = [
+    'student_branch_encoded', 'student_year', 'student_age', 'gender_encoded',
+    'previous_participation_encoded', 'skill_level_encoded', 'team_size',
+    'participated_alone', 'achievement_encoded',
+]
+STUDENT_CACHE_SIZE = 100000
+RESULT_CACHE_SIZE = 50000
+
+# How ratings are estimated when there is no past feedback:
+#   expected - the expected value of the estimate (deterministic, cacheable)
+#   sampled  - base rating + uniform(-0.5, 0.5) noise per rating (legacy behaviour)
+RATING_ESTIMATION_MODES = ('expected', 'sampled')
+# Ratings checked by get_insights_from_past_events; a mean below the threshold is a concern
+CONCERN_RATING_COLUMNS = ['venue_rating', 'organization_rating', 'content_quality',
+                          'mentor_support', 'food_quality', 'infrastructure']
+CONCERN_THRESHOLD = 6.0
+# Concern means are rounded before the threshold check so that the per-student
+# and the groupby path (different summation order) classify identically
+CONCERN_MEAN_DECIMALS = 9
+MODEL_FILES = ['recommendation_model.pkl', 'satisfaction_model.pkl', 'scaler.pkl',
+               'label_encoders.pkl', 'model_metadata.pkl']
+
+
+def profile_hash(student_profile, past_feedback=None):
+    """Stable hash of a profile dict (independent of key order), plus past feedback if given"""
+    payload = student_profile if past_feedback is None else [student_profile, past_feedback]
+    payload = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode()).hexdigest()[:16]
+
+
+def artifact_version(paths):
+    """Version tag derived from model file sizes and modification times"""
+    stats = [(path, os.path.getsize(path), os.path.getmtime(path)) for path in paths if os.path.exists(path)]
+    return hashlib.sha1(json.dumps(stats).encode()).hexdigest()[:12]
+
+
+def _event_signature(event):
+    return (event['name'], event['type'], event['level'], event['duration_days'])
+
+
+class FeatureCache:
+    """
+    Encoded event blocks keyed by event id and student blocks keyed by profile hash.
+    An event whose name/type/level/duration changed since it was cached is
+    re-encoded automatically; events without an id are keyed by those fields.
+    """
+    
+    def __init__(self, max_students=STUDENT_CACHE_SIZE):
+        self.max_students = max_students
+        self._events = {}                 # key -> (signature, row)
+        self._students = OrderedDict()    # profile hash -> row (LRU order)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def event_rows(self, events, encode):
+        """Rows for events, encoding only the ones not cached (encode: list of events -> rows)"""
+        rows = np.empty((len(events), len(EVENT_FEATURES)))
+        signatures = [_event_signature(event) for event in events]
+        keys = [event.get('id') or signature for event, signature in zip(events, signatures)]
+        missing = []
+        with self._lock:
+            for i, (key, signature) in enumerate(zip(keys, signatures)):
+                cached = self._events.get(key)
+                if cached is not None and cached[0] == signature:
+                    rows[i] = cached[1]
+                else:
+                    missing.append(i)
+            self.hits += len(events) - len(missing)
+            self.misses += len(missing)
+        
+        if missing:
+            encoded = encode([events[i] for i in missing])
+            with self._lock:
+                for i, row in zip(missing, encoded):
+                    rows[i] = row
+                    self._events[keys[i]] = (signatures[i], row)
+        return rows
+    
+    def student_rows(self, student_profiles, encode):
+        """Rows for student profiles, encoding only the ones not cached"""
+        rows = np.empty((len(student_profiles), len(STUDENT_FEATURES)))
+        keys = [profile_hash(profile) for profile in student_profiles]
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                cached = self._students.get(key)
+                if cached is not None:
+                    self._students.move_to_end(key)
+                    rows[i] = cached
+                else:
+                    missing.append(i)
+            self.hits += len(student_profiles) - len(missing)
+            self.misses += len(missing)
+        
+        if missing:
+            encoded = encode([student_profiles[i] for i in missing])
+            with self._lock:
+                for i, row in zip(missing, encoded):
+                    rows[i] = row
+                    self._students[keys[i]] = row
+                while len(self._students) > self.max_students:
+                    self._students.popitem(last=False)
+        return rows
+    
+    def invalidate_events(self, event_ids=None):
+        """Forget cached event rows (all of them if event_ids is None)"""
+        with self._lock:
+            if event_ids is None:
+                self._events.clear()
+            else:
+                for event_id in event_ids:
+                    self._events.pop(event_id, None)
+    
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+            self._students.clear()
+            self.hits = self.misses = 0
+    
+    def stats(self):
+        with self._lock:
+            return {
+                'events': len(self._events),
+                'students': len(self._students),
+                'hits': self.hits,
+                'misses': self.misses,
+            }
+
+
+class ResultCache:
+    """
+    LRU cache of per-event predictions keyed by (profile hash, event id, model version).
+    Entries remember the event's signature, so an edited event is a miss.
+    """
+    
+    def __init__(self, max_size=RESULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries = OrderedDict()   # key -> (signature, prediction)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, key, signature):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != signature:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+    
+    def put(self, key, signature, prediction):
+        with self._lock:
+            self._entries[key] = (signature, prediction)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def invalidate_events(self, event_ids=None):
+        """Forget results for the given events (all results if event_ids is None)"""
+        with self._lock:
+            if event_ids is None:
+                self._entries.clear()
+                return
+            event_ids = set(event_ids)
+            for key in [key for key in self._entries if key[1] in event_ids]:
+                del self._entries[key]
+    
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+    
+    def stats(self):
+        with self._lock:
+            return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+def rank_recommendations(events, predictions, top_n=5):
+    """Top N events by (confidence, predicted satisfaction), in recommend_events_for_student format"""
+    recommendations = []
+    
+    for event, prediction in zip(events, predictions):
+        recommendations.append({
+            'event_name': event['name'],
+            'event_type': event['type'],
+            'confidence': prediction['confidence'],
+            'predicted_satisfaction': prediction['predicted_satisfaction'],
+            'recommendation': prediction['recommendation_text'],
+            'would_recommend': prediction['would_recommend']
+        })
+    
+    # Sort by confidence and satisfaction
+    recommendations.sort(key=lambda x: (x['confidence'], x['predicted_satisfaction']), reverse=True)
+    
+    return recommendations[:top_n]
+
+
 class EventRecommendationSystem:
-    def __init__(self):
-        """Initialize the recommendation system by loading trained models"""
+    def __init__(self, models_path='.', rating_estimation='expected', result_cache_size=RESULT_CACHE_SIZE,
+                 compile_trees=False):
+        """
+        Initialize the recommendation system by loading trained models
+        
+        Args:
+            models_path: directory containing the model .pkl files, a shared
+                artifact directory from `model_artifacts.py export` (compiled
+                models memory-mapped read-only, shared between processes), or a
+                versioned root whose CURRENT version is loaded
+            rating_estimation: 'expected' (deterministic, results are cached) or
+                'sampled' (random estimated ratings, never cached)
+            result_cache_size: max cached (student, event) predictions
+            compile_trees: score small batches with the flattened-array tree engine
+                (tree_inference.py); outputs match the original models to ~1e-7
+        """
+        if rating_estimation not in RATING_ESTIMATION_MODES:
+            raise ValueError(f"rating_estimation must be one of {RATING_ESTIMATION_MODES}")
+        self.rating_estimation = rating_estimation
         print("Loading trained models...")
-        self.recommendation_model = joblib.load('recommendation_model.pkl')
-        self.satisfaction_model = joblib.load('satisfaction_model.pkl')
-        self.scaler = joblib.load('scaler.pkl')
-        self.label_encoders = joblib.load('label_encoders.pkl')
-        self.metadata = joblib.load('model_metadata.pkl')
+        self.models_root = models_path
+        models_path = resolve_models_path(models_path)
+        self.models_path = models_path
+        memory_before = memory_usage()
+        load_start = time.perf_counter()
+        self.shared_artifacts = is_shared_artifact_dir(models_path)
+        if self.shared_artifacts:
+            from tree_inference import SmallBatchModel
+            shared = load_shared_artifacts(models_path)
+            self.recommendation_model = SmallBatchModel(None, shared['recommendation_model'])
+            self.satisfaction_model = SmallBatchModel(None, shared['satisfaction_model'])
+            artifact_model_version = shared['manifest']['model_version']
+        else:
+            self.recommendation_model = joblib.load(os.path.join(models_path, 'recommendation_model.pkl'))
+            self.satisfaction_model = joblib.load(os.path.join(models_path, 'satisfaction_model.pkl'))
+            artifact_model_version = None
+        self.scaler = joblib.load(os.path.join(models_path, 'scaler.pkl'))
+        self.label_encoders = joblib.load(os.path.join(models_path, 'label_encoders.pkl'))
+        self.metadata = joblib.load(os.path.join(models_path, 'model_metadata.pkl'))
+        if compile_trees and not self.shared_artifacts:
+            from tree_inference import compile_with_fallback
+            self.recommendation_model = compile_with_fallback(self.recommendation_model)
+            self.satisfaction_model = compile_with_fallback(self.satisfaction_model)
+        memory_after = memory_usage()
+        self.load_stats = {
+            'seconds': time.perf_counter() - load_start,
+            'uss_delta_mb': memory_after.get('uss_mb', 0.0) - memory_before.get('uss_mb', 0.0),
+            'shared_artifacts': self.shared_artifacts,
+        }
         self.feature_columns = self.metadata['feature_columns']
-        print(f"✓ Models loaded successfully!")
+        self.lookups = {name: CategoryLookup(encoder.classes_) for name, encoder in self.label_encoders.items()}
+        self.feature_cache = FeatureCache()
+        self.result_cache = ResultCache(result_cache_size)
+        self.model_version = self.metadata.get('model_version') or artifact_model_version or artifact_version(
+            [os.path.join(models_path, name) for name in MODEL_FILES])
+        print(f"✓ Models loaded successfully! ({self.load_stats['seconds']:.2f}s, "
+              f"+{self.load_stats['uss_delta_mb']:.1f} MB unique memory"
+              f"{', shared artifacts' if self.shared_artifacts else ''})")
         print(f"✓ Best Model: {self.metadata['best_model_name']}")
         print(f"✓ Accuracy: {self.metadata['accuracy']*100:.2f}%\n")
         
+    def _rating_noise(self, size=None):
+        """Noise added to estimated ratings: zero (its expected value) unless sampling"""
+        if self.rating_estimation == 'sampled':
+            return np.random.uniform(-0.5, 0.5, size=size)
+        return 0.0 if size is None else np.zeros(size)
+    
     def prepare_input(self, student_profile, event_info, past_feedback=None):
         """
         Prepare input features from student profile and event information
@@ -26,22 +334,24 @@ class EventRecommendationSystem:
             student_profile: dict with keys like branch, year, age, gender, skill_level, etc.
             event_info: dict with event details like name, type, level, duration, etc.
             past_feedback: dict with optional past ratings (if available)
+        
+        Categories the models were not trained on are encoded as UNKNOWN_CATEGORY.
         """
         # Default values
         input_data = {
-            'event_name_encoded': self.label_encoders['event_name'].transform([event_info['name']])[0],
-            'event_type_encoded': self.label_encoders['event_type'].transform([event_info['type']])[0],
-            'event_level_encoded': self.label_encoders['event_level'].transform([event_info['level']])[0],
+            'event_name_encoded': self.lookups['event_name'].encode(event_info['name']),
+            'event_type_encoded': self.lookups['event_type'].encode(event_info['type']),
+            'event_level_encoded': self.lookups['event_level'].encode(event_info['level']),
             'event_duration_days': event_info['duration_days'],
-            'student_branch_encoded': self.label_encoders['student_branch'].transform([student_profile['branch']])[0],
+            'student_branch_encoded': self.lookups['student_branch'].encode(student_profile['branch']),
             'student_year': student_profile['year'],
             'student_age': student_profile.get('age', 18 + student_profile['year']),
-            'gender_encoded': self.label_encoders['gender'].transform([student_profile['gender']])[0],
-            'previous_participation_encoded': self.label_encoders['previous_participation'].transform([student_profile.get('previous_participation', 'Low')])[0],
-            'skill_level_encoded': self.label_encoders['skill_level'].transform([student_profile['skill_level']])[0],
+            'gender_encoded': self.lookups['gender'].encode(student_profile['gender']),
+            'previous_participation_encoded': self.lookups['previous_participation'].encode(student_profile.get('previous_participation', 'Low')),
+            'skill_level_encoded': self.lookups['skill_level'].encode(student_profile['skill_level']),
             'team_size': student_profile.get('team_size', 3),
             'participated_alone': student_profile.get('participated_alone', 0),
-            'achievement_encoded': self.label_encoders['achievement'].transform([student_profile.get('achievement', 'Participation')])[0],
+            'achievement_encoded': self.lookups['achievement'].encode(student_profile.get('achievement', 'Participation')),
         }
         
         # Use past feedback if available, otherwise use estimated values
@@ -60,20 +370,20 @@ class EventRecommendationSystem:
                 'learning_outcome': past_feedback.get('learning_outcome', 7.0),
             })
         else:
-            # Estimate based on skill level and previous participation
+            # Estimate based on skill level (see RATING_ESTIMATION_MODES)
             base_rating = 7.0 if student_profile['skill_level'] in ['Advanced', 'Expert'] else 6.5
             input_data.update({
-                'venue_rating': base_rating + np.random.uniform(-0.5, 0.5),
-                'organization_rating': base_rating + np.random.uniform(-0.5, 0.5),
-                'content_quality': base_rating + np.random.uniform(-0.5, 0.5),
-                'mentor_support': base_rating + np.random.uniform(-0.5, 0.5),
-                'food_quality': 6.5 + np.random.uniform(-0.5, 0.5),
-                'prize_satisfaction': base_rating + np.random.uniform(-0.5, 0.5),
-                'networking_opportunities': base_rating + np.random.uniform(-0.5, 0.5),
-                'time_management': base_rating + np.random.uniform(-0.5, 0.5),
-                'infrastructure': base_rating + np.random.uniform(-0.5, 0.5),
+                'venue_rating': base_rating + self._rating_noise(),
+                'organization_rating': base_rating + self._rating_noise(),
+                'content_quality': base_rating + self._rating_noise(),
+                'mentor_support': base_rating + self._rating_noise(),
+                'food_quality': 6.5 + self._rating_noise(),
+                'prize_satisfaction': base_rating + self._rating_noise(),
+                'networking_opportunities': base_rating + self._rating_noise(),
+                'time_management': base_rating + self._rating_noise(),
+                'infrastructure': base_rating + self._rating_noise(),
                 'registration_process': 8.0,
-                'learning_outcome': base_rating + np.random.uniform(-0.5, 0.5),
+                'learning_outcome': base_rating + self._rating_noise(),
             })
         
         # Calculate composite scores
@@ -94,7 +404,7 @@ class EventRecommendationSystem:
         
         # Sentiment and feedback
         sentiment = 'Positive' if input_data['total_experience_score'] >= 7 else 'Neutral'
-        input_data['sentiment_encoded'] = self.label_encoders['sentiment'].transform([sentiment])[0]
+        input_data['sentiment_encoded'] = self.lookups['sentiment'].encode(sentiment)
         input_data['feedback_length'] = 150
         input_data['suggestions_given'] = 1
         
@@ -133,6 +443,208 @@ class EventRecommendationSystem:
                                    "Not Recommended"
         }
     
+    def _encode_events(self, events):
+        """Event-side feature rows (EVENT_FEATURES order), one per event"""
+        lookups = self.lookups
+        return np.column_stack([
+            lookups['event_name'].encode_many([e['name'] for e in events]),
+            lookups['event_type'].encode_many([e['type'] for e in events]),
+            lookups['event_level'].encode_many([e['level'] for e in events]),
+            [e['duration_days'] for e in events],
+        ]).astype(float)
+    
+    def _encode_students(self, student_profiles):
+        """Student-side feature rows (STUDENT_FEATURES order), one per profile"""
+        lookups = self.lookups
+        return np.array([
+            [
+                lookups['student_branch'].encode(profile['branch']),
+                profile['year'],
+                profile.get('age', 18 + profile['year']),
+                lookups['gender'].encode(profile['gender']),
+                lookups['previous_participation'].encode(profile.get('previous_participation', 'Low')),
+                lookups['skill_level'].encode(profile['skill_level']),
+                profile.get('team_size', 3),
+                profile.get('participated_alone', 0),
+                lookups['achievement'].encode(profile.get('achievement', 'Participation')),
+            ]
+            for profile in student_profiles
+        ], dtype=float).reshape(len(student_profiles), len(STUDENT_FEATURES))
+    
+    def prepare_pair_input(self, student_profiles, events, past_feedback=None):
+        """
+        Feature matrix for every (student, event) pair, student-major
+        (row s * len(events) + e). Event and student blocks come from the
+        feature cache and are broadcast against each other.
+        
+        Args:
+            student_profiles: list of student profile dicts
+            events: list of event dicts
+            past_feedback: optional past ratings, shared by all students
+        """
+        n_students, n_events = len(student_profiles), len(events)
+        event_rows = self.feature_cache.event_rows(events, self._encode_events)
+        student_rows = self.feature_cache.student_rows(student_profiles, self._encode_students)
+        
+        columns = {}
+        for i, name in enumerate(EVENT_FEATURES):
+            columns[name] = event_rows[None, :, i]
+        for i, name in enumerate(STUDENT_FEATURES):
+            columns[name] = student_rows[:, None, i]
+        
+        if past_feedback:
+            for name, default in RATING_DEFAULTS.items():
+                columns[name] = np.full((1, 1), past_feedback.get(name, default), dtype=float)
+        else:
+            # In sampled mode: same draws, in the same order, as sequential prepare_input calls
+            base_rating = np.array([
+                7.0 if profile['skill_level'] in ['Advanced', 'Expert'] else 6.5
+                for profile in student_profiles
+            ])[:, None]
+            noise = self._rating_noise(size=(n_students, n_events, len(ESTIMATED_RATINGS)))
+            for i, name in enumerate(ESTIMATED_RATINGS):
+                base = 6.5 if name == 'food_quality' else base_rating
+                columns[name] = base + noise[:, :, i]
+            columns['registration_process'] = np.full((1, 1), 8.0)
+        
+        columns['total_experience_score'] = (
+            columns['venue_rating'] + columns['organization_rating'] +
+            columns['content_quality'] + columns['mentor_support']
+        ) / 4
+        columns['facility_score'] = (
+            columns['food_quality'] + columns['infrastructure'] +
+            columns['registration_process']
+        ) / 3
+        columns['engagement_score'] = (
+            columns['networking_opportunities'] + columns['time_management'] +
+            columns['learning_outcome']
+        ) / 3
+        
+        sentiment_lookup = self.lookups['sentiment']
+        columns['sentiment_encoded'] = np.where(
+            columns['total_experience_score'] >= 7,
+            sentiment_lookup.encode('Positive'),
+            sentiment_lookup.encode('Neutral'),
+        )
+        columns['feedback_length'] = np.full((1, 1), 150)
+        columns['suggestions_given'] = np.full((1, 1), 1)
+        
+        matrix = np.empty((n_students, n_events, len(self.feature_columns)))
+        for i, name in enumerate(self.feature_columns):
+            matrix[:, :, i] = columns[name]
+        return pd.DataFrame(matrix.reshape(n_students * n_events, -1), columns=self.feature_columns)
+    
+    def prepare_batch_input(self, student_profile, events, past_feedback=None):
+        """Vectorized prepare_input for many events: one feature matrix, one row per event"""
+        return self.prepare_pair_input([student_profile], events, past_feedback)
+    
+    def _score_features(self, input_features):
+        """One predict_proba call and one satisfaction call over a feature matrix"""
+        if hasattr(self.recommendation_model, 'predict_proba'):
+            proba = self.recommendation_model.predict_proba(input_features)
+            # predict() is argmax over predict_proba, so derive it instead of a second pass
+            classes = getattr(self.recommendation_model, 'classes_', np.arange(proba.shape[1]))
+            recommendations = classes[np.argmax(proba, axis=1)]
+            probabilities = proba[:, 1]
+        else:
+            recommendations = self.recommendation_model.predict(input_features)
+            probabilities = recommendations
+        
+        satisfactions = self.satisfaction_model.predict(input_features)
+        return np.asarray(recommendations), np.asarray(probabilities), np.asarray(satisfactions)
+    
+    def score_pairs(self, student_profiles, events, past_feedback=None):
+        """
+        Score every (student, event) pair with one predict_proba call and one
+        satisfaction call.
+        
+        Returns:
+            dict of (n_students, n_events) arrays: would_recommend, confidence,
+            predicted_satisfaction
+        """
+        shape = (len(student_profiles), len(events))
+        input_features = self.prepare_pair_input(student_profiles, events, past_feedback)
+        recommendations, probabilities, satisfactions = self._score_features(input_features)
+        
+        return {
+            'would_recommend': recommendations.reshape(shape),
+            'confidence': probabilities.reshape(shape),
+            'predicted_satisfaction': satisfactions.reshape(shape),
+        }
+    
+    def predict_many(self, requests):
+        """
+        predict_recommendations for several requests at once. Cache misses from
+        all requests are stacked into one feature matrix and scored in one model call.
+        
+        Args:
+            requests: list of (student_profile, events, past_feedback) tuples
+        
+        Returns:
+            One list of prediction dicts per request
+        """
+        use_cache = self.rating_estimation == 'expected'
+        results = []
+        pending = []   # (request index, missing event indices, cache keys, signatures)
+        
+        for r, (student_profile, events, past_feedback) in enumerate(requests):
+            predictions = [None] * len(events)
+            keys = signatures = None
+            if use_cache and events:
+                student_key = profile_hash(student_profile, past_feedback)
+                signatures = [_event_signature(event) for event in events]
+                keys = [(student_key, event.get('id') or signature, self.model_version)
+                        for event, signature in zip(events, signatures)]
+                for i, (key, signature) in enumerate(zip(keys, signatures)):
+                    predictions[i] = self.result_cache.get(key, signature)
+            missing = [i for i, prediction in enumerate(predictions) if prediction is None]
+            if missing:
+                pending.append((r, missing, keys, signatures))
+            results.append(predictions)
+        
+        if pending:
+            matrix = np.vstack([
+                self.prepare_pair_input([requests[r][0]], [requests[r][1][i] for i in missing], requests[r][2]).to_numpy()
+                for r, missing, _, _ in pending
+            ])
+            recommendations, probabilities, satisfactions = self._score_features(
+                pd.DataFrame(matrix, columns=self.feature_columns))
+            
+            row = 0
+            for r, missing, keys, signatures in pending:
+                for i in missing:
+                    recommendation, probability = recommendations[row], probabilities[row]
+                    prediction = {
+                        'would_recommend': bool(recommendation),
+                        'confidence': float(probability),
+                        'predicted_satisfaction': float(satisfactions[row]),
+                        'recommendation_text': "Highly Recommended" if probability > 0.75 else 
+                                               "Recommended" if recommendation else 
+                                               "Not Recommended"
+                    }
+                    results[r][i] = prediction
+                    if use_cache:
+                        self.result_cache.put(keys[i], signatures[i], prediction)
+                    row += 1
+        
+        return [[dict(prediction) for prediction in predictions] for predictions in results]
+    
+    def predict_recommendations(self, student_profile, events, past_feedback=None):
+        """
+        Batch version of predict_recommendation: scores all events with one
+        predict_proba call and one satisfaction call. In expected-value mode,
+        results come from the result cache where possible and only misses are scored.
+        
+        Returns:
+            List of prediction dicts (same format as predict_recommendation), in event order
+        """
+        return self.predict_many([(student_profile, events, past_feedback)])[0]
+    
+    def invalidate_events(self, event_ids=None):
+        """Drop cached features and results (all of them if event_ids is None) after events change"""
+        self.feature_cache.invalidate_events(event_ids)
+        self.result_cache.invalidate_events(event_ids)
+    
     def recommend_events_for_student(self, student_profile, available_events, past_feedback=None, top_n=5):
         """
         Recommend top N events for a student based on their profile
@@ -146,23 +658,8 @@ class EventRecommendationSystem:
         Returns:
             List of recommended events with scores
         """
-        recommendations = []
-        
-        for event in available_events:
-            prediction = self.predict_recommendation(student_profile, event, past_feedback)
-            recommendations.append({
-                'event_name': event['name'],
-                'event_type': event['type'],
-                'confidence': prediction['confidence'],
-                'predicted_satisfaction': prediction['predicted_satisfaction'],
-                'recommendation': prediction['recommendation_text'],
-                'would_recommend': prediction['would_recommend']
-            })
-        
-        # Sort by confidence and satisfaction
-        recommendations.sort(key=lambda x: (x['confidence'], x['predicted_satisfaction']), reverse=True)
-        
-        return recommendations[:top_n]
+        predictions = self.predict_recommendations(student_profile, available_events, past_feedback)
+        return rank_recommendations(available_events, predictions, top_n)
     
     def get_insights_from_past_events(self, past_events_feedback):
         """
@@ -184,19 +681,67 @@ class EventRecommendationSystem:
         }
         
         # Identify areas of concern
-        rating_columns = ['venue_rating', 'organization_rating', 'content_quality', 
-                         'mentor_support', 'food_quality', 'infrastructure']
-        
-        for col in rating_columns:
+        for col in CONCERN_RATING_COLUMNS:
             if col in past_events_feedback.columns:
-                avg_rating = past_events_feedback[col].mean()
-                if avg_rating < 6.0:
+                avg_rating = round(past_events_feedback[col].mean(), CONCERN_MEAN_DECIMALS)
+                if avg_rating < CONCERN_THRESHOLD:
                     insights['areas_of_concern'].append({
                         'area': col.replace('_', ' ').title(),
                         'average_rating': avg_rating
                     })
         
         return insights
+    
+    def get_cohort_insights(self, feedback, by='student_id'):
+        """
+        get_insights_from_past_events for every group in one pass over the full
+        feedback table: a single groupby for the means plus one for event-type
+        counts, instead of a dozen pandas calls per student.
+        
+        Args:
+            feedback: DataFrame with feedback rows for many students
+            by: column(s) to group on - 'student_id' for per-student insights, or
+                e.g. ['student_branch', 'student_year'] for cohort-level ones
+        
+        Returns:
+            DataFrame indexed by the group key(s) with the same fields as
+            get_insights_from_past_events (areas_of_concern is a list per row).
+            average_satisfaction and recommendation_rate can differ from the
+            per-student ones in the last bit (different summation order); concern
+            means are rounded, so areas_of_concern is identical.
+        """
+        keys = [by] if isinstance(by, str) else list(by)
+        feedback = feedback.reset_index(drop=True)
+        concern_columns = [col for col in CONCERN_RATING_COLUMNS if col in feedback.columns]
+        grouped = feedback.groupby(keys, sort=True)
+        
+        insights = grouped.agg(
+            total_events_attended=('overall_satisfaction', 'size'),
+            average_satisfaction=('overall_satisfaction', 'mean'),
+            recommendation_rate=('would_recommend', 'mean'),
+        )
+        
+        # Most frequent event type; ties go to the first in sort order, like Series.mode()
+        type_counts = feedback.groupby(keys + ['event_type']).size().rename('count').reset_index()
+        type_counts = type_counts.sort_values(keys + ['count', 'event_type'],
+                                              ascending=[True] * len(keys) + [False, True])
+        preferred = type_counts.drop_duplicates(keys).set_index(keys)['event_type']
+        insights['preferred_event_types'] = preferred.reindex(insights.index)
+        
+        # First row with the highest satisfaction, like nlargest(1, ...)
+        best_rows = grouped['overall_satisfaction'].idxmax().dropna().astype(int)
+        insights['best_event'] = pd.Series(feedback['event_name'].to_numpy()[best_rows.to_numpy()],
+                                           index=best_rows.index).reindex(insights.index)
+        
+        means = grouped[concern_columns].mean().round(CONCERN_MEAN_DECIMALS)
+        low = means < CONCERN_THRESHOLD
+        areas = {col: col.replace('_', ' ').title() for col in concern_columns}
+        concerns = [[] for _ in range(len(means))]
+        for col in concern_columns:
+            for row in np.flatnonzero(low[col].to_numpy()):
+                concerns[row].append({'area': areas[col], 'average_rating': means[col].iat[row]})
+        insights['areas_of_concern'] = pd.Series(concerns, index=means.index).reindex(insights.index)
+        return insights
 
 
 # Example usage
@@ -0,0 +1,436 @@
+"""
+Compiled Tree Inference
+Flattens trained tree ensembles (sklearn decision trees, random forests,
+extra trees, gradient boosting and XGBoost) into contiguous NumPy arrays
+(feature, threshold, left, right, value) and evaluates every tree for every
+row at once with vectorized traversal. This skips the per-call input
+validation and Python overhead of the models' own predict methods, which
+dominate for the small batches the API scores.
+
+Usage:
+    compiled = compile_model(joblib.load("recommendation_model.pkl"))
+    compiled.predict_proba(X)        # same interface as the source model
+    check_parity(model, compiled, X)
+
+    model = compile_with_fallback(model)   # compiled for small batches, original for large
+
+Benchmark + parity check on the trained models:
+    python tree_inference.py --models .
+"""
+
+import time
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+# Leaves point to themselves, so extra traversal steps are no-ops
+_LEAF = -1
+
+# Above roughly this many rows the libraries' native (C/C++) loops win again,
+# so SmallBatchModel hands larger batches back to the original model
+COMPILED_MAX_BATCH = 1024
+
+
+class CompiledTreeModel:
+    """
+    A tree ensemble as flat arrays. All trees share one node array; roots holds
+    each tree's root index. Output per row is
+        link(base + scale * aggregate(leaf values))
+    where aggregate is a sum (boosting) or a mean (forests).
+    """
+
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray,
+                 right: np.ndarray, value: np.ndarray, roots: np.ndarray, max_depth: int,
+                 n_features: int, aggregate: str = "mean", base: float = 0.0, scale: float = 1.0,
+                 link: str = "identity", strict_less: bool = False,
+                 default_left: Optional[np.ndarray] = None, classes: Optional[np.ndarray] = None):
+        self.feature = feature.astype(np.int32)
+        self.threshold = threshold
+        self.left = left.astype(np.int32)
+        self.right = right.astype(np.int32)
+        self.value = value.astype(np.float64)
+        self.roots = roots.astype(np.int32)
+        self.max_depth = int(max_depth)
+        self.n_features = int(n_features)
+        self.aggregate = aggregate
+        self.base = base
+        self.scale = scale
+        self.link = link
+        self.strict_less = strict_less        # XGBoost splits on x < t, sklearn on x <= t
+        self.default_left = default_left      # XGBoost: branch taken for missing (NaN) values
+        if classes is not None:
+            self.classes_ = np.asarray(classes)
+        self._children = np.column_stack([self.left, self.right]).ravel()
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    def _as_array(self, X) -> np.ndarray:
+        X = X.to_numpy() if hasattr(X, "to_numpy") else np.asarray(X)
+        # Both libraries compare float32 feature values
+        return np.ascontiguousarray(X, dtype=np.float32).reshape(-1, self.n_features)
+
+    def leaves(self, X) -> np.ndarray:
+        """Leaf node index reached in every tree, shape (n_rows, n_trees)"""
+        X = self._as_array(X)
+        n_rows = len(X)
+        flat = X.ravel()
+        row_offset = (np.arange(n_rows, dtype=np.int32) * self.n_features)[:, None]
+        nodes = np.tile(self.roots, (n_rows, 1))
+
+        for _ in range(self.max_depth):
+            values = flat[row_offset + self.feature[nodes]]
+            thresholds = self.threshold[nodes]
+            go_right = values >= thresholds if self.strict_less else values > thresholds
+            if self.default_left is not None:
+                missing = np.isnan(values)
+                if missing.any():
+                    go_right = np.where(missing, ~self.default_left[nodes], go_right)
+            # children is [left, right] per node, flattened: child = children[2 * node + go_right]
+            nodes = self._children[2 * nodes + go_right]
+        return nodes
+
+    def raw_predict(self, X) -> np.ndarray:
+        """Aggregated leaf values before the link function, shape (n_rows, n_outputs)"""
+        leaf_values = self.value[self.leaves(X)]          # (n_rows, n_trees, n_outputs)
+        if self.aggregate == "sum":
+            aggregated = leaf_values.sum(axis=1)
+        else:
+            aggregated = leaf_values.mean(axis=1)
+        return self.base + self.scale * aggregated
+
+    def predict_proba(self, X) -> np.ndarray:
+        raw = self.raw_predict(X)
+        if self.link == "sigmoid":
+            positive = 1.0 / (1.0 + np.exp(-raw[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+        return raw
+
+    def predict(self, X) -> np.ndarray:
+        if hasattr(self, "classes_"):
+            return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+        return self.raw_predict(X)[:, 0]
+
+
+def _concat_trees(trees: List[Dict[str, np.ndarray]]) -> Dict[str, Any]:
+    """Stack per-tree node arrays into one, offsetting child indices"""
+    offsets = np.cumsum([0] + [len(tree["feature"]) for tree in trees])
+    merged = {name: [] for name in ["feature", "threshold", "left", "right", "value", "default_left"]}
+    for offset, tree in zip(offsets, trees):
+        is_leaf = tree["left"] == _LEAF
+        own_index = np.arange(len(tree["feature"])) + offset
+        merged["feature"].append(np.where(is_leaf, 0, tree["feature"]))
+        merged["threshold"].append(np.where(is_leaf, 0.0, tree["threshold"]))
+        merged["left"].append(np.where(is_leaf, own_index, tree["left"] + offset))
+        merged["right"].append(np.where(is_leaf, own_index, tree["right"] + offset))
+        merged["value"].append(tree["value"])
+        merged["default_left"].append(tree.get("default_left", np.ones(len(tree["feature"]), dtype=bool)))
+    result = {name: np.concatenate(parts) for name, parts in merged.items()}
+    result["roots"] = offsets[:-1]
+    result["max_depth"] = max(tree["depth"] for tree in trees)
+    return result
+
+
+def _sklearn_tree(estimator, normalize: bool) -> Dict[str, np.ndarray]:
+    tree = estimator.tree_
+    value = tree.value[:, :, 0] if tree.value.shape[2] == 1 else tree.value[:, 0, :]
+    if normalize:
+        # Classifier leaves hold class counts/weights; predict_proba normalizes them
+        totals = value.sum(axis=1, keepdims=True)
+        value = np.divide(value, totals, out=np.zeros_like(value), where=totals > 0)
+    return {
+        "feature": tree.feature,
+        "threshold": tree.threshold,
+        "left": np.where(tree.children_left == -1, _LEAF, tree.children_left),
+        "right": tree.children_right,
+        "value": value,
+        "depth": tree.max_depth,
+    }
+
+
+def _compile_sklearn_forest(model, estimators, is_classifier: bool) -> CompiledTreeModel:
+    arrays = _concat_trees([_sklearn_tree(estimator, normalize=is_classifier) for estimator in estimators])
+    return CompiledTreeModel(
+        arrays["feature"], arrays["threshold"], arrays["left"], arrays["right"], arrays["value"],
+        arrays["roots"], arrays["max_depth"], model.n_features_in_, aggregate="mean",
+        classes=model.classes_ if is_classifier else None,
+    )
+
+
+def _compile_sklearn_gradient_boosting(model, is_classifier: bool) -> CompiledTreeModel:
+    if model.estimators_.shape[1] != 1:
+        raise NotImplementedError("Only binary classification / single-output regression is supported")
+    if model.init_ != "zero" and type(model.init_).__name__ not in ("DummyClassifier", "DummyRegressor"):
+        raise NotImplementedError("Gradient boosting with a custom init estimator is not supported")
+    arrays = _concat_trees([_sklearn_tree(stage[0], normalize=False) for stage in model.estimators_])
+    compiled = CompiledTreeModel(
+        arrays["feature"], arrays["threshold"], arrays["left"], arrays["right"], arrays["value"],
+        arrays["roots"], arrays["max_depth"], model.n_features_in_, aggregate="sum",
+        scale=model.learning_rate, link="sigmoid" if is_classifier else "identity",
+        classes=model.classes_ if is_classifier else None,
+    )
+    # The init estimator's prediction is constant: recover it from one row
+    probe = np.zeros((1, model.n_features_in_), dtype=np.float32)
+    raw = model.decision_function(probe) if is_classifier else model.predict(probe)
+    compiled.base = float(np.ravel(raw)[0] - compiled.raw_predict(probe)[0, 0])
+    return compiled
+
+
+def _compile_xgboost(model, is_classifier: bool) -> CompiledTreeModel:
+    booster = model.get_booster()
+    frame = booster.trees_to_dataframe()
+    feature_index = {name: i for i, name in enumerate(booster.feature_names or [])}
+
+    n_trees = frame["Tree"].max() + 1
+    best_iteration = getattr(model, "best_iteration", None)
+    if best_iteration is not None:
+        n_trees = min(n_trees, (best_iteration + 1) * (model.get_params().get("num_parallel_tree") or 1))
+
+    trees = []
+    for tree_id, nodes in frame[frame["Tree"] < n_trees].groupby("Tree", sort=True):
+        nodes = nodes.sort_values("Node")
+        node_index = {node_id: i for i, node_id in enumerate(nodes["ID"])}
+        is_leaf = (nodes["Feature"] == "Leaf").to_numpy()
+
+        def child(column):
+            return np.array([_LEAF if leaf else node_index[target]
+                             for leaf, target in zip(is_leaf, nodes[column])])
+
+        features = np.array([
+            0 if leaf else feature_index.get(name, int(name.lstrip("f")) if name.lstrip("f").isdigit() else -1)
+            for leaf, name in zip(is_leaf, nodes["Feature"])
+        ])
+        if (features < 0).any():
+            raise NotImplementedError("Could not map XGBoost feature names to columns")
+
+        left, right, missing = child("Yes"), child("No"), child("Missing")
+        trees.append({
+            "feature": features,
+            "threshold": np.where(is_leaf, 0.0, nodes["Split"].fillna(0.0).to_numpy()).astype(np.float32),
+            "left": left,
+            "right": right,
+            "value": np.where(is_leaf, nodes["Gain"].to_numpy(), 0.0)[:, None],
+            "default_left": (missing == left) | is_leaf,
+            "depth": _xgboost_depth(left, right),
+        })
+
+    arrays = _concat_trees(trees)
+    compiled = CompiledTreeModel(
+        arrays["feature"], arrays["threshold"].astype(np.float32), arrays["left"], arrays["right"],
+        arrays["value"], arrays["roots"], arrays["max_depth"], booster.num_features(),
+        aggregate="sum", link="sigmoid" if is_classifier else "identity", strict_less=True,
+        default_left=arrays["default_left"], classes=model.classes_ if is_classifier else None,
+    )
+    # base_score (as a margin) is stored differently across versions: recover it from one row
+    probe = np.zeros((1, booster.num_features()), dtype=np.float32)
+    import xgboost as xgb
+    margin = booster.predict(xgb.DMatrix(probe, feature_names=booster.feature_names), output_margin=True,
+                             iteration_range=(0, n_trees))
+    compiled.base = float(np.ravel(margin)[0] - compiled.raw_predict(probe)[0, 0])
+    return compiled
+
+
+def _xgboost_depth(left: np.ndarray, right: np.ndarray) -> int:
+    depth, frontier = 0, [0]
+    while frontier:
+        frontier = [child for node in frontier for child in (left[node], right[node]) if child != _LEAF]
+        depth += 1 if frontier else 0
+    return depth
+
+
+def compile_model(model) -> CompiledTreeModel:
+    """
+    Flatten a fitted tree ensemble. Raises NotImplementedError for unsupported
+    model types (callers should then keep using the original model).
+    """
+    name = type(model).__name__
+    if name in ("RandomForestClassifier", "ExtraTreesClassifier"):
+        return _compile_sklearn_forest(model, model.estimators_, is_classifier=True)
+    if name in ("RandomForestRegressor", "ExtraTreesRegressor"):
+        return _compile_sklearn_forest(model, model.estimators_, is_classifier=False)
+    if name in ("DecisionTreeClassifier", "ExtraTreeClassifier"):
+        return _compile_sklearn_forest(model, [model], is_classifier=True)
+    if name in ("DecisionTreeRegressor", "ExtraTreeRegressor"):
+        return _compile_sklearn_forest(model, [model], is_classifier=False)
+    if name == "GradientBoostingClassifier":
+        if len(model.classes_) != 2:
+            raise NotImplementedError("Only binary gradient boosting classifiers are supported")
+        return _compile_sklearn_gradient_boosting(model, is_classifier=True)
+    if name == "GradientBoostingRegressor":
+        return _compile_sklearn_gradient_boosting(model, is_classifier=False)
+    if name in ("XGBClassifier", "XGBRegressor"):
+        if name == "XGBClassifier" and len(model.classes_) != 2:
+            raise NotImplementedError("Only binary XGBoost classifiers are supported")
+        return _compile_xgboost(model, is_classifier=name == "XGBClassifier")
+    raise NotImplementedError(f"No compiled engine for {name}")
+
+
+class SmallBatchModel:
+    """
+    Drop-in wrapper: batches up to max_batch rows go through the compiled engine,
+    larger ones through the original model. With model=None (compiled arrays
+    loaded from shared artifacts) everything is compiled, max_batch rows at a time.
+    """
+
+    def __init__(self, model, compiled: CompiledTreeModel, max_batch: int = COMPILED_MAX_BATCH):
+        self.model = model
+        self.compiled = compiled
+        self.max_batch = max_batch
+        source = compiled if model is None else model
+        if hasattr(source, "classes_"):
+            self.classes_ = source.classes_
+
+    def _run(self, method: str, X):
+        if len(X) <= self.max_batch:
+            return getattr(self.compiled, method)(X)
+        if self.model is not None:
+            return getattr(self.model, method)(X)
+        X = X.to_numpy() if hasattr(X, "to_numpy") else np.asarray(X)
+        return np.concatenate([
+            getattr(self.compiled, method)(X[start:start + self.max_batch])
+            for start in range(0, len(X), self.max_batch)
+        ])
+
+    def predict(self, X):
+        return self._run("predict", X)
+
+    def predict_proba(self, X):
+        return self._run("predict_proba", X)
+
+
+def compile_with_fallback(model, max_batch: int = COMPILED_MAX_BATCH, parity_rows: int = 512):
+    """
+    SmallBatchModel around model if it compiles and passes a parity check,
+    otherwise the original model (with a warning).
+    """
+    try:
+        compiled = compile_model(model)
+    except Exception as e:
+        print(f"⚠️ Using {type(model).__name__} as-is (not compiled: {e})")
+        return model
+
+    parity = check_parity(model, compiled, sample_inputs(compiled, parity_rows))
+    if not parity["passed"]:
+        print(f"⚠️ Using {type(model).__name__} as-is (compiled parity check failed: {parity})")
+        return model
+    return SmallBatchModel(model, compiled, max_batch)
+
+
+def sample_inputs(compiled: CompiledTreeModel, count: int, seed: int = 0) -> np.ndarray:
+    """Random rows spanning each feature's split thresholds, so most branches get exercised"""
+    rng = np.random.default_rng(seed)
+    internal = compiled.left != np.arange(compiled.n_nodes)
+    X = np.zeros((count, compiled.n_features))
+    for feature in range(compiled.n_features):
+        thresholds = compiled.threshold[internal & (compiled.feature == feature)]
+        if len(thresholds):
+            low, high = float(thresholds.min()), float(thresholds.max())
+            span = max(high - low, 1.0)
+            X[:, feature] = rng.uniform(low - 0.1 * span, high + 0.1 * span, count)
+    return X
+
+
+def check_parity(model, compiled: CompiledTreeModel, X, tolerance: float = 1e-5) -> Dict[str, Any]:
+    """Compare compiled outputs with the original model's on the same rows"""
+    if hasattr(X, "to_numpy"):
+        X = X.to_numpy()
+    columns = getattr(model, "feature_names_in_", None)
+    if columns is not None:
+        import pandas as pd
+        X_model = pd.DataFrame(X, columns=columns)
+    else:
+        X_model = X
+
+    if hasattr(compiled, "classes_"):
+        expected = np.asarray(model.predict_proba(X_model))[:, 1]
+        actual = compiled.predict_proba(X)[:, 1]
+        labels_match = bool(np.array_equal(model.predict(X_model), compiled.predict(X)))
+    else:
+        expected = np.asarray(model.predict(X_model))
+        actual = compiled.predict(X)
+        labels_match = True
+
+    max_difference = float(np.max(np.abs(expected - actual))) if len(X) else 0.0
+    return {
+        "rows": len(X),
+        "max_abs_difference": max_difference,
+        "labels_match": labels_match,
+        "passed": labels_match and max_difference <= tolerance,
+    }
+
+
+def benchmark(model, compiled: CompiledTreeModel, X: np.ndarray,
+              batch_sizes=(1, 64, 10_000), min_seconds: float = 0.5) -> List[Dict[str, Any]]:
+    """Mean latency per call of the original vs compiled model at each batch size"""
+    columns = getattr(model, "feature_names_in_", None)
+    predict_original = model.predict_proba if hasattr(compiled, "classes_") else model.predict
+    predict_compiled = compiled.predict_proba if hasattr(compiled, "classes_") else compiled.predict
+
+    def _time(function, batch):
+        function(batch)  # warm-up
+        calls, start = 0, time.perf_counter()
+        while True:
+            function(batch)
+            calls += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= min_seconds:
+                return elapsed / calls
+
+    results = []
+    for batch_size in batch_sizes:
+        batch = X[np.arange(batch_size) % len(X)]
+        if columns is not None:
+            import pandas as pd
+            original_batch = pd.DataFrame(batch, columns=columns)
+        else:
+            original_batch = batch
+        original = _time(predict_original, original_batch)
+        fast = _time(predict_compiled, batch)
+        results.append({
+            "batch_size": batch_size,
+            "original_ms": original * 1000,
+            "compiled_ms": fast * 1000,
+            "speedup": original / fast if fast else float("inf"),
+        })
+    return results
+
+
+if __name__ == "__main__":
+    import os
+    import argparse
+    import joblib
+
+    parser = argparse.ArgumentParser(description="Compile the recommender's tree models and benchmark them")
+    parser.add_argument("--models", default=".", help="Directory with the model .pkl files")
+    parser.add_argument("--rows", type=int, default=10_000, help="Rows used for the parity check")
+    args = parser.parse_args()
+
+    for filename in ["recommendation_model.pkl", "satisfaction_model.pkl"]:
+        model = joblib.load(os.path.join(args.models, filename))
+        print("\n" + "=" * 70)
+        print(f"{filename} ({type(model).__name__})")
+        print("=" * 70)
+        try:
+            start = time.perf_counter()
+            compiled_model = compile_model(model)
+        except NotImplementedError as e:
+            print(f"⚠️ Not compiled: {e}")
+            continue
+        print(f"  Compiled {compiled_model.n_trees} trees / {compiled_model.n_nodes} nodes "
+              f"(max depth {compiled_model.max_depth}) in {time.perf_counter() - start:.2f}s")
+
+        inputs = sample_inputs(compiled_model, args.rows)
+        parity = check_parity(model, compiled_model, inputs)
+        status = "✅" if parity["passed"] else "❌"
+        print(f"  {status} Parity on {parity['rows']} rows: max |diff| = {parity['max_abs_difference']:.2e}, "
+              f"labels match = {parity['labels_match']}")
+
+        print(f"\n  {'batch':>8s} {'original':>12s} {'compiled':>12s} {'speedup':>9s}")
+        for row in benchmark(model, compiled_model, inputs):
+            print(f"  {row['batch_size']:8d} {row['original_ms']:10.3f}ms {row['compiled_ms']:10.3f}ms "
+                  f"{row['speedup']:8.1f}x")